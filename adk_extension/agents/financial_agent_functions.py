@@ -1,20 +1,122 @@
+import json
 import logging
-from typing import Dict, Any
-import google.generativeai as genai
+import re
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Dict, Any, Callable, List, Optional
 
+from config import STAGE_DIGESTS, REPORT_PROSE_STAGES, LOCAL_FACT_CHECK, PARALLEL_REPORT_SECTIONS, SEMANTIC_CACHE
 from tools.market_data_tools import yahoo_finance_tools
 from tools.news_tools import news_api_tools
+from tools.fundamentals_tools import fundamentals_tools
+from tools.peer_tools import peer_comparison_tools
+from tools.risk_tools import risk_tools
+from tools.simulation_tools import monte_carlo_tools
+from tools.fact_checker import fact_checker
+from tools.custom_tools import calculate_investment_score
+from utils.deadline import Deadline, current_deadline
+from utils.digest import digest_example, digest_instructions, split_digest, validate_digest
+from utils.llm_client import llm_client
+from utils.model_router import model_router
+from utils.semantic_cache import semantic_cache
 
 logger = logging.getLogger(__name__)
 
+def generate_content(model: str, prompt: str, stage: str, lane: str = "interactive"):
+    """Calls the configured LLM backend with timeouts, retries and hedging, behind the rate scheduler, circuit breaker and concurrency limit shared by every agent."""
+    return llm_client.generate(model, prompt, stage, lane)
+
+def route_model(stage: str) -> str:
+    """Model for a stage from its configured tier, falling back to a faster tier when the time left before the deadline is at risk."""
+    deadline = current_deadline()
+    return model_router.model_for(stage, deadline.remaining() if deadline is not None else None)
+
+def run_stages(stages: List[Callable[[Dict[str, Any]], bool]], analysis_state: Dict[str, Any],
+               deadline: Optional[Deadline] = None) -> List[bool]:
+    """
+    Runs stages concurrently, each on its own copy of the state with the deadline active on its thread.
+
+    A stage still running when the deadline passes is abandoned and reported as failed, as is
+    a stage that raises instead of returning False. Only
+    stages that finish in time merge their results back, so a late stage cannot change a
+    report that is already being assembled.
+    """
+    def run(stage):
+        stage_state = dict(analysis_state)
+        if deadline is None:
+            return stage(stage_state), stage_state
+        with deadline.active():
+            return stage(stage_state), stage_state
+
+    executor = ThreadPoolExecutor(max_workers=len(stages))
+    futures = [executor.submit(run, stage) for stage in stages]
+    results = []
+    try:
+        for stage, future in zip(stages, futures):
+            try:
+                success, stage_state = future.result(timeout=deadline.remaining() if deadline else None)
+            except FuturesTimeout:
+                logger.warning(f"AGENT: {stage.__name__} did not finish within the deadline and was abandoned.")
+                success = False
+            except Exception as e:
+                logger.error(f"AGENT: {stage.__name__} raised an unexpected error: {e}")
+                success = False
+            if success:
+                analysis_state.update(stage_state)
+            results.append(success)
+    finally:
+        # Abandoned stages finish in the background; their own provider calls are capped by the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+def _store_stage_output(analysis_state: Dict[str, Any], text: str, prose_key: str, digest_key: str, kind: str):
+    if not STAGE_DIGESTS:
+        analysis_state[prose_key] = text
+        return
+    analysis_state[prose_key], digest = split_digest(text, kind)
+    if digest is not None:
+        analysis_state[digest_key] = digest
+
+def _stage_input(analysis_state: Dict[str, Any], prose_key: str, digest_key: str, prose: bool = False) -> str:
+    """A stage's digest as compact JSON when available (and prose is not asked for), else its prose."""
+    digest = analysis_state.get(digest_key)
+    if prose or digest is None:
+        return analysis_state.get(prose_key)
+    return "Structured digest (JSON): " + json.dumps(digest, separators=(",", ":"))
+
+def _gather_quantitative_data(analysis_state: Dict[str, Any]):
+    ticker = analysis_state.get("ticker")
+    financial_data = yahoo_finance_tools.get_stock_data(ticker)
+    technical_data = yahoo_finance_tools.get_technical_indicators(ticker)
+    fundamental_ratios = fundamentals_tools.get_ratios(ticker)
+    peer_comparison = peer_comparison_tools.compare(ticker)
+    analysis_state["raw_financial_data"] = financial_data
+    analysis_state["raw_technical_data"] = technical_data
+    analysis_state["raw_fundamental_ratios"] = fundamental_ratios
+    analysis_state["raw_peer_comparison"] = peer_comparison
+    return financial_data, technical_data, fundamental_ratios, peer_comparison
+
+# Figures the quantitative narrative is written around; a cached narrative is only reused while they hold
+QUANTITATIVE_KEY_FIGURES = (("financial", "current_price"), ("financial", "pe_ratio"), ("financial", "eps"),
+                            ("financial", "market_cap"), ("technical", "rsi_14"), ("technical", "rsi_signal"),
+                            ("technical", "price_vs_ma20"), ("technical", "price_vs_ma50"))
+
+def _quantitative_key_figures(financial_data: Dict[str, Any], technical_data: Dict[str, Any]) -> Dict[str, Any]:
+    sources = {"financial": financial_data, "technical": technical_data}
+    return {key: sources[source].get(key) for source, key in QUANTITATIVE_KEY_FIGURES}
+
 def run_quantitative_analysis(analysis_state: Dict[str, Any]) -> bool:
     ticker = analysis_state.get("ticker")
     logger.info(f"AGENT: Starting quantitative analysis for {ticker}...")
     try:
-        financial_data = yahoo_finance_tools.get_stock_data(ticker)
-        technical_data = yahoo_finance_tools.get_technical_indicators(ticker)
-        analysis_state["raw_financial_data"] = financial_data
-        analysis_state["raw_technical_data"] = technical_data
+        financial_data, technical_data, fundamental_ratios, peer_comparison = _gather_quantitative_data(analysis_state)
+        cache_scope = f"quantitative_analysis:{ticker}"
+        cache_input = _compact([financial_data, technical_data, fundamental_ratios, peer_comparison])
+        key_figures = _quantitative_key_figures(financial_data, technical_data)
+        cached = semantic_cache.lookup(cache_scope, cache_input, key_figures) if SEMANTIC_CACHE else None
+        if cached is not None:
+            _store_stage_output(analysis_state, cached, "quantitative_analysis", "quantitative_digest", "quantitative")
+            logger.info(f"AGENT: Quantitative analysis for {ticker} reused from a near-identical earlier input.")
+            return True
         
         prompt = f"""
         You are a Senior Quantitative Analyst, with expertise in financial modeling, statistical analysis, and technical analysis. 
@@ -32,15 +134,29 @@ def run_quantitative_analysis(analysis_state: Dict[str, Any]) -> bool:
         ---
         {technical_data}
         ---
+        Here are the financial statement ratios (latest annual statements; margins and growth as fractions):
+        ---
+        {fundamental_ratios}
+        ---
+        Here is the sector peer comparison (peer medians, percentile ranks within the peer group, and value relative to the median):
+        ---
+        {peer_comparison}
+        ---
 
         Based on the data provided, write a professional summary covering:
         1.  **Valuation:** Market Cap, P/E Ratio, and EPS.
         2.  **Profitability:** Comment on the Profit Margin.
         3.  **Technicals:** Interpret the current price relative to its moving averages and RSI.
+        4.  **Financial Health:** Leverage, liquidity and growth, based on the financial statement ratios.
+        5.  **Peer Comparison:** Relative valuation and profitability versus sector peers.
+
+        {digest_instructions("quantitative") if STAGE_DIGESTS else ""}
         """
-        model = genai.GenerativeModel(model_name='gemini-1.5-pro')
-        response = model.generate_content(prompt)
-        analysis_state["quantitative_analysis"] = response.text
+        model = route_model("quantitative_analysis")
+        response = generate_content(model, prompt, "quantitative_analysis", analysis_state.get("lane", "interactive"))
+        _store_stage_output(analysis_state, response.text, "quantitative_analysis", "quantitative_digest", "quantitative")
+        if SEMANTIC_CACHE and "error" not in financial_data:
+            semantic_cache.store(cache_scope, cache_input, response.text, key_figures)
         logger.info(f"AGENT: Quantitative analysis for {ticker} completed successfully.")
         return True
     except Exception as e:
@@ -54,6 +170,13 @@ def run_market_research(analysis_state: Dict[str, Any]) -> bool:
     try:
         news_data = news_api_tools.get_company_news(company_name, ticker)
         analysis_state["raw_news_data"] = news_data
+        cache_scope = f"market_research:{ticker}"
+        cache_input = _compact(news_data)
+        cached = semantic_cache.lookup(cache_scope, cache_input) if SEMANTIC_CACHE else None
+        if cached is not None:
+            _store_stage_output(analysis_state, cached, "market_sentiment_analysis", "market_digest", "market")
+            logger.info(f"AGENT: Market research for {company_name} reused from a near-identical earlier input.")
+            return True
         
     
         prompt = f"""
@@ -72,16 +195,187 @@ def run_market_research(analysis_state: Dict[str, Any]) -> bool:
         - The **Overall Sentiment** (e.g., positive, cautiously optimistic, negative).
         - The **Key Drivers** behind this sentiment, referencing significant news stories.
         - Any **Potential Catalysts** or future events implied by the news.
+
+        {digest_instructions("market") if STAGE_DIGESTS else ""}
         """
-        model = genai.GenerativeModel(model_name='gemini-1.5-pro')
-        response = model.generate_content(prompt)
-        analysis_state["market_sentiment_analysis"] = response.text
+        model = route_model("market_research")
+        response = generate_content(model, prompt, "market_research", analysis_state.get("lane", "interactive"))
+        _store_stage_output(analysis_state, response.text, "market_sentiment_analysis", "market_digest", "market")
+        if SEMANTIC_CACHE and "error" not in news_data:
+            semantic_cache.store(cache_scope, cache_input, response.text)
         logger.info(f"AGENT: Market research for {company_name} completed successfully.")
         return True
     except Exception as e:
         logger.error(f"AGENT: Error during market research for {company_name}: {e}")
         return False
 
+# Keys with no analytical content, dropped from batched prompts to keep them compact
+COMPACT_DROP_KEYS = {"url", "retrieved_at", "data_retrieved_at", "calculated_at"}
+
+def _compact(data: Any) -> str:
+    def strip(value):
+        if isinstance(value, dict):
+            return {k: strip(v) for k, v in value.items()
+                    if k not in COMPACT_DROP_KEYS and v is not None and not (isinstance(v, str) and v in ("", "N/A"))}
+        if isinstance(value, list):
+            return [strip(v) for v in value]
+        return value
+    return json.dumps(strip(data), separators=(",", ":"), default=str)
+
+def _batched_response_format(tickers: List[str], kind: str) -> str:
+    """Response instructions for a batched stage: one entry per ticker, with its digest when digests are on."""
+    if not STAGE_DIGESTS:
+        return (f'Respond with ONLY a JSON object mapping each ticker symbol to its summary string, for example '
+                f'{{"{tickers[0]}": "...", ...}}.')
+    example = {tickers[0]: {"summary": "...", "digest": digest_example(kind)}}
+    return ("Respond with ONLY a JSON object mapping each ticker symbol to an object with its summary string "
+            "under \"summary\" and a compact digest of that summary under \"digest\", matching exactly this "
+            f"structure (no other keys): {json.dumps(example)}")
+
+def _store_batched_output(analysis_state: Dict[str, Any], entry: Any, prose_key: str, digest_key: str, kind: str):
+    """Stores one ticker's entry of a batched response, validating its digest like _store_stage_output."""
+    if isinstance(entry, str):
+        _store_stage_output(analysis_state, entry, prose_key, digest_key, kind)
+        return
+    analysis_state[prose_key] = entry["summary"].strip()
+    if not STAGE_DIGESTS:
+        return
+    try:
+        analysis_state[digest_key] = validate_digest(kind, entry.get("digest"))
+    except ValueError as e:
+        logger.warning(f"⚠️ Invalid {kind} digest for {analysis_state.get('ticker')} ({str(e)}); downstream stages will use the prose")
+
+def _parse_ticker_json(text: str, tickers: List[str]) -> Dict[str, Any]:
+    """
+    Per-ticker entries from a JSON object response (tolerating a Markdown code fence around it):
+    a summary string, or an object with a "summary" string and a "digest".
+    """
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not match:
+        return {}
+    try:
+        parsed = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+    by_ticker = {str(key).upper(): value for key, value in parsed.items()}
+    entries = {}
+    for ticker in tickers:
+        entry = by_ticker.get(ticker)
+        summary = entry.get("summary") if isinstance(entry, dict) else entry
+        if isinstance(summary, str) and summary.strip():
+            entries[ticker] = entry.strip() if isinstance(entry, str) else entry
+    return entries
+
+def run_batched_quantitative_analysis(analysis_states: List[Dict[str, Any]]) -> List[bool]:
+    """
+    Quantitative analysis for several tickers in one request, sending the persona once.
+
+    Every state gets its raw data; quantitative_analysis is only set for tickers the
+    JSON response covers, so the rest fall back to run_quantitative_analysis.
+    """
+    tickers = [state.get("ticker") for state in analysis_states]
+    logger.info(f"AGENT: Starting batched quantitative analysis for {tickers}...")
+    try:
+        blocks = []
+        for state in analysis_states:
+            financial_data, technical_data, fundamental_ratios, peer_comparison = _gather_quantitative_data(state)
+            blocks.append(f"### {state['ticker']}\n" + _compact({
+                "financial_data": financial_data,
+                "technical_indicators": technical_data,
+                "statement_ratios": fundamental_ratios,
+                "peer_comparison": peer_comparison
+            }))
+        ticker_blocks = "\n\n".join(blocks)
+
+        prompt = f"""
+        You are a Senior Quantitative Analyst, with expertise in financial modeling, statistical analysis, and technical analysis.
+        You have a PhD in Finance and 8 years of experience at top-tier investment firms. Your task is to provide an insightful,
+        narrative summary of the financial data for EACH of these stock tickers: {", ".join(tickers)}.
+
+        Do not just list the numbers. For each key metric, provide a brief, italicized *Commentary*
+        on what the number signifies in the context of the company's performance or valuation.
+
+        The data for each ticker is compact JSON (statement ratios are from the latest annual statements,
+        margins and growth as fractions; peer comparison gives peer medians, percentile ranks and value relative to the median):
+        ---
+        {ticker_blocks}
+        ---
+
+        For each ticker, write a professional Markdown summary covering:
+        1.  **Valuation:** Market Cap, P/E Ratio, and EPS.
+        2.  **Profitability:** Comment on the Profit Margin.
+        3.  **Technicals:** Interpret the current price relative to its moving averages and RSI.
+        4.  **Financial Health:** Leverage, liquidity and growth, based on the financial statement ratios.
+        5.  **Peer Comparison:** Relative valuation and profitability versus sector peers.
+
+        {_batched_response_format(tickers, "quantitative")} Use only the data given for that ticker in its summary.
+        """
+        model = route_model("quantitative_analysis_batch")
+        response = generate_content(model, prompt, "quantitative_analysis_batch", analysis_states[0].get("lane", "interactive"))
+        analyses = _parse_ticker_json(response.text, tickers)
+    except Exception as e:
+        logger.error(f"AGENT: Error during batched quantitative analysis for {tickers}: {e}")
+        return [False] * len(analysis_states)
+
+    for state in analysis_states:
+        if state["ticker"] in analyses:
+            _store_batched_output(state, analyses[state["ticker"]], "quantitative_analysis", "quantitative_digest", "quantitative")
+    missing = [ticker for ticker in tickers if ticker not in analyses]
+    if missing:
+        logger.warning(f"AGENT: Batched quantitative analysis returned nothing usable for {missing}; they fall back to single-ticker calls.")
+    logger.info(f"AGENT: Batched quantitative analysis completed for {len(analyses)}/{len(tickers)} tickers.")
+    return [ticker in analyses for ticker in tickers]
+
+def run_batched_market_research(analysis_states: List[Dict[str, Any]]) -> List[bool]:
+    """
+    Market research for several tickers in one request, sending the persona once.
+
+    Every state gets its raw news; market_sentiment_analysis is only set for tickers the
+    JSON response covers, so the rest fall back to run_market_research.
+    """
+    tickers = [state.get("ticker") for state in analysis_states]
+    logger.info(f"AGENT: Starting batched market research for {tickers}...")
+    try:
+        blocks = []
+        for state in analysis_states:
+            news_data = news_api_tools.get_company_news(state.get("company_name"), state["ticker"])
+            state["raw_news_data"] = news_data
+            blocks.append(f"### {state['ticker']} ({state.get('company_name')})\n" + _compact(news_data))
+        ticker_blocks = "\n\n".join(blocks)
+
+        prompt = f"""
+        You are a Senior Market Intelligence Researcher with a background in journalism and financial analysis.
+        You have 10 years of experience tracking market trends, corporate developments, and macroeconomic factors. Your task is to analyze
+        the market sentiment for EACH of these companies, based on its recent news articles (compact JSON per ticker):
+        ---
+        {ticker_blocks}
+        ---
+
+        For each ticker, synthesize its news into a cohesive, narrative paragraph summarizing:
+        - The **Overall Sentiment** (e.g., positive, cautiously optimistic, negative).
+        - The **Key Drivers** behind this sentiment, referencing significant news stories.
+        - Any **Potential Catalysts** or future events implied by the news.
+
+        {_batched_response_format(tickers, "market")} Use only the news given for that ticker in its summary.
+        """
+        model = route_model("market_research_batch")
+        response = generate_content(model, prompt, "market_research_batch", analysis_states[0].get("lane", "interactive"))
+        analyses = _parse_ticker_json(response.text, tickers)
+    except Exception as e:
+        logger.error(f"AGENT: Error during batched market research for {tickers}: {e}")
+        return [False] * len(analysis_states)
+
+    for state in analysis_states:
+        if state["ticker"] in analyses:
+            _store_batched_output(state, analyses[state["ticker"]], "market_sentiment_analysis", "market_digest", "market")
+    missing = [ticker for ticker in tickers if ticker not in analyses]
+    if missing:
+        logger.warning(f"AGENT: Batched market research returned nothing usable for {missing}; they fall back to single-ticker calls.")
+    logger.info(f"AGENT: Batched market research completed for {len(analyses)}/{len(tickers)} tickers.")
+    return [ticker in analyses for ticker in tickers]
+
 def run_risk_assessment(analysis_state: Dict[str, Any]) -> bool:
     print(f"\n[Memory Check] Entering Risk Assessor. State contains keys: {list(analysis_state.keys())}")
     logger.info("AGENT: Starting risk assessment...")
@@ -91,6 +385,15 @@ def run_risk_assessment(analysis_state: Dict[str, Any]) -> bool:
         logger.error("Previous analysis summaries not found in state.")
         return False
 
+    # Realized risk figures computed locally from the cached price history
+    risk_metrics = risk_tools.get_risk_metrics(analysis_state.get("ticker"))
+    analysis_state["risk_metrics"] = risk_metrics
+    price_scenarios = monte_carlo_tools.get_price_scenarios(analysis_state.get("ticker"))
+    analysis_state["price_scenarios"] = price_scenarios
+
+    # Upstream digests stand in for the full narratives to keep this prompt small
+    quantitative_input = _stage_input(analysis_state, "quantitative_analysis", "quantitative_digest")
+    sentiment_input = _stage_input(analysis_state, "market_sentiment_analysis", "market_digest")
 
     prompt = f"""
     You are a Senior Risk Assessment Specialist with 12 years of experience in investment risk management. 
@@ -102,23 +405,37 @@ def run_risk_assessment(analysis_state: Dict[str, Any]) -> bool:
 
     Here is the Quantitative Analysis:
     ---
-    {quantitative_summary}
+    {quantitative_input}
     ---
     Here is the Market Sentiment Analysis:
     ---
-    {sentiment_summary}
+    {sentiment_input}
+    ---
+    Here are the Quantitative Risk Metrics computed from the price history
+    (daily log returns; volatility, returns and downside deviation are annualized; VaR/CVaR are one-day losses):
+    ---
+    {risk_metrics}
+    ---
+    Here are Monte Carlo Price Scenarios (GBM and block-bootstrap of historical returns; percentile
+    price bands and probability of loss per horizon in trading days):
+    ---
+    {price_scenarios}
     ---
 
-    Based on both reports, provide a detailed risk assessment covering:
+    Based on both reports and the risk metrics, provide a detailed risk assessment covering:
     1.  **Financial Risks:** Focus on valuation concerns (like a high P/E ratio) and financial stability.
-    2.  **Market Risks:** Analyze how market sentiment and broader trends could impact the stock.
+    2.  **Market Risks:** Analyze how market sentiment and broader trends could impact the stock. Cite the
+        volatility, maximum drawdown, VaR/CVaR and beta figures exactly as given in the risk metrics, and the
+        downside price bands and probability of loss from the price scenarios.
     3.  **Operational & Business Model Risks:** Identify key business challenges or competitive threats.
     4.  **Conclude with an Overall Risk Rating** (e.g., Low, Moderate, Elevated) and list the top 3 key risk factors.
+
+    {digest_instructions("risk") if STAGE_DIGESTS else ""}
     """
-    model = genai.GenerativeModel(model_name='gemini-1.5-pro')
+    model = route_model("risk_assessment")
     try:
-        response = model.generate_content(prompt)
-        analysis_state["risk_assessment"] = response.text
+        response = generate_content(model, prompt, "risk_assessment", analysis_state.get("lane", "interactive"))
+        _store_stage_output(analysis_state, response.text, "risk_assessment", "risk_digest", "risk")
         logger.info("AGENT: Risk assessment completed successfully.")
         return True
     except Exception as e:
@@ -131,6 +448,7 @@ def run_report_writing(analysis_state: Dict[str, Any]) -> bool:
     quantitative_summary = analysis_state.get("quantitative_analysis")
     sentiment_summary = analysis_state.get("market_sentiment_analysis")
     risk_summary = analysis_state.get("risk_assessment")
+    price_scenarios = analysis_state.get("price_scenarios", "Not available")
     current_date = analysis_state.get("current_date")
     company_name = analysis_state.get("company_name")
     ticker = analysis_state.get("ticker")
@@ -138,6 +456,24 @@ def run_report_writing(analysis_state: Dict[str, Any]) -> bool:
         logger.error("Missing one or more analysis components in state for report writing.")
         return False
 
+    # Digests by default; prose only for the stages whose wording the report carries over
+    quantitative_input = _stage_input(analysis_state, "quantitative_analysis", "quantitative_digest", "quantitative" in REPORT_PROSE_STAGES)
+    sentiment_input = _stage_input(analysis_state, "market_sentiment_analysis", "market_digest", "market" in REPORT_PROSE_STAGES)
+    risk_input = _stage_input(analysis_state, "risk_assessment", "risk_digest", "risk" in REPORT_PROSE_STAGES)
+    if risk_input != risk_summary and analysis_state.get("risk_metrics"):
+        # The risk prose cites the computed figures; with only the digest they are passed directly
+        risk_input += "\nRisk metrics: " + _compact(analysis_state["risk_metrics"])
+
+    if PARALLEL_REPORT_SECTIONS:
+        try:
+            analysis_state["draft_report"] = _write_report_sections(
+                analysis_state, quantitative_input, sentiment_input, risk_input, price_scenarios
+            )
+            logger.info("AGENT: Draft report generated successfully (section-parallel).")
+            return True
+        except Exception as e:
+            logger.warning(f"AGENT: Section-parallel report writing failed ({e}); writing the report in one pass.")
+
     prompt = f"""
     You are a Senior Investment Report Writer for a top-tier investment firm, known for your
     clear, insightful, and professional analysis. You have 8 years of experience 
@@ -152,17 +488,22 @@ def run_report_writing(analysis_state: Dict[str, Any]) -> bool:
 
     1. Quantitative Analysis:
     ---
-    {quantitative_summary}
+    {quantitative_input}
     ---
 
     2. Market Sentiment Analysis:
     ---
-    {sentiment_summary}
+    {sentiment_input}
     ---
 
     3. Risk Assessment:
     ---
-    {risk_summary}
+    {risk_input}
+    ---
+
+    4. Monte Carlo Price Scenarios:
+    ---
+    {price_scenarios}
     ---
 
     **Instructions for Report Generation:**
@@ -179,6 +520,7 @@ def run_report_writing(analysis_state: Dict[str, Any]) -> bool:
     3.  **Market Sentiment Analysis:** Present the narrative summary of market sentiment.
 
     4.  **Risk Assessment:** Detail the primary risks, organized by category, and state the overall risk rating.
+        Cite the 5th-95th percentile price range and probability of loss from the price scenarios.
 
     5.  **Investment Thesis and Rationale:** This is the most important section. Write a detailed,
         convincing argument for your final recommendation. Synthesize all the points—quantitative strengths,
@@ -192,9 +534,9 @@ def run_report_writing(analysis_state: Dict[str, Any]) -> bool:
     - Ensure the report flows logically and reads as if written by a single, expert author.
     - Do not include any placeholders like '[Your Firm Name]'.
     """
-    model = genai.GenerativeModel(model_name='gemini-1.5-pro')
+    model = route_model("report_writing")
     try:
-        response = model.generate_content(prompt)
+        response = generate_content(model, prompt, "report_writing", analysis_state.get("lane", "interactive"))
         analysis_state["draft_report"] = response.text
         logger.info("AGENT: Draft report generated successfully.")
         return True
@@ -202,6 +544,85 @@ def run_report_writing(analysis_state: Dict[str, Any]) -> bool:
         logger.error(f"AGENT: Error during report writing: {e}")
         return False
 
+# Section title -> what the section must cover; sections are generated concurrently and stitched in this order
+REPORT_SECTIONS = [
+    ("Executive Summary", "A concise, high-level overview. State the recommendation upfront and briefly justify it "
+                          "with the key findings."),
+    ("Quantitative Analysis", "The quantitative findings. For each key metric, include the brief, italicized "
+                              "*Commentary* provided in the source analysis."),
+    ("Market Sentiment Analysis", "A narrative summary of market sentiment: overall mood, key drivers and catalysts."),
+    ("Risk Assessment", "The primary risks, organized by category, and the overall risk rating. Cite the 5th-95th "
+                        "percentile price range and probability of loss from the price scenarios."),
+    ("Investment Thesis and Rationale", "The most important section: a detailed, convincing argument for the "
+                                        "recommendation that synthesizes quantitative strengths, market mood and risks."),
+    ("Conclusion and Next Steps", "A brief summary and actionable next steps or key factors for an investor to monitor.")
+]
+
+def _write_report_sections(analysis_state: Dict[str, Any], quantitative_input: str, sentiment_input: str,
+                           risk_input: str, price_scenarios: Any) -> str:
+    """
+    Writes the report's sections as concurrent LLM calls and stitches them together.
+
+    The recommendation comes from the locally computed investment score, so the sections
+    that depend on it (summary, thesis, conclusion) need not wait for the others, and
+    wall-clock time is set by the longest section.
+    """
+    company_name, ticker = analysis_state.get("company_name"), analysis_state.get("ticker")
+    investment_score = calculate_investment_score(
+        analysis_state.get("raw_financial_data", {}), analysis_state.get("raw_news_data", {})
+    )
+    analysis_state["investment_score"] = investment_score
+    recommendation = f"{investment_score['recommendation']} (proprietary score {investment_score['total_score']}/10)"
+
+    sources = {
+        "Quantitative Analysis": quantitative_input,
+        "Market Sentiment Analysis": sentiment_input,
+        "Risk Assessment": f"{risk_input}\nMonte Carlo price scenarios: {price_scenarios}"
+    }
+
+    def write(title: str, brief: str) -> str:
+        # A section's own source in full; every other section works from all three
+        context = {title: sources[title]} if title in sources else sources
+        source_text = "\n\n".join(f"{name}:\n---\n{text}\n---" for name, text in context.items())
+        prompt = f"""
+        You are a Senior Investment Report Writer for a top-tier investment firm, writing one section of an
+        institutional investment report on **{company_name} ({ticker})**, dated {analysis_state.get("current_date")}.
+        The firm's recommendation is **{recommendation}**; the section must be consistent with it.
+
+        Source information:
+        {source_text}
+
+        Write ONLY the body of the section "{title}": {brief}
+        Adopt a formal, institutional tone. Do not repeat the section heading, do not write other sections,
+        and do not include any placeholders like '[Your Firm Name]'.
+        """
+        model = route_model("report_section")
+        return generate_content(model, prompt, "report_section", analysis_state.get("lane", "interactive")).text
+
+    deadline = current_deadline()
+    def run(title: str, brief: str) -> str:
+        if deadline is None:
+            return write(title, brief)
+        with deadline.active():
+            return write(title, brief)
+
+    with ThreadPoolExecutor(max_workers=len(REPORT_SECTIONS)) as executor:
+        futures = [executor.submit(run, title, brief) for title, brief in REPORT_SECTIONS]
+        bodies = [future.result() for future in futures]
+
+    sections = [f"## {number}. {title}\n\n{_normalize_section(body, title)}"
+                for number, ((title, _), body) in enumerate(zip(REPORT_SECTIONS, bodies), start=1)]
+    return f"**Date:** {analysis_state.get('current_date')}\n\n**Recommendation:** {recommendation}\n\n" + "\n\n".join(sections)
+
+def _normalize_section(body: str, title: str) -> str:
+    """Strips fences and an echoed heading, and demotes headings so each section nests under its own."""
+    body = re.sub(r"^```(?:markdown)?\s*|\s*```$", "", body.strip())
+    lines = body.splitlines()
+    if lines and lines[0].lstrip("#* ").rstrip("*: ").lower().endswith(title.lower()):
+        lines = lines[1:]
+    lines = [("###" + line.lstrip("#")) if re.match(r"^#{1,2}\s", line) else line for line in lines]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
 def run_compliance_validation(analysis_state: Dict[str, Any]) -> bool:
     print(f"\n[Memory Check] Entering Compliance Validator. State contains keys: {list(analysis_state.keys())}")
     logger.info("AGENT: Starting compliance validation and fact-checking...")
@@ -210,28 +631,51 @@ def run_compliance_validation(analysis_state: Dict[str, Any]) -> bool:
     if not draft_report or not raw_financial_data:
         logger.error("Draft report or raw financial data not found in state.")
         return False
-    prompt = f"""
-    You are a Senior Compliance Validator with expertise in financial regulations
-    and quality assurance. with 10 years of experience in financial services compliance and quality assurance. You hold Series 7, 66, 
-    and 24 licenses and have deep knowledge of investment advisory regulations.
-    Your task is to perform a final review of the investment report provided below.
-    Your review must focus on two critical areas:
-    1. Factual Accuracy (Hallucination Check): Cross-reference the financial metrics mentioned in the report's text against the raw data provided. Ensure that values like P/E Ratio, Market Cap, EPS, etc., in the report are IDENTICAL to the raw data. Correct any inconsistencies.
-    2. Compliance and Formatting: Ensure the report includes a proper disclaimer, is professionally formatted, and is free of any placeholder text like '[Your Firm Name]'.
-    Here is the Raw Financial Data for fact-checking:
-    ---
-    {raw_financial_data}
-    ---
-    Here is the Draft Report to be validated:
-    ---
-    {draft_report}
-    ---
-    Return the final, validated, and corrected version of the report. The output
-    should be only the clean, final report text.
-    """
-    model = genai.GenerativeModel(model_name='gemini-1.5-pro')
+
     try:
-        response = model.generate_content(prompt)
+        # Figures and the disclaimer are fixed locally; the LLM review only runs for what that cannot fix
+        unresolved_section = ""
+        if LOCAL_FACT_CHECK:
+            fact_check = fact_checker.validate(
+                draft_report, raw_financial_data,
+                analysis_state.get("company_name", ""), analysis_state.get("ticker", ""), analysis_state.get("current_date", "")
+            )
+            analysis_state["fact_check"] = {key: fact_check[key] for key in ("claims_checked", "corrections", "unresolved")}
+            draft_report = fact_check["report"]
+            if not fact_check["unresolved"]:
+                analysis_state["final_report"] = draft_report
+                logger.info("AGENT: Compliance validation completed locally (no LLM review needed).")
+                return True
+            issues = "\n".join(f"- {issue}" for issue in fact_check["unresolved"])
+            unresolved_section = f"""
+        An automated fact-checker has already corrected the figures it could match to the raw data and inserted
+        the standard disclaimer (keep it unchanged). Resolve these remaining issues it could not fix:
+        {issues}
+        """
+            logger.info(f"AGENT: Local fact check left {len(fact_check['unresolved'])} issues for the LLM review.")
+
+        prompt = f"""
+        You are a Senior Compliance Validator with expertise in financial regulations
+        and quality assurance. with 10 years of experience in financial services compliance and quality assurance. You hold Series 7, 66, 
+        and 24 licenses and have deep knowledge of investment advisory regulations.
+        Your task is to perform a final review of the investment report provided below.
+        Your review must focus on two critical areas:
+        1. Factual Accuracy (Hallucination Check): Cross-reference the financial metrics mentioned in the report's text against the raw data provided. Ensure that values like P/E Ratio, Market Cap, EPS, etc., in the report are IDENTICAL to the raw data. Correct any inconsistencies.
+        2. Compliance and Formatting: Ensure the report includes a proper disclaimer, is professionally formatted, and is free of any placeholder text like '[Your Firm Name]'.
+        Here is the Raw Financial Data for fact-checking:
+        ---
+        {_compact(raw_financial_data)}
+        ---
+        {unresolved_section}
+        Here is the Draft Report to be validated:
+        ---
+        {draft_report}
+        ---
+        Return the final, validated, and corrected version of the report. The output
+        should be only the clean, final report text.
+        """
+        model = route_model("compliance_validation")
+        response = generate_content(model, prompt, "compliance_validation", analysis_state.get("lane", "interactive"))
         analysis_state["final_report"] = response.text
         logger.info("AGENT: Compliance validation completed successfully.")
         return True
@@ -7,5 +7,136 @@ load_dotenv(dotenv_path=dotenv_path)
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
-if not GOOGLE_API_KEY or not NEWS_API_KEY:
-    raise ValueError("API keys for Google and NewsAPI must be set in the .env file in the root project directory.")
\ No newline at end of file
+# LLM backend: 'gemini' (Google AI API) or 'standin' (local stand-in server, see standin_server.py)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-1.5-pro")
+LLM_STANDIN_URL = os.getenv("LLM_STANDIN_URL", "http://127.0.0.1:8765")
+
+if not NEWS_API_KEY or (LLM_BACKEND == "gemini" and not GOOGLE_API_KEY):
+    raise ValueError("API keys for Google and NewsAPI must be set in the .env file in the root project directory.")
+
+# Number of top-ranked tickers from a screened universe sent to the LLM pipeline
+SCREENER_TOP_K = int(os.getenv("SCREENER_TOP_K", "5"))
+
+# Seconds a downloaded price history is reused before it is fetched again
+PRICE_CACHE_TTL_SECONDS = int(os.getenv("PRICE_CACHE_TTL_SECONDS", "900"))
+
+# Directory for on-disk caches (relative to the working directory, like outputs/)
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+
+# The nightly run compacts the shared price store once superseded rows exceed this fraction of its files
+PRICE_STORE_COMPACT_DEAD_RATIO = float(os.getenv("PRICE_STORE_COMPACT_DEAD_RATIO", "0.5"))
+
+# Financial statements change quarterly, so they are cached for a long time
+FUNDAMENTALS_CACHE_TTL_SECONDS = int(os.getenv("FUNDAMENTALS_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Candidate peers for sector comparison (comma-separated tickers)
+PEER_UNIVERSE = [t.strip().upper() for t in os.getenv("PEER_UNIVERSE", ",".join([
+    "AAPL", "MSFT", "NVDA", "GOOGL", "META", "AMZN", "TSLA", "ORCL", "CRM", "ADBE", "AMD", "INTC", "CSCO", "IBM", "QCOM", "AVGO",
+    "JPM", "BAC", "WFC", "GS", "MS", "C", "V", "MA", "AXP", "BLK",
+    "JNJ", "PFE", "MRK", "ABBV", "LLY", "UNH", "TMO", "ABT", "BMY", "AMGN",
+    "XOM", "CVX", "COP", "SLB", "EOG",
+    "WMT", "COST", "HD", "MCD", "NKE", "SBUX", "LOW", "TGT",
+    "PG", "KO", "PEP", "PM", "MO", "CL",
+    "BA", "CAT", "GE", "HON", "UPS", "LMT", "DE",
+    "DIS", "NFLX", "CMCSA", "T", "VZ",
+    "NEE", "DUK", "SO", "AMT", "PLD", "LIN", "APD"
+])).split(",") if t.strip()]
+
+# Ticker metadata (name, sector, industry) rarely changes; peer metrics move daily
+METADATA_CACHE_TTL_SECONDS = int(os.getenv("METADATA_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+PEER_SNAPSHOT_TTL_SECONDS = int(os.getenv("PEER_SNAPSHOT_TTL_SECONDS", str(24 * 3600)))
+
+# Listed symbols are refreshed in bulk from the exchange symbol directories
+SYMBOL_INDEX_TTL_SECONDS = int(os.getenv("SYMBOL_INDEX_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Shared job queue and report store for distributed (worker.py) runs
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", os.path.join(CACHE_DIR, "jobs.sqlite3"))
+JOB_VISIBILITY_TIMEOUT_SECONDS = int(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", "900"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+REPORT_STORE_DIR = os.getenv("REPORT_STORE_DIR", "outputs")
+
+# Adaptive concurrency per provider: (initial, maximum) in-flight requests
+PROVIDER_CONCURRENCY = {
+    "yfinance": (int(os.getenv("YFINANCE_INITIAL_CONCURRENCY", "4")), int(os.getenv("YFINANCE_MAX_CONCURRENCY", "32"))),
+    "newsapi": (int(os.getenv("NEWSAPI_INITIAL_CONCURRENCY", "2")), int(os.getenv("NEWSAPI_MAX_CONCURRENCY", "8"))),
+    "gemini": (int(os.getenv("GEMINI_INITIAL_CONCURRENCY", "2")), int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))),
+}
+
+# Circuit breakers: consecutive provider failures before failing fast, and seconds before a recovery probe
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT_SECONDS = float(os.getenv("CIRCUIT_RESET_TIMEOUT_SECONDS", "30"))
+
+# Continue on cached or partial data when a provider or stage fails, instead of aborting the ticker
+CONTINUE_ON_PARTIAL_DATA = os.getenv("CONTINUE_ON_PARTIAL_DATA", "true").lower() == "true"
+
+# Per-ticker latency budget in seconds (0 disables); compliance polishing is skipped when less than its minimum remains
+ANALYSIS_DEADLINE_SECONDS = float(os.getenv("ANALYSIS_DEADLINE_SECONDS", "180"))
+# Queued worker jobs have nobody waiting on them and run on the batch lane behind interactive quota,
+# so they get a longer budget instead of being cut down to degraded reports
+BATCH_ANALYSIS_DEADLINE_SECONDS = float(os.getenv("BATCH_ANALYSIS_DEADLINE_SECONDS", "900"))
+COMPLIANCE_MIN_BUDGET_SECONDS = float(os.getenv("COMPLIANCE_MIN_BUDGET_SECONDS", "30"))
+
+# Gemini calls: per-request timeout, attempts for transient failures, and hedging after the stage's
+# latency percentile once enough calls have been observed (LLM_HEDGE_PERCENTILE=0 disables hedging)
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "1.0"))
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+# Process-wide Gemini quota shared by every stage and ticker (divide between worker processes sharing a key)
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+LLM_OUTPUT_TOKEN_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKEN_ESTIMATE", "1500"))
+
+# Opt-in: tickers packed into one batched quantitative / market research request for a watchlist (0 or 1 disables)
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "0"))
+
+# Quant, market and risk stages also emit a schema-checked JSON digest; later stages read the digest
+# instead of the prose, except for the stages listed here whose prose the report quotes
+STAGE_DIGESTS = os.getenv("STAGE_DIGESTS", "true").lower() == "true"
+REPORT_PROSE_STAGES = [s.strip() for s in os.getenv("REPORT_PROSE_STAGES", "quantitative").split(",") if s.strip()]
+
+# Compliance: figures and the disclaimer are checked locally; the LLM pass only runs for issues the checker cannot fix
+LOCAL_FACT_CHECK = os.getenv("LOCAL_FACT_CHECK", "true").lower() == "true"
+DISCLAIMER_TEMPLATE_PATH = os.getenv("DISCLAIMER_TEMPLATE_PATH", "")
+
+# Opt-in: write the six report sections as concurrent LLM calls, with the recommendation taken from the local score
+PARALLEL_REPORT_SECTIONS = os.getenv("PARALLEL_REPORT_SECTIONS", "false").lower() == "true"
+
+# Model tiers, fastest first, and the tier each LLM stage uses ("stage=tier,..."; unlisted stages use the last tier)
+LLM_FAST_MODEL = os.getenv("LLM_FAST_MODEL", "gemini-1.5-flash")
+LLM_QUALITY_MODEL = os.getenv("LLM_QUALITY_MODEL", LLM_MODEL)
+LLM_MODEL_TIERS = {"fast": LLM_FAST_MODEL, "quality": LLM_QUALITY_MODEL}
+STAGE_MODEL_TIERS = dict(
+    pair.strip().split("=", 1) for pair in os.getenv("STAGE_MODEL_TIERS", ",".join([
+        "quantitative_analysis=fast", "market_research=fast", "quantitative_analysis_batch=fast", "market_research_batch=fast",
+        "risk_assessment=quality", "report_writing=quality", "report_section=quality", "compliance_validation=quality"
+    ])).split(",") if "=" in pair
+)
+
+# A stage falls back to a faster tier when its model's p95 latency exceeds this share of the stage's
+# remaining budget or its recent error rate is too high; an avoided model is retried after LLM_ROUTING_PROBE_SECONDS
+LLM_ROUTING_BUDGET_SHARE = float(os.getenv("LLM_ROUTING_BUDGET_SHARE", "0.5"))
+LLM_ROUTING_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTING_MAX_ERROR_RATE", "0.25"))
+LLM_ROUTING_MIN_SAMPLES = int(os.getenv("LLM_ROUTING_MIN_SAMPLES", "5"))
+LLM_ROUTING_PROBE_SECONDS = float(os.getenv("LLM_ROUTING_PROBE_SECONDS", "60"))
+
+# Quantitative and market research responses are reused when the stage's input data is nearly identical
+# (cosine similarity of hashed n-gram fingerprints) to an input answered within the max age
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "true").lower() == "true"
+SEMANTIC_CACHE_SIMILARITY = float(os.getenv("SEMANTIC_CACHE_SIMILARITY", "0.95"))
+SEMANTIC_CACHE_MAX_AGE_SECONDS = float(os.getenv("SEMANTIC_CACHE_MAX_AGE_SECONDS", str(6 * 3600)))
+SEMANTIC_CACHE_ENTRIES = int(os.getenv("SEMANTIC_CACHE_ENTRIES", "8"))
+# A hit also requires the key figures (price, P/E, EPS, market cap, RSI) within this relative tolerance of the
+# cached input and the technical signals unchanged, since similarity alone barely moves when a few numbers do
+SEMANTIC_CACHE_KEY_TOLERANCE = float(os.getenv("SEMANTIC_CACHE_KEY_TOLERANCE", "0.02"))
+
+# Final reports are cached per ticker: served as is within the freshness window while the price and news
+# have not moved past the thresholds, otherwise served stale (up to the max age) while they are regenerated
+REPORT_CACHE = os.getenv("REPORT_CACHE", "true").lower() == "true"
+REPORT_CACHE_FRESH_SECONDS = float(os.getenv("REPORT_CACHE_FRESH_SECONDS", "3600"))
+REPORT_CACHE_MAX_STALE_SECONDS = float(os.getenv("REPORT_CACHE_MAX_STALE_SECONDS", str(24 * 3600)))
+REPORT_CACHE_PRICE_MOVE = float(os.getenv("REPORT_CACHE_PRICE_MOVE", "0.02"))
+REPORT_CACHE_NEWS_CHANGE = float(os.getenv("REPORT_CACHE_NEWS_CHANGE", "0.3"))
\ No newline at end of file
@@ -1,13 +1,19 @@
 import logging
 import os
-import google.generativeai as genai
+import re
+import tempfile
 from datetime import datetime
+from typing import Any, Dict, List, Optional
 from concurrent.futures import ThreadPoolExecutor
 
 # Import our custom modules
 from utils.logging_setup import setup_logging
-from config import GOOGLE_API_KEY
+from config import (SCREENER_TOP_K, REPORT_STORE_DIR, CONTINUE_ON_PARTIAL_DATA,
+                    ANALYSIS_DEADLINE_SECONDS, COMPLIANCE_MIN_BUDGET_SECONDS, LLM_BATCH_SIZE, REPORT_CACHE)
 from agents.financial_agent_functions import (
+    run_stages,
+    run_batched_quantitative_analysis,
+    run_batched_market_research,
     run_quantitative_analysis,
     run_market_research,
     run_risk_assessment,
@@ -15,76 +21,222 @@ from agents.financial_agent_functions import (
     run_compliance_validation
 )
 from tools.custom_tools import calculate_investment_score
+from tools.fact_checker import fact_checker
+from tools.screener_tools import universe_screener
+from tools.portfolio_tools import PortfolioAnalytics
 from tools.market_data_tools import yahoo_finance_tools # Needed to get company name
+from tools.news_tools import news_api_tools
+from tools.symbol_index import symbol_index
+from utils.concurrency import concurrency_snapshot
+from utils.circuit_breaker import circuit_snapshot
+from utils.deadline import Deadline
+from utils.llm_client import llm_client
+from utils.llm_scheduler import llm_scheduler
+from utils.model_router import model_router
+from utils.semantic_cache import semantic_cache
+from utils.report_cache import data_fingerprint, report_cache
+
+# Stands in for a stage whose data provider was unavailable, so the report says so instead of guessing
+PARTIAL_DATA_NOTE = ("{section} is unavailable for this report because an upstream data provider "
+                     "was unreachable. Treat conclusions that depend on it as provisional.")
 
 def main():
     """
     Main orchestrator function for the ADK-based investment analysis workflow.
     """
     logger = setup_logging()
-    genai.configure(api_key=GOOGLE_API_KEY)
     
     logger.info("ADK Investment Analysis System - Initiated")
     
     # User Input
-    ticker = input("\n Enter stock ticker (or press Enter for 'AAPL'): ").strip().upper()
-    if not ticker:
-        ticker = "AAPL"
-    
-    # Get the full company name
-    try:
-        company_name = yahoo_finance_tools.get_stock_data(ticker).get('company_name', ticker)
-    except Exception:
-        company_name = ticker
-        
-    logger.info(f"Starting analysis for: {company_name} ({ticker})")
-    
-    # Initialize the State (Memory)
-    analysis_state = {
+    user_input = input("\n Enter stock ticker, or a comma-separated universe to screen (or press Enter for 'AAPL'): ").strip().upper()
+    tickers = [t.strip() for t in user_input.split(",") if t.strip()] or ["AAPL"]
+
+    # Validate against the local symbol index before spending any API calls
+    for ticker in list(tickers):
+        if not symbol_index.is_known(ticker):
+            suggestions = [entry["ticker"] for entry in symbol_index.search(ticker)]
+            logger.warning(f"⚠️ Unknown ticker '{ticker}' skipped. Did you mean: {suggestions}?")
+            tickers.remove(ticker)
+    if not tickers:
+        logger.error("No valid tickers to analyze. Aborting workflow.")
+        return
+
+    # Screen a universe locally so only the top-K names reach the LLM pipeline; sentiment comes from the
+    # last cached news per ticker (no API calls), and tickers without any are screened as Neutral
+    if len(tickers) > 1:
+        logger.info(f"--- Screening {len(tickers)} tickers ---")
+        tickers = universe_screener.screen_universe(tickers, SCREENER_TOP_K, news_api_tools.cached_sentiments(tickers))
+
+    # Whole-book risk view across the selected watchlist
+    if len(tickers) > 1:
+        logger.info("--- Running Portfolio Analytics ---")
+        portfolio = PortfolioAnalytics(tickers).load().analyze()
+        for warning in portfolio.get("concentration_warnings", []):
+            logger.warning(f"⚠️ {warning}")
+        logger.info(f"Portfolio volatility: {portfolio.get('portfolio_volatility')}, "
+                    f"clusters: {portfolio.get('correlation_clusters')}")
+
+    # Reports still fresh in the report cache skip the pipeline; stale ones are served and refreshed in the background
+    if REPORT_CACHE:
+        tickers = [ticker for ticker in tickers if not serve_cached_report(ticker, logger)]
+
+    # Opt-in: pack the first two stages of several tickers into shared requests
+    prepared = {}
+    if LLM_BATCH_SIZE > 1 and len(tickers) > 1:
+        prepared = prepare_batched_states(tickers, logger)
+
+    for ticker in tickers:
+        analyze_ticker(ticker, logger, analysis_state=prepared.get(ticker))
+    # Let background refreshes of stale reports finish updating the cache; they print nothing
+    report_cache.wait()
+
+    for provider, stats in concurrency_snapshot().items():
+        logger.info(f"Concurrency [{provider}]: limit {stats['limit']}, {stats['requests']} requests, "
+                    f"{stats['throttled']} throttled, p95 latency {stats['latency_p95']}s")
+    for stage, stats in llm_client.latencies.snapshot().items():
+        logger.info(f"LLM [{stage}]: {stats['calls']} calls, p50 {stats['latency_p50']}s, p95 {stats['latency_p95']}s, "
+                    f"p99 {stats['latency_p99']}s, {stats['retries']} retries, {stats['hedges']} hedges ({stats['hedge_wins']} won)")
+    quota = llm_scheduler.snapshot()
+    for lane, stats in quota["lanes"].items():
+        if stats["granted"]:
+            logger.info(f"LLM quota [{lane}]: {stats['granted']} requests, ~{stats['tokens']} tokens, "
+                        f"{stats['wait_seconds']}s waiting for quota")
+    for model, stats in model_router.snapshot().items():
+        logger.info(f"LLM model [{model}]: {stats['calls']} calls, {stats['error_rate']:.0%} errors, "
+                    f"p95 {stats['latency_p95']}s, {stats['fallbacks']} stage calls routed to a faster tier")
+    reuse = semantic_cache.snapshot()
+    if reuse["hits"] or reuse["misses"]:
+        logger.info(f"Semantic cache: {reuse['hits']} responses reused, {reuse['misses']} generated")
+    for provider, stats in circuit_snapshot().items():
+        if stats["opened"] or stats["rejected"]:
+            logger.warning(f"⚠️ Circuit [{provider}]: {stats['state']}, opened {stats['opened']} times, "
+                           f"{stats['rejected']} calls rejected")
+
+def resolve_company_name(ticker: str) -> str:
+    """Company name for a ticker, as used for the news search."""
+    # Resolve the company name locally; only unknown symbols fall back to Yahoo Finance
+    company_name = symbol_index.get_company_name(ticker)
+    if not company_name:
+        try:
+            company_name = yahoo_finance_tools.get_stock_data(ticker).get('company_name', ticker)
+        except Exception:
+            company_name = ticker
+    return company_name
+
+def initial_state(ticker: str, lane: str = "interactive") -> Dict[str, Any]:
+    """
+    Fresh analysis state (memory) for a ticker.
+    """
+    return {
         "ticker": ticker,
-        "company_name": company_name,
-        "current_date": datetime.now().strftime("%B %d, %Y")
+        "company_name": resolve_company_name(ticker),
+        "current_date": datetime.now().strftime("%B %d, %Y"),
+        "lane": lane
     }
+
+def prepare_batched_states(tickers: List[str], logger: logging.Logger, lane: str = "interactive") -> Dict[str, Dict[str, Any]]:
+    """
+    Runs quantitative analysis and market research for a watchlist in batched requests of
+    LLM_BATCH_SIZE tickers. Returns the prepared state per ticker; analyze_ticker runs the
+    single-ticker stage for anything a batch did not cover.
+    """
+    states = {ticker: initial_state(ticker, lane) for ticker in tickers}
+    batches = [list(states.values())[i:i + LLM_BATCH_SIZE] for i in range(0, len(tickers), LLM_BATCH_SIZE)]
+    logger.info(f"--- Batched Data Gathering: {len(tickers)} tickers in {len(batches)} batches ---")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # The two stages write different keys, so they can share the state dicts
+        for batch in batches:
+            quant_future = executor.submit(run_batched_quantitative_analysis, batch)
+            market_future = executor.submit(run_batched_market_research, batch)
+            quant_future.result()
+            market_future.result()
+    return states
+
+def analyze_ticker(ticker: str, logger: logging.Logger,
+                   deadline_seconds: float = ANALYSIS_DEADLINE_SECONDS, lane: str = "interactive",
+                   analysis_state: Optional[Dict[str, Any]] = None, print_report: bool = True) -> Optional[str]:
+    """
+    Runs the full agent pipeline for a single ticker and saves its report.
+
+    Every stage runs against one deadline of deadline_seconds (0 disables it). When the
+    budget runs out, the remaining stages are skipped and a degraded report is built from
+    whatever the analysis state holds. The lane ('interactive' or 'batch') sets the
+    run's priority for Gemini quota. A state prepared by prepare_batched_states skips
+    the stages it already holds. Background refreshes pass print_report=False, so they
+    only update the saved report and the report cache.
+
+    Returns the path of the saved report, or None if a stage failed.
+    """
+    deadline = Deadline(deadline_seconds) if deadline_seconds > 0 else None
+
+    # Initialize the State (Memory)
+    if analysis_state is None:
+        analysis_state = initial_state(ticker, lane)
+    company_name = analysis_state["company_name"]
+    logger.info(f"Starting analysis for: {company_name} ({ticker})")
     
-    # Parallel Execution for Data Gathering
+    # Parallel Execution for Data Gathering (stages a batched request already covered are skipped)
     logger.info("--- Starting Parallel Data Gathering ---")
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        
-        quant_future = executor.submit(run_quantitative_analysis, analysis_state)
-        market_future = executor.submit(run_market_research, analysis_state)
-        
-        quant_success = quant_future.result()
-        market_success = market_future.result()
-
-    if not (quant_success and market_success):
+    pending = [stage for stage, key in ((run_quantitative_analysis, "quantitative_analysis"),
+                                        (run_market_research, "market_sentiment_analysis"))
+               if key not in analysis_state]
+    if pending:
+        run_stages(pending, analysis_state, deadline)
+    quant_success = "quantitative_analysis" in analysis_state
+    market_success = "market_sentiment_analysis" in analysis_state
+
+    # Out of time: skip the remaining LLM stages and report whatever the state holds
+    degraded = deadline is not None and deadline.expired()
+    partial = not (quant_success and market_success)
+    if partial and not degraded and (not (quant_success or market_success) or not CONTINUE_ON_PARTIAL_DATA):
         logger.error("Data gathering failed. Aborting workflow.")
-        return
+        return None
+    if degraded:
+        logger.warning("⚠️ Deadline reached during data gathering, producing a degraded report.")
+    elif not quant_success:
+        logger.warning("⚠️ Quantitative analysis unavailable, continuing with partial data.")
+        analysis_state["quantitative_analysis"] = PARTIAL_DATA_NOTE.format(section="Quantitative analysis")
+    elif not market_success:
+        logger.warning("⚠️ Market research unavailable, continuing with partial data.")
+        analysis_state["market_sentiment_analysis"] = PARTIAL_DATA_NOTE.format(section="Market sentiment analysis")
     logger.info("--- Parallel Data Gathering Complete ---")
 
     # Sequential Execution
     logger.info("--- Starting Sequential Analysis & Synthesis ---")
-    
-    # Run Risk Assessment
-    if not run_risk_assessment(analysis_state):
-        logger.error("Risk assessment failed. Aborting workflow.")
-        return
+    sequential_stages = [
+        (run_risk_assessment, "Risk assessment"),
+        (run_report_writing, "Report writing"),
+        (run_compliance_validation, "Compliance validation")  # Hallucination check
+    ]
+    for stage, name in sequential_stages:
+        if degraded:
+            break
+        if stage is run_compliance_validation and deadline is not None and deadline.remaining() < COMPLIANCE_MIN_BUDGET_SECONDS:
+            logger.warning(f"⚠️ Only {deadline.remaining():.0f}s left, skipping compliance validation.")
+            degraded = True
+            break
+        if not run_stages([stage], analysis_state, deadline)[0]:
+            if deadline is not None and deadline.expired():
+                logger.warning(f"⚠️ {name} ran out of time budget, producing a degraded report.")
+            elif stage is run_compliance_validation:
+                # The draft is already written; it goes out fact-checked locally, with the unreviewed notice
+                logger.warning(f"⚠️ {name} failed, producing a degraded report from the draft.")
+            else:
+                logger.error(f"{name} failed. Aborting workflow.")
+                return None
+            degraded = True
 
-    # Run Report Writing
-    if not run_report_writing(analysis_state):
-        logger.error("Report writing failed. Aborting workflow.")
-        return
-        
-    # Run Compliance Validation (Hallucination Check)
-    if not run_compliance_validation(analysis_state):
-        logger.error("Compliance validation failed. Aborting workflow.")
-        return
+    if degraded:
+        analysis_state["final_report"] = build_degraded_report(analysis_state)
     logger.info("--- Sequential Analysis & Synthesis Complete ---")
 
     # 6. Run Custom Tool for Final Score
     logger.info("--- Running Custom Tool ---")
-    investment_score = calculate_investment_score(
-        analysis_state["raw_financial_data"],
-        analysis_state["raw_news_data"]
+    # Section-parallel report writing already computed the score its recommendation is based on
+    investment_score = analysis_state.get("investment_score") or calculate_investment_score(
+        analysis_state.get("raw_financial_data", {}),
+        analysis_state.get("raw_news_data", {})
     )
     analysis_state["investment_score"] = investment_score
     logger.info("--- Custom Tool Execution Complete ---")
@@ -97,17 +249,142 @@ def main():
     full_output += f"**{score_summary}**\n\n"
     full_output += final_report
 
-    print("\n" + "="*60)
-    print("ANALYSIS COMPLETE")
-    print("="*60)
-    print(full_output)
+    if print_report:
+        print("\n" + "="*60)
+        print("ANALYSIS COMPLETE")
+        print("="*60)
+        print(full_output)
     
-    # Save the final report
-    output_file = f"outputs/investment_report_{ticker.lower()}.md"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(full_output)
+    # Save the final report (atomically, since workers on other hosts may share the report store)
+    output_file = save_report(ticker, full_output)
     logger.info(f"💾 Report saved to: {output_file}")
+    if REPORT_CACHE and not (degraded or partial):
+        report_cache.store(ticker, full_output, data_fingerprint(
+            analysis_state.get("raw_financial_data", {}).get("current_price"), analysis_state.get("raw_news_data")
+        ))
     logger.info("🎉 Workflow finished successfully!")
+    return output_file
+
+def serve_cached_report(ticker: str, logger: logging.Logger) -> bool:
+    """
+    Prints the cached report for a ticker if the report cache can serve it, starting a
+    background regeneration (on the batch lane) when the cached copy is stale.
+
+    Returns True if a cached report was served.
+    """
+    cached = report_cache.lookup(ticker, lambda: current_fingerprint(ticker))
+    if cached is None:
+        return False
+    report, status = cached
+    if status == "stale":
+        # The cached copy is what the user sees; the refresh only updates the cache for the next run
+        report_cache.revalidate(ticker, lambda: analyze_ticker(ticker, logger, lane="batch", print_report=False))
+
+    print("\n" + "="*60)
+    print(f"CACHED REPORT ({status.upper()})")
+    print("="*60)
+    print(report)
+    return True
+
+def current_fingerprint(ticker: str) -> dict:
+    """Fingerprint of the ticker's price and news as they are now, for comparison with a cached report."""
+    history = yahoo_finance_tools.get_price_history(ticker, "1mo")
+    # Same company name as the analysis searched news for, or the headlines would never match
+    return data_fingerprint(
+        history['Close'].iloc[-1] if not history.empty else None,
+        news_api_tools.get_company_news(resolve_company_name(ticker), ticker)
+    )
+
+def build_degraded_report(analysis_state: dict) -> str:
+    """
+    Assembles a report from whatever the analysis state holds when the deadline cut the
+    pipeline short: the unreviewed draft if one was written, otherwise the finished sections.
+    """
+    notice = ("> **Note:** This report was produced under a time budget. Compliance review was not "
+              "completed, so figures have not been cross-checked against the source data.\n\n")
+    if analysis_state.get("draft_report"):
+        if not analysis_state.get("raw_financial_data"):
+            return notice + analysis_state["draft_report"]
+        # The local fact check takes milliseconds, so even a degraded report gets its figures checked
+        try:
+            fact_check = fact_checker.validate(
+                analysis_state["draft_report"], analysis_state["raw_financial_data"],
+                analysis_state.get("company_name", ""), analysis_state.get("ticker", ""), analysis_state.get("current_date", "")
+            )
+        except Exception as e:
+            logging.getLogger(__name__).error(f"❌ Fact check of the degraded report failed: {str(e)}")
+            return notice + analysis_state["draft_report"]
+        notice = ("> **Note:** This report was produced under a time budget. Figures were checked automatically "
+                  "against the source data, but the full compliance review was not completed.\n\n")
+        return notice + fact_check["report"]
+
+    sections = [
+        ("Quantitative Analysis", analysis_state.get("quantitative_analysis")),
+        ("Market Sentiment Analysis", analysis_state.get("market_sentiment_analysis")),
+        ("Risk Assessment", analysis_state.get("risk_assessment")),
+        ("Risk Metrics", format_risk_metrics(analysis_state.get("risk_metrics"))),
+        ("Price Scenarios", format_price_scenarios(analysis_state.get("price_scenarios")))
+    ]
+    body = "".join(f"## {title}\n\n{content}\n\n" for title, content in sections if content)
+    return notice + (body or "No analysis stage finished within the time budget.\n")
+
+# Risk metrics that are fractions, shown as percentages (units as documented in risk_tools.get_risk_metrics)
+PERCENT_RISK_METRICS = {"annualized_volatility", "annualized_return", "max_drawdown", "current_drawdown", "downside_deviation"}
+VAR_METRIC_PATTERN = re.compile(r"(historical|parametric)_(c?var)_(\d+)")
+
+def format_risk_metrics(metrics: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Risk metrics as a Markdown table, or None if there are none to show."""
+    if not metrics:
+        return None
+    if "error" in metrics:
+        return f"Risk metrics unavailable: {metrics['error']}"
+    rows = []
+    for key, value in metrics.items():
+        if key in ("ticker", "calculated_at") or value is None:
+            continue
+        var = VAR_METRIC_PATTERN.fullmatch(key)
+        if var:
+            label = f"{var.group(1).capitalize()} {'CVaR' if var.group(2) == 'cvar' else 'VaR'} ({var.group(3)}%, one-day)"
+        elif key == "downside_deviation":
+            label = "Downside deviation (annualized)"
+        else:
+            label = key.replace("_", " ").capitalize()
+        if (var or key in PERCENT_RISK_METRICS) and isinstance(value, (int, float)):
+            value = f"{value:.2%}"
+        rows.append(f"| {label} | {value} |")
+    return "| Metric | Value |\n|---|---|\n" + "\n".join(rows)
+
+def format_price_scenarios(scenarios: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Simulated price bands per method and horizon as a Markdown table, or None if there are none to show."""
+    if not scenarios:
+        return None
+    if "error" in scenarios:
+        return f"Price scenarios unavailable: {scenarios['error']}"
+    methods = {"gbm": "Geometric Brownian motion", "bootstrap": "Block bootstrap"}
+    tables = [f"Last price: ${scenarios.get('last_price', 0):,.2f}, {scenarios.get('n_paths')} simulated paths per method."]
+    for method, title in methods.items():
+        horizons = scenarios.get(method)
+        if not horizons:
+            continue
+        percentiles = [key for key in next(iter(horizons.values())) if re.fullmatch(r"p\d+", key)]
+        header = ["Horizon"] + [f"{key[1:]}th pct" for key in percentiles] + ["Expected price", "Probability of loss"]
+        rows = [f"| {horizon} | " + " | ".join(f"${band[key]:,.2f}" for key in percentiles)
+                + f" | ${band['expected_price']:,.2f} | {band['probability_of_loss']:.1%} |"
+                for horizon, band in horizons.items()]
+        tables.append(f"**{title}**\n\n| " + " | ".join(header) + " |\n|" + "---|" * len(header) + "\n" + "\n".join(rows))
+    return "\n\n".join(tables)
+
+def save_report(ticker: str, content: str) -> str:
+    """
+    Writes a report to the report store, replacing any previous report for the ticker.
+    """
+    os.makedirs(REPORT_STORE_DIR, exist_ok=True)
+    output_file = os.path.join(REPORT_STORE_DIR, f"investment_report_{ticker.lower()}.md")
+    fd, tmp_path = tempfile.mkstemp(dir=REPORT_STORE_DIR, suffix=".tmp")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, output_file)
+    return output_file
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,39 @@
+import sys
+from datetime import datetime
+
+from utils.logging_setup import setup_logging
+from config import PEER_UNIVERSE, PRICE_STORE_COMPACT_DEAD_RATIO
+from tools.batch_analytics import batch_analytics
+from tools.screener_tools import universe_screener
+from tools.price_store import price_store
+
+def main():
+    """
+    Nightly full-universe run: fundamentals, indicators, risk metrics and scores for
+    every ticker, computed across all cores without any LLM calls.
+    """
+    logger = setup_logging()
+
+    # Universe from a file of tickers (one per line), comma-separated arguments, or the peer universe
+    if len(sys.argv) > 1 and sys.argv[1].endswith(".txt"):
+        with open(sys.argv[1], 'r', encoding='utf-8') as f:
+            tickers = [line.strip().upper() for line in f if line.strip()]
+    elif len(sys.argv) > 1:
+        tickers = [t.strip().upper() for t in ",".join(sys.argv[1:]).split(",") if t.strip()]
+    else:
+        tickers = PEER_UNIVERSE
+
+    logger.info(f"--- Nightly batch analytics for {len(tickers)} tickers ---")
+    fundamentals = universe_screener.fetch_fundamentals(tickers)
+    results = batch_analytics.run(tickers, fundamentals)
+    results = results.join(fundamentals[["company_name", "sector"]]).sort_values("total_score", ascending=False)
+
+    output_file = f"outputs/nightly_analytics_{datetime.now().strftime('%Y%m%d')}.csv"
+    results.to_csv(output_file)
+    logger.info(f"💾 Nightly analytics saved to: {output_file}")
+
+    # Every nightly publish appends new segments, so superseded rows are reclaimed here
+    price_store.compact_if_needed(PRICE_STORE_COMPACT_DEAD_RATIO)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,150 @@
+import argparse
+import hashlib
+import json
+import logging
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Filler vocabulary for deterministic stand-in completions
+VOCABULARY = (
+    "revenue margin growth valuation earnings guidance demand pricing outlook liquidity leverage "
+    "volatility drawdown sentiment catalyst momentum consensus estimate multiple sector peers "
+    "free cash flow capital allocation buyback dividend balance sheet risk exposure headwind tailwind"
+).split()
+
+DEFAULT_TEMPLATE = """## Stand-in Response ({model})
+
+*Deterministic stand-in completion for a {prompt_tokens}-token prompt.*
+
+{body}
+"""
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    OpenAI-compatible chat completions endpoint returning templated text.
+
+    The completion is derived from a hash of the prompt, so identical prompts always
+    get identical answers. Latency is time-to-first-token plus output tokens divided
+    by the configured throughput; streamed responses are paced the same way.
+    """
+
+    settings = None
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/v1/chat/completions":
+            self._send_json(404, {"error": "not found"})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        model = body.get("model", "standin")
+        settings = self.settings
+
+        fault = random.random()
+        if fault < settings.error_rate:
+            self._send_json(503, {"error": {"message": "Stand-in injected server error", "code": 503}})
+            return
+        if fault < settings.error_rate + settings.throttle_rate:
+            self._send_json(429, {"error": {"message": "Stand-in injected rate limit", "code": 429}})
+            return
+
+        text, prompt_tokens, output_tokens = self._complete(model, prompt)
+        time.sleep(settings.latency * random.uniform(1 - settings.jitter, 1 + settings.jitter))
+        if body.get("stream"):
+            self._stream(model, text)
+            return
+        time.sleep(output_tokens / settings.tokens_per_second)
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": output_tokens,
+                      "total_tokens": prompt_tokens + output_tokens}
+        })
+
+    def _complete(self, model: str, prompt: str):
+        seed = int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "big")
+        rng = random.Random(seed)
+        words = [rng.choice(VOCABULARY) for _ in range(self.settings.output_tokens)]
+        sentences = [" ".join(words[i:i + 12]).capitalize() + "." for i in range(0, len(words), 12)]
+        paragraphs = "\n\n".join(" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5))
+        prompt_tokens = len(prompt) // 4 + 1
+        text = self.settings.template.format(model=model, prompt_tokens=prompt_tokens, body=paragraphs)
+        return text, prompt_tokens, len(words)
+
+    def _stream(self, model: str, text: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        words = text.split(" ")
+        chunk_size = 8
+        for i in range(0, len(words), chunk_size):
+            content = " ".join(words[i:i + chunk_size]) + (" " if i + chunk_size < len(words) else "")
+            chunk = {"object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(chunk_size / self.settings.tokens_per_second)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+def main():
+    """
+    Local stand-in for the LLM provider, for load-testing the pipeline without network
+    access (set LLM_BACKEND=standin and LLM_STANDIN_URL to point the agents at it).
+
+    python standin_server.py [--port 8765] [--latency 0.8] [--tokens-per-second 60] [--output-tokens 400]
+    """
+    parser = argparse.ArgumentParser(description="Deterministic local LLM stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.8, help="Seconds to first token")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Relative +/- jitter on the time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="Output token throughput per request")
+    parser.add_argument("--output-tokens", type=int, default=400, help="Tokens in every completion")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 429")
+    parser.add_argument("--template", help="File with a response template using {model}, {prompt_tokens} and {body}")
+    args = parser.parse_args()
+
+    if args.template:
+        with open(args.template, 'r', encoding='utf-8') as f:
+            args.template = f.read()
+    else:
+        args.template = DEFAULT_TEMPLATE
+    StandInHandler.settings = args
+
+    server = ThreadingHTTPServer((args.host, args.port), StandInHandler)
+    server.daemon_threads = True
+    logger.info(f"Stand-in LLM server on http://{args.host}:{args.port} "
+                f"({args.latency}s to first token, {args.tokens_per_second} tokens/s, {args.output_tokens} tokens)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
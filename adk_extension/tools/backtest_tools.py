@@ -0,0 +1,190 @@
+"""
+Investment Score Backtesting Tools
+Point-in-time historical evaluation of the proprietary investment score
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import logging
+
+from tools.custom_tools import calculate_investment_scores, DEFAULT_SCORING_PARAMS
+
+logger = logging.getLogger(__name__)
+
+class ScoreBacktester:
+    """
+    Vectorized backtest of calculate_investment_score over a ticker universe
+    """
+
+    def __init__(self, prices: pd.DataFrame, fundamentals: Dict[str, pd.DataFrame],
+                 sentiments: Optional[pd.DataFrame] = None, reporting_lag: int = 0):
+        """
+        Args:
+            prices: Daily closing prices, dates x tickers
+            fundamentals: Snapshots of 'pe_ratio' and 'profit_margin', each dates x tickers.
+                Snapshot dates do not need to match trading days.
+            sentiments: Optional sentiment labels, dates x tickers (missing means Neutral)
+            reporting_lag: Trading days before a snapshot becomes usable, to avoid look-ahead
+        """
+        self.logger = logger
+        self.prices = prices.sort_index()
+        self.dates = self.prices.index
+        self.tickers = list(self.prices.columns)
+        self.closes = self.prices.to_numpy(dtype=float)
+
+        # Align every snapshot to the trading calendar using only data known on each date
+        self.pe_ratios = self._point_in_time(fundamentals["pe_ratio"], reporting_lag).to_numpy(dtype=float)
+        self.profit_margins = self._point_in_time(fundamentals["profit_margin"], reporting_lag).to_numpy(dtype=float)
+        if sentiments is not None:
+            self.sentiments = self._point_in_time(sentiments, reporting_lag).fillna("Neutral").to_numpy(dtype=str)
+        else:
+            self.sentiments = np.full(self.closes.shape, "Neutral")
+
+    def run(self, params: Optional[Dict[str, Any]] = None, rebalance_every: int = 21, horizon: int = 21) -> Dict[str, Any]:
+        """
+        Rebuild scores at each rebalance date and measure forward returns per recommendation bucket
+
+        Args:
+            params: Scoring rule overrides (see DEFAULT_SCORING_PARAMS)
+            rebalance_every: Trading days between score rebuilds (1 = daily)
+            horizon: Forward return horizon in trading days
+
+        Returns:
+            Dict containing per-bucket statistics, turnover and summary metrics
+        """
+        params = {**DEFAULT_SCORING_PARAMS, **(params or {})}
+        rows = np.arange(0, len(self.dates) - horizon, rebalance_every)
+        if len(rows) == 0:
+            return {"error": "Not enough history for the requested horizon"}
+
+        start_prices = self.closes[rows]
+        forward_returns = self.closes[rows + horizon] / start_prices - 1
+        valid = np.isfinite(forward_returns)
+
+        # Score every (date, ticker) pair in one vectorized call
+        shape = start_prices.shape
+        scores = calculate_investment_scores(
+            self.pe_ratios[rows].ravel(),
+            self.profit_margins[rows].ravel(),
+            self.sentiments[rows].ravel(),
+            params
+        )
+        recommendations = scores["recommendation"].reshape(shape)
+        total_scores = scores["total_score"].reshape(shape)
+
+        bucket_stats = {}
+        period_means = {}
+        for bucket in params["recommendations"]:
+            mask = (recommendations == bucket) & valid
+            counts = mask.sum(axis=1)
+            sums = np.where(mask, forward_returns, 0).sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                period_means[bucket] = sums / counts
+            bucket_returns = forward_returns[mask]
+            bucket_stats[bucket] = {
+                "observations": int(mask.sum()),
+                "mean_forward_return": float(bucket_returns.mean()) if bucket_returns.size else None,
+                "median_forward_return": float(np.median(bucket_returns)) if bucket_returns.size else None,
+                "hit_rate": float((bucket_returns > 0).mean()) if bucket_returns.size else None,
+                "avg_period_return": float(np.nanmean(period_means[bucket])) if np.isfinite(period_means[bucket]).any() else None
+            }
+
+        # Turnover: share of tickers whose recommendation changed between consecutive rebalances
+        both_valid = valid[1:] & valid[:-1]
+        changed = (recommendations[1:] != recommendations[:-1]) & both_valid
+        with np.errstate(invalid="ignore", divide="ignore"):
+            turnover = changed.sum(axis=1) / both_valid.sum(axis=1)
+
+        # Information coefficient: rank correlation between score and forward return per rebalance
+        information_coefficient = self._rank_correlation(np.where(valid, total_scores, np.nan), forward_returns)
+
+        top, bottom = params["recommendations"][0], params["recommendations"][-1]
+        spread = period_means[top] - period_means[bottom]
+
+        return {
+            "params": params,
+            "rebalance_dates": [self.dates[i] for i in rows],
+            "bucket_stats": bucket_stats,
+            "period_bucket_returns": pd.DataFrame(period_means, index=self.dates[rows]),
+            "turnover": pd.Series(turnover, index=self.dates[rows[1:]]),
+            "summary": {
+                "rebalances": int(len(rows)),
+                "tickers": len(self.tickers),
+                "mean_turnover": float(np.nanmean(turnover)) if np.isfinite(turnover).any() else None,
+                "mean_information_coefficient": float(np.nanmean(information_coefficient)) if np.isfinite(information_coefficient).any() else None,
+                "top_minus_bottom_spread": float(np.nanmean(spread)) if np.isfinite(spread).any() else None
+            },
+            "calculated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def sweep(self, param_grid: Dict[str, List[Any]], max_workers: Optional[int] = None,
+              rebalance_every: int = 21, horizon: int = 21) -> pd.DataFrame:
+        """
+        Run the backtest for every combination of scoring parameters in parallel
+
+        Args:
+            param_grid: Candidate values per parameter, e.g. {"pe_thresholds": [(15, 25, 40), (12, 20, 35)]}
+            max_workers: Worker processes (defaults to the number of CPUs)
+
+        Returns:
+            DataFrame with one row of summary metrics per parameter combination
+        """
+        combinations = expand_param_grid(param_grid)
+        self.logger.info(f"Sweeping {len(combinations)} scoring parameter combinations")
+
+        # Each worker receives the backtester once, not once per combination
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sweep_worker, initargs=(self,)) as executor:
+            summaries = list(executor.map(_run_sweep_point, combinations,
+                                          itertools.repeat(rebalance_every), itertools.repeat(horizon)))
+
+        rows = []
+        for overrides, summary in zip(combinations, summaries):
+            rows.append({**{key: str(value) for key, value in overrides.items()}, **summary})
+        results = pd.DataFrame(rows)
+        if "top_minus_bottom_spread" in results:
+            results = results.sort_values("top_minus_bottom_spread", ascending=False)
+        return results
+
+    def _point_in_time(self, snapshots: pd.DataFrame, reporting_lag: int) -> pd.DataFrame:
+        """Forward-fill snapshots onto the trading calendar, optionally delayed by a reporting lag"""
+        snapshots = snapshots.sort_index().reindex(columns=self.tickers)
+        aligned = snapshots.reindex(snapshots.index.union(self.dates)).ffill().reindex(self.dates)
+        return aligned.shift(reporting_lag) if reporting_lag else aligned
+
+    def _rank_correlation(self, scores: np.ndarray, returns: np.ndarray) -> np.ndarray:
+        """Row-wise Spearman correlation, ignoring missing values"""
+        mask = np.isfinite(scores) & np.isfinite(returns)
+        score_ranks = pd.DataFrame(np.where(mask, scores, np.nan)).rank(axis=1).to_numpy()
+        return_ranks = pd.DataFrame(np.where(mask, returns, np.nan)).rank(axis=1).to_numpy()
+        score_ranks = score_ranks - np.nanmean(score_ranks, axis=1, keepdims=True)
+        return_ranks = return_ranks - np.nanmean(return_ranks, axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            covariance = np.nansum(score_ranks * return_ranks, axis=1)
+            scale = np.sqrt(np.nansum(score_ranks ** 2, axis=1) * np.nansum(return_ranks ** 2, axis=1))
+            return covariance / scale
+
+def expand_param_grid(param_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Expand {"name": [values...]} into a list of parameter override dicts"""
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[name] for name in names))]
+
+def load_price_history(tickers: List[str], period: str = "10y") -> pd.DataFrame:
+    """Download daily closing prices for a universe in one request (dates x tickers)"""
+    logger.info(f"Downloading {period} of price history for {len(tickers)} tickers")
+    data = yf.download(tickers, period=period, auto_adjust=True, progress=False, group_by="column")
+    return data["Close"]
+
+_sweep_backtester: Optional[ScoreBacktester] = None
+
+def _init_sweep_worker(backtester: ScoreBacktester):
+    global _sweep_backtester
+    _sweep_backtester = backtester
+
+def _run_sweep_point(overrides: Dict[str, Any], rebalance_every: int, horizon: int) -> Dict[str, Any]:
+    result = _sweep_backtester.run(overrides, rebalance_every=rebalance_every, horizon=horizon)
+    return result.get("summary", {"error": result.get("error")})
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Batch Analytics Tools
+Process-pool fan-out of the CPU-bound per-ticker analytics over a whole universe
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import logging
+
+from tools.custom_tools import DEFAULT_SCORING_PARAMS, calculate_investment_scores
+from tools.market_data_tools import yahoo_finance_tools
+from tools.price_store import price_store
+from tools.risk_tools import risk_tools
+
+logger = logging.getLogger(__name__)
+
+# Fixed-width record returned by the workers; a chunk travels back as one bytes buffer.
+# Tickers are carried as their position in the input list, so symbols of any length round-trip
+RESULT_DTYPE = np.dtype([
+    ("ticker_index", "i4"),
+    ("status", "i1"),                   # 0 = ok, 1 = no price history
+    ("last_close", "f4"),
+    ("moving_average_20", "f4"),
+    ("moving_average_50", "f4"),
+    ("rsi_14", "f4"),
+    ("annualized_volatility", "f4"),
+    ("annualized_return", "f4"),
+    ("max_drawdown", "f4"),
+    ("historical_var_95", "f4"),
+    ("historical_cvar_95", "f4"),
+    ("downside_deviation", "f4"),
+    ("beta", "f4"),
+    ("rolling_beta_latest", "f4"),
+    ("valuation_score", "f4"),
+    ("profitability_score", "f4"),
+    ("sentiment_score", "f4"),
+    ("total_score", "f4"),
+    ("recommendation", "i1"),           # index into DEFAULT_SCORING_PARAMS["recommendations"]
+])
+
+RISK_FIELDS = ("annualized_volatility", "annualized_return", "max_drawdown", "historical_var_95",
+               "historical_cvar_95", "downside_deviation", "beta", "rolling_beta_latest")
+
+def technical_snapshot(closes: np.ndarray) -> Dict[str, float]:
+    """
+    Latest MA20, MA50 and simplified RSI14, matching get_technical_indicators
+
+    Args:
+        closes: Close prices of the indicator period, oldest first
+
+    Returns:
+        Dict of indicator values (NaN where the window is longer than the history)
+    """
+    def trailing_mean(values: np.ndarray, window: int) -> float:
+        return float(values[-window:].mean()) if values.size >= window else np.nan
+
+    delta = np.diff(closes)
+    gain = trailing_mean(np.where(delta > 0, delta, 0.0), 14)
+    loss = trailing_mean(np.where(delta < 0, -delta, 0.0), 14)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + gain / loss)
+    return {
+        "moving_average_20": trailing_mean(closes, 20),
+        "moving_average_50": trailing_mean(closes, 50),
+        "rsi_14": float(rsi)
+    }
+
+def _analyze_chunk(first_index: int, tickers: List[str], pe_ratios: np.ndarray, profit_margins: np.ndarray,
+                   sentiments: List[str], period: str, indicator_period: str, params: Optional[Dict[str, Any]]) -> bytes:
+    """Worker entry point: analytics for one shard of tickers, packed as RESULT_DTYPE records"""
+    snapshot = price_store.snapshot()
+    records = np.zeros(len(tickers), dtype=RESULT_DTYPE)
+    records[list(RESULT_DTYPE.names[2:-1])] = np.nan
+
+    benchmark = snapshot.get(risk_tools.benchmark, period)
+    benchmark_days = benchmark.days if benchmark is not None else np.empty(0, dtype=np.int32)
+    benchmark_closes = benchmark.array("Close").astype(float) if benchmark is not None else np.empty(0)
+
+    for row, ticker in enumerate(tickers):
+        record = records[row]
+        record["ticker_index"] = first_index + row
+        history = snapshot.get(ticker, period)
+        if history is None or len(history) < 2:
+            record["status"] = 1
+            continue
+
+        closes = history.array("Close").astype(float)
+        record["last_close"] = closes[-1]
+        for field, value in technical_snapshot(history.slice_period(indicator_period).array("Close").astype(float)).items():
+            record[field] = value
+
+        metrics = risk_tools.calculate_metrics(closes, np.diff(np.log(closes)))
+        _, own, bench = np.intersect1d(history.days, benchmark_days, assume_unique=True, return_indices=True)
+        metrics.update(risk_tools.calculate_beta(np.diff(np.log(closes[own])), np.diff(np.log(benchmark_closes[bench]))))
+        for field in RISK_FIELDS:
+            value = metrics.get(field)
+            record[field] = np.nan if value is None else value
+
+    scores = calculate_investment_scores(pe_ratios, profit_margins, sentiments, params)
+    recommendations = list({**DEFAULT_SCORING_PARAMS, **(params or {})}["recommendations"])
+    records["valuation_score"] = scores["valuation"]
+    records["profitability_score"] = scores["profitability"]
+    records["sentiment_score"] = scores["sentiment"]
+    records["total_score"] = scores["total_score"]
+    records["recommendation"] = [recommendations.index(r) for r in scores["recommendation"]]
+    return records.tobytes()
+
+class BatchAnalytics:
+    """
+    Universe-wide indicators, risk metrics and investment scores computed in a
+    process pool.
+
+    The parent publishes the price history to the memory-mapped shared store once;
+    workers map it read-only, analyze a shard of tickers and send back a packed
+    record buffer, so neither the prices nor per-ticker dicts are pickled.
+    """
+
+    def __init__(self, chunk_size: int = 250, max_workers: Optional[int] = None,
+                 period: str = "1y", indicator_period: str = "3mo"):
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.period = period
+        self.indicator_period = indicator_period
+        self.logger = logger
+
+    def run(self, tickers: List[str], fundamentals: Optional[pd.DataFrame] = None,
+            sentiments: Optional[Dict[str, str]] = None, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """
+        Analyze a universe
+
+        Args:
+            tickers: Stock symbols
+            fundamentals: Optional DataFrame indexed by ticker with pe_ratio and profit_margin
+            sentiments: Optional sentiment label per ticker (missing ones are scored as Neutral)
+            params: Optional overrides for the scoring rules
+
+        Returns:
+            DataFrame indexed by ticker with indicators, risk metrics, scores and recommendation
+        """
+        tickers = [t.upper() for t in tickers]
+        self.logger.info(f"Running batch analytics for {len(tickers)} tickers with {self.max_workers} workers")
+        yahoo_finance_tools.publish_price_history(tickers + [risk_tools.benchmark], self.period)
+
+        fundamentals = (fundamentals if fundamentals is not None else pd.DataFrame(index=tickers)).reindex(tickers)
+        pe_ratios = pd.to_numeric(fundamentals.get("pe_ratio", pd.Series(index=tickers, dtype=float)), errors="coerce").to_numpy(dtype=float)
+        margins = pd.to_numeric(fundamentals.get("profit_margin", pd.Series(index=tickers, dtype=float)), errors="coerce").to_numpy(dtype=float)
+        labels = [(sentiments or {}).get(t, "Neutral") for t in tickers]
+
+        # Several shards per worker keeps the pool balanced when some tickers have longer histories
+        chunk_size = max(1, min(self.chunk_size, -(-len(tickers) // (self.max_workers * 4))))
+        chunks = []
+        for start in range(0, len(tickers), chunk_size):
+            end = start + chunk_size
+            chunks.append((start, tickers[start:end], pe_ratios[start:end], margins[start:end], labels[start:end],
+                           self.period, self.indicator_period, params))
+
+        if self.max_workers == 1 or len(chunks) == 1:
+            buffers = [_analyze_chunk(*chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                buffers = list(executor.map(_analyze_chunk, *zip(*chunks)))
+
+        records = np.frombuffer(b"".join(buffers), dtype=RESULT_DTYPE)
+        results = self.to_frame(records, tickers, params)
+        self.logger.info(f"✅ Batch analytics completed for {int((records['status'] == 0).sum())}/{len(tickers)} tickers")
+        return results
+
+    def to_frame(self, records: np.ndarray, tickers: List[str], params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Unpack worker records into a DataFrame indexed by ticker (tickers is the list the records index into)"""
+        recommendations = np.array({**DEFAULT_SCORING_PARAMS, **(params or {})}["recommendations"], dtype=object)
+        frame = pd.DataFrame({name: records[name] for name in RESULT_DTYPE.names[2:]})
+        frame.index = pd.Index(np.array(tickers, dtype=object)[records["ticker_index"]], name="ticker")
+        frame["has_price_history"] = records["status"] == 0
+        frame["recommendation"] = recommendations[records["recommendation"]]
+        frame.attrs["calculated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return frame.astype({name: float for name in RESULT_DTYPE.names[2:-1]})
+
+# global instance
+batch_analytics = BatchAnalytics()
\ No newline at end of file
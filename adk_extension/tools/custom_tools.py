@@ -1,8 +1,25 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence
 import logging
+import numpy as np
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Scoring rules shared by the single-ticker tool and the vectorized screener.
+# Thresholds are checked in order; the score at the same position applies,
+# and the last score is used when no threshold matches.
+DEFAULT_SCORING_PARAMS = {
+    "pe_thresholds": (15, 25, 40),          # P/E below threshold
+    "pe_scores": (10, 7, 4, 1),             # Very Undervalued -> Highly Overvalued
+    "margin_thresholds": (0.20, 0.10, 0),   # Profit margin above threshold
+    "margin_scores": (10, 7, 4, 1),         # Excellent -> Poor
+    "missing_score": 3,                     # Default score if data is missing
+    "sentiment_scores": {"positive": 9, "neutral": 5, "negative": 1},
+    "weights": {"valuation": 0.4, "profitability": 0.4, "sentiment": 0.2},
+    "recommendation_thresholds": (7.5, 6.0, 4.0),
+    "recommendations": ("Strong Buy", "Buy", "Hold", "Sell"),
+}
+
 def calculate_investment_score(financial_data: Dict[str, Any], news_sentiment: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calculates a proprietary investment score based on financial metrics and news sentiment.
@@ -11,60 +28,19 @@ def calculate_investment_score(financial_data: Dict[str, Any], news_sentiment: D
     logic, and returns a score and recommendation.
     """
     logger.info("CUSTOM TOOL: Calculating proprietary investment score...")
-    
-    scores = {}
-    
-    # 1. Valuation Score (based on P/E Ratio)
-    pe_ratio = financial_data.get("pe_ratio")
-    if isinstance(pe_ratio, (int, float)):
-        if pe_ratio < 15:
-            scores['valuation'] = 10  # Very Undervalued
-        elif pe_ratio < 25:
-            scores['valuation'] = 7   # Fairly Valued
-        elif pe_ratio < 40:
-            scores['valuation'] = 4   # Overvalued
-        else:
-            scores['valuation'] = 1   # Highly Overvalued
-    else:
-        scores['valuation'] = 3 # Default score if data is missing
-
-    # 2. Profitability Score (based on Profit Margin)
-    profit_margin = financial_data.get("profit_margin")
-    if isinstance(profit_margin, (int, float)):
-        if profit_margin > 0.20: # 20%
-            scores['profitability'] = 10 # Excellent
-        elif profit_margin > 0.10: # 10%
-            scores['profitability'] = 7  # Good
-        elif profit_margin > 0:
-            scores['profitability'] = 4  # Average
-        else:
-            scores['profitability'] = 1  # Poor
-    else:
-        scores['profitability'] = 3
-
-    # 3. Sentiment Score (based on news analysis)
-    sentiment = news_sentiment.get('overall_sentiment', {}).get('sentiment', 'Neutral').lower()
-    if sentiment == 'positive':
-        scores['sentiment'] = 9
-    elif sentiment == 'neutral':
-        scores['sentiment'] = 5
-    else: # Negative
-        scores['sentiment'] = 1
-
-    # Calculate final weighted score (out of 10)
-    # Weighting: 40% Valuation, 40% Profitability, 20% Sentiment
-    total_score = (scores['valuation'] * 0.4) + (scores['profitability'] * 0.4) + (scores['sentiment'] * 0.2)
-    
-    # Determine final recommendation
-    if total_score > 7.5:
-        recommendation = "Strong Buy"
-    elif total_score > 6.0:
-        recommendation = "Buy"
-    elif total_score > 4.0:
-        recommendation = "Hold"
-    else:
-        recommendation = "Sell"
-        
+
+    # Score a single row with the vectorized scorer so both paths share DEFAULT_SCORING_PARAMS
+    # and treat NaN or numeric-string inputs the same way
+    sentiment = news_sentiment.get('overall_sentiment', {}).get('sentiment', 'Neutral')
+    row = calculate_investment_scores(
+        [financial_data.get("pe_ratio")],
+        [financial_data.get("profit_margin")],
+        [sentiment]
+    )
+    scores = {component: int(row[component][0]) for component in ("valuation", "profitability", "sentiment")}
+    total_score = float(row["total_score"][0])
+    recommendation = str(row["recommendation"][0])
+
     result = {
         "total_score": round(total_score, 2),
         "recommendation": recommendation,
@@ -72,4 +48,69 @@ def calculate_investment_score(financial_data: Dict[str, Any], news_sentiment: D
     }
     
     logger.info(f"CUSTOM TOOL: Investment score calculated: {result}")
-    return result
\ No newline at end of file
+    return result
+
+def calculate_investment_scores(pe_ratios: Sequence[Any], profit_margins: Sequence[Any], sentiments: Sequence[str],
+                                params: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized version of calculate_investment_score for many tickers at once.
+
+    Args:
+        pe_ratios: P/E ratios, one per ticker (NaN or non-numeric for missing)
+        profit_margins: Profit margins as fractions, one per ticker
+        sentiments: Overall news sentiment labels ('Positive', 'Neutral', 'Negative')
+        params: Scoring rules, defaults to DEFAULT_SCORING_PARAMS
+
+    Returns:
+        Dict of arrays: component scores, total_score and recommendation
+    """
+    params = {**DEFAULT_SCORING_PARAMS, **(params or {})}
+
+    pe = _to_float_array(pe_ratios)
+    margin = _to_float_array(profit_margins)
+    labels = np.char.lower(np.asarray(sentiments, dtype=str))
+
+    # 1. Valuation Score (lower P/E is better)
+    valuation = np.select(
+        [pe < threshold for threshold in params["pe_thresholds"]],
+        params["pe_scores"][:-1],
+        default=params["pe_scores"][-1]
+    ).astype(float)
+    valuation[np.isnan(pe)] = params["missing_score"]
+
+    # 2. Profitability Score (higher margin is better)
+    profitability = np.select(
+        [margin > threshold for threshold in params["margin_thresholds"]],
+        params["margin_scores"][:-1],
+        default=params["margin_scores"][-1]
+    ).astype(float)
+    profitability[np.isnan(margin)] = params["missing_score"]
+
+    # 3. Sentiment Score (anything that is not positive/neutral counts as negative)
+    sentiment_scores = params["sentiment_scores"]
+    sentiment = np.where(labels == "positive", sentiment_scores["positive"],
+                         np.where(labels == "neutral", sentiment_scores["neutral"],
+                                  sentiment_scores["negative"])).astype(float)
+
+    weights = params["weights"]
+    total_score = (valuation * weights["valuation"]) + (profitability * weights["profitability"]) + (sentiment * weights["sentiment"])
+
+    recommendation = np.select(
+        [total_score > threshold for threshold in params["recommendation_thresholds"]],
+        params["recommendations"][:-1],
+        default=params["recommendations"][-1]
+    )
+
+    return {
+        "valuation": valuation,
+        "profitability": profitability,
+        "sentiment": sentiment,
+        "total_score": np.round(total_score, 2),
+        "recommendation": recommendation
+    }
+
+def _to_float_array(values: Sequence[Any]) -> np.ndarray:
+    """Convert a sequence of mixed values ('N/A', None, numbers) into a float array with NaN for missing."""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "f":
+        return values
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=float)
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""
+Report Fact-Checking Tools
+Local validation of the figures quoted in a draft report against the raw data
+"""
+
+import os
+import re
+from datetime import datetime
+from typing import Dict, Any, Optional
+import logging
+
+from config import DISCLAIMER_TEMPLATE_PATH
+
+logger = logging.getLogger(__name__)
+
+# Raw data key -> (phrases that introduce the figure in prose or tables, kind of figure)
+# Kinds: 'money' ($, T/B/M/K units), 'ratio' (plain or 'x'), 'percent' (raw fraction, quoted with %)
+METRIC_CLAIMS = {
+    "market_cap": (["market capitalization", "market cap"], "money"),
+    "pe_ratio": (["price-to-earnings ratio", "price-to-earnings", "trailing p/e", "p/e ratio", "p/e"], "ratio"),
+    "eps": (["earnings per share", "trailing eps", "eps"], "money"),
+    "current_price": (["current price", "share price", "stock price"], "money"),
+    "52_week_high": (["52-week high", "52 week high"], "money"),
+    "52_week_low": (["52-week low", "52 week low"], "money"),
+    "beta": (["beta"], "ratio"),
+    "revenue": (["total revenue", "revenue"], "money"),
+    "profit_margin": (["net profit margin", "profit margin"], "percent")
+}
+
+# A metric phrase modified by one of these refers to some other figure or period
+# (e.g. "forward P/E", "sector median P/E", "Q3 EPS", "2023 revenue")
+QUALIFIERS = ("forward", "peer", "peers", "median", "sector", "industry", "average", "benchmark", "target",
+              "implied", "projected", "estimated", "expected", "s&p", "q1", "q2", "q3", "q4", "quarter",
+              "quarterly", "fy", "year-ago", "prior", "previous", "last year")
+QUALIFIER_PATTERN = re.compile(r"(?<![\w-])(?:" + "|".join(re.escape(q) for q in QUALIFIERS) + r")(?![\w-])|\b(?:19|20)\d{2}\b",
+                               re.IGNORECASE)
+
+# A figure followed by one of these is a period or a parenthetical, not the metric's value ("5Y", "10-year", "(5)")
+NON_CLAIM_SUFFIX = re.compile(r"^(?:\s?(?:y\b|yr\b|-?years?\b|-year)|\))", re.IGNORECASE)
+
+# A figure followed by a period reference in the same clause ("EPS of $7.10 in fiscal 2024") is still checked,
+# but a mismatch is left to the LLM review rather than overwritten with the trailing figure
+PERIOD_PATTERN = re.compile(r"(?<![\w-])(?:q[1-4]|quarter|quarterly|fy|fiscal|year-ago|prior|previous|last year)(?![\w-])"
+                            r"|\b(?:19|20)\d{2}\b", re.IGNORECASE)
+PERIOD_WINDOW = 30
+
+# How many words before a metric phrase can modify it ("the sector median P/E", "last year revenue")
+QUALIFIER_WORDS = 3
+QUALIFIER_CLAUSE_BREAK = re.compile(r"[.!?;:|()\[\]]\s|[;:|()\[\]]|\*\*|,\s")
+
+# Mismatches within this relative deviation look like a stale or misrounded copy of the same figure and are
+# corrected in place; larger ones probably cite a different figure and are left to the LLM review
+CORRECTION_MAX_DEVIATION = 0.25
+
+UNIT_SCALES = {"t": 1e12, "trillion": 1e12, "b": 1e9, "bn": 1e9, "billion": 1e9,
+               "m": 1e6, "mm": 1e6, "million": 1e6, "k": 1e3, "thousand": 1e3}
+
+# Only connective words may sit between a metric's name and its figure, so a number
+# that merely follows the phrase (e.g. "P/E relative to peers, 1.2x the median") is not taken as the claim
+CLAIM_GAP = r"(?:[\s*:|=,()~\-–—]|\b(?:of|is|at|was|stands|stood|currently|approximately|about|around|roughly|nearly|ttm|an?|the|its)\b)*?"
+CLAIM_NUMBER = r"(?P<dollar>\$\s?)?(?P<number>-?\d[\d,]*(?:\.\d+)?)(?:(?P<space> ?)(?P<unit>trillion|billion|million|thousand|bn|mm|[TBMK](?![A-Za-z])|%|x(?![A-Za-z])))?"
+
+# Placeholder text a template-following model sometimes leaves behind; only the LLM pass can rewrite it
+PLACEHOLDER_PATTERN = re.compile(r"\[(?:your|insert|company|firm|analyst|date)[^\]]*\]", re.IGNORECASE)
+
+DEFAULT_DISCLAIMER = """## Disclaimer
+
+This report on {company_name} ({ticker}) was prepared on {current_date} for informational purposes only and does not
+constitute investment advice, an offer, or a solicitation to buy or sell any security. Figures are drawn from public
+market data believed to be reliable but are not guaranteed. Past performance is not indicative of future results.
+Investors should conduct their own research and consult a licensed financial adviser before making investment decisions."""
+
+class FactChecker:
+    """
+    Deterministic compliance checks for a draft report: quoted figures are matched to the
+    raw financial data (normalizing $, T/B/M/K units, x and % and allowing for the
+    rounding shown), mismatches are patched in place and the standard disclaimer is inserted.
+    """
+
+    def __init__(self, disclaimer_template: Optional[str] = None):
+        self.logger = logger
+        self.disclaimer_template = disclaimer_template or self._load_template()
+
+    def validate(self, report: str, raw_data: Dict[str, Any], company_name: str = "", ticker: str = "",
+                 current_date: str = "") -> Dict[str, Any]:
+        """
+        Check and correct a draft report
+
+        Args:
+            report: Draft report (Markdown)
+            raw_data: Raw financial data the figures come from (get_stock_data output)
+            company_name, ticker, current_date: Values for the disclaimer template
+
+        Returns:
+            Dict with the corrected report, the corrections applied, the issues that could
+            not be fixed locally and the number of claims checked
+        """
+        corrections, unresolved = [], []
+        claims_checked = 0
+
+        for key, (phrases, kind) in METRIC_CLAIMS.items():
+            actual = raw_data.get(key)
+            pattern = re.compile(r"(?<![\w-])(?:" + "|".join(re.escape(p) for p in phrases) + r")(?![\w-])" + CLAIM_GAP + CLAIM_NUMBER, re.IGNORECASE)
+
+            def check(match: re.Match) -> str:
+                nonlocal claims_checked
+                claimed = self._claim_value(match, kind)
+                if claimed is None:
+                    return match.group(0)
+                qualified = self._qualified(match)
+                if not isinstance(actual, (int, float)):
+                    if not qualified:
+                        claims_checked += 1
+                        unresolved.append(f"'{match.group(0).strip()}' cites {key}, which is not in the source data")
+                    return match.group(0)
+                claims_checked += 1
+                if self._matches(claimed, actual, match, kind):
+                    return match.group(0)
+                if qualified or self._period_follows(match):
+                    # A sector median or a past period can legitimately differ; only the LLM review can tell
+                    unresolved.append(f"'{match.group(0).strip()}' differs from {key} in the source data ({actual}); "
+                                      "it is qualified as another period or benchmark and could not be checked locally")
+                    return match.group(0)
+                if abs(claimed - actual) > CORRECTION_MAX_DEVIATION * abs(actual):
+                    unresolved.append(f"'{match.group(0).strip()}' does not match {key} in the source data ({actual}); "
+                                      "it may refer to a different period or figure")
+                    return match.group(0)
+                fixed = self._format_like(actual, match, kind)
+                corrections.append({"metric": key, "claimed": match.group(0).strip(), "corrected_to": fixed, "actual": actual})
+                figure_start = match.start("dollar") if match.group("dollar") else match.start("number")
+                return match.group(0)[:figure_start - match.start(0)] + fixed
+
+            report = pattern.sub(check, report)
+
+        for placeholder in sorted(set(PLACEHOLDER_PATTERN.findall(report))):
+            unresolved.append(f"Placeholder text '{placeholder}' left in the report")
+
+        report = self._insert_disclaimer(report, company_name, ticker, current_date)
+
+        for correction in corrections:
+            self.logger.warning(f"⚠️ Corrected {correction['metric']}: '{correction['claimed']}' -> '{correction['corrected_to']}'")
+        self.logger.info(f"✅ Fact check: {claims_checked} figures checked, {len(corrections)} corrected, {len(unresolved)} unresolved")
+        return {
+            "report": report,
+            "claims_checked": claims_checked,
+            "corrections": corrections,
+            "unresolved": unresolved,
+            "checked_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def _qualified(self, match: re.Match) -> bool:
+        """
+        Whether a qualifier modifies the metric phrase itself: between the phrase and its
+        figure, or among the few words right before the phrase in the same clause.
+        Qualifiers further away ("31.2x, above the sector median") describe other figures.
+        """
+        figure_start = match.start("dollar") if match.group("dollar") else match.start("number")
+        if QUALIFIER_PATTERN.search(match.string[match.start():figure_start]):
+            return True
+        clause = QUALIFIER_CLAUSE_BREAK.split(match.string[:match.start()].rsplit("\n", 1)[-1])[-1]
+        words = re.findall(r"[\w&/-]+", clause)[-QUALIFIER_WORDS:]
+        return bool(QUALIFIER_PATTERN.search(" ".join(words)))
+
+    def _period_follows(self, match: re.Match) -> bool:
+        """Whether the rest of the claim's clause names a period ("in Q3", "for fiscal 2024")."""
+        following = match.string[match.end():match.end() + PERIOD_WINDOW].split("\n", 1)[0]
+        return bool(PERIOD_PATTERN.search(QUALIFIER_CLAUSE_BREAK.split(following, maxsplit=1)[0]))
+
+    def _claim_value(self, match: re.Match, kind: str) -> Optional[float]:
+        """Quoted figure in raw-data units, or None if it is not a value of the metric (wrong unit, a year, a period)."""
+        unit = (match.group("unit") or "").lower()
+        number = match.group("number").replace(",", "")
+        if not unit and not match.group("dollar") and re.fullmatch(r"(?:19|20)\d{2}", number):
+            return None
+        if not unit and NON_CLAIM_SUFFIX.match(match.string[match.end():]):
+            return None
+        value = float(number)
+        if kind == "percent":
+            return value / 100 if unit == "%" else None
+        if unit == "%" or (kind == "ratio" and (unit in UNIT_SCALES or match.group("dollar"))):
+            return None
+        if kind == "money" and unit == "x":
+            return None
+        return value * UNIT_SCALES.get(unit, 1)
+
+    def _matches(self, claimed: float, actual: float, match: re.Match, kind: str) -> bool:
+        # Half a unit of the last digit shown, in raw-data units, plus a small relative slack
+        number = match.group("number")
+        decimals = len(number.split(".")[1]) if "." in number else 0
+        unit = (match.group("unit") or "").lower()
+        scale = 0.01 if kind == "percent" else UNIT_SCALES.get(unit, 1)
+        tolerance = 0.5 * 10 ** -decimals * scale + 0.005 * abs(actual)
+        return abs(claimed - actual) <= tolerance
+
+    def _format_like(self, actual: float, match: re.Match, kind: str) -> str:
+        """The actual value written in the same style as the claim it replaces."""
+        number = match.group("number")
+        decimals = len(number.split(".")[1]) if "." in number else 0
+        unit = match.group("unit") or ""
+        value = actual * 100 if kind == "percent" else actual / UNIT_SCALES.get(unit.lower(), 1)
+        text = f"{value:,.{decimals}f}" if "," in number else f"{value:.{decimals}f}"
+        return f"{match.group('dollar') or ''}{text}{match.group('space') or ''}{unit}"
+
+    def _insert_disclaimer(self, report: str, company_name: str, ticker: str, current_date: str) -> str:
+        disclaimer = self.disclaimer_template.format(company_name=company_name, ticker=ticker, current_date=current_date)
+        # Replace any disclaimer section the model wrote with the standard one
+        section = re.compile(r"^#{1,6}\s*\**\s*disclaimer\b.*?(?=^#{1,6}\s|\Z)", re.IGNORECASE | re.MULTILINE | re.DOTALL)
+        if section.search(report):
+            return section.sub(lambda _: disclaimer + "\n\n", report, count=1).rstrip() + "\n"
+        return report.rstrip() + "\n\n" + disclaimer + "\n"
+
+    def _load_template(self) -> str:
+        if DISCLAIMER_TEMPLATE_PATH and os.path.exists(DISCLAIMER_TEMPLATE_PATH):
+            with open(DISCLAIMER_TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        return DEFAULT_DISCLAIMER
+
+# global instance
+fact_checker = FactChecker()
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Fundamentals Tools
+Cached financial statements and locally computed financial ratios
+"""
+
+import yfinance as yf
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Any, List
+import logging
+from config import FUNDAMENTALS_CACHE_TTL_SECONDS
+from utils.disk_cache import DiskCache
+from utils.circuit_breaker import provider_call
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Statement line items (yfinance row labels) kept in the cache
+STATEMENT_ITEMS = {
+    "income_stmt": ["Total Revenue", "Gross Profit", "Operating Income", "Net Income", "EBITDA", "Interest Expense"],
+    "balance_sheet": ["Total Assets", "Total Liabilities Net Minority Interest", "Stockholders Equity",
+                      "Current Assets", "Current Liabilities", "Cash And Cash Equivalents", "Inventory", "Total Debt"],
+    "cashflow": ["Operating Cash Flow", "Free Cash Flow", "Capital Expenditure"],
+}
+
+class FundamentalsTools:
+    """
+    Financial statement retrieval (cached for a long TTL, since statements change
+    quarterly) and vectorized leverage, liquidity, margin and growth ratios
+    """
+
+    def __init__(self):
+        self.logger = logger
+        self.cache = DiskCache("fundamentals", FUNDAMENTALS_CACHE_TTL_SECONDS)
+
+    def get_statements(self, ticker: str) -> Dict[str, Any]:
+        """
+        Fetch the latest and prior annual statement values for a ticker
+
+        Args:
+            ticker: Stock symbol
+
+        Returns:
+            Dict with 'current' and 'prior' line items plus the statement period
+        """
+        ticker = ticker.upper()
+        cached = self.cache.get(ticker)
+        if cached is not None:
+            return cached
+
+        try:
+            self.logger.info(f"Fetching financial statements for {ticker}")
+            stock = yf.Ticker(ticker)
+            current, prior = {}, {}
+            period = None
+            for statement, items in STATEMENT_ITEMS.items():
+                with provider_call("yfinance"):
+                    frame = getattr(stock, statement)
+                if frame is None or frame.empty:
+                    continue
+                frame = frame.sort_index(axis=1, ascending=False)
+                period = period or str(frame.columns[0].date())
+                for item in items:
+                    if item in frame.index:
+                        values = frame.loc[item]
+                        current[item] = self._to_number(values.iloc[0])
+                        prior[item] = self._to_number(values.iloc[1]) if len(values) > 1 else None
+
+            statements = {
+                "ticker": ticker,
+                "period": period,
+                "current": current,
+                "prior": prior,
+                "retrieved_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+            if current:
+                self.cache.set(ticker, statements)
+            self.logger.info(f"✅ Financial statements retrieved for {ticker}")
+            return statements
+
+        except Exception as e:
+            self.logger.error(f"❌ Error fetching financial statements for {ticker}: {str(e)}")
+            return {
+                "ticker": ticker,
+                "error": str(e),
+                "retrieved_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+
+    def get_financial_ratios(self, tickers: List[str]) -> pd.DataFrame:
+        """
+        Compute financial ratios for many tickers in one vectorized pass
+
+        Args:
+            tickers: Stock symbols
+
+        Returns:
+            DataFrame indexed by ticker with leverage, liquidity, margin and growth ratios
+        """
+        statements = [self.get_statements(t) for t in tickers]
+        index = [s["ticker"] for s in statements]
+        current = pd.DataFrame([s.get("current", {}) for s in statements], index=index, dtype=float)
+        prior = pd.DataFrame([s.get("prior", {}) for s in statements], index=index, dtype=float)
+        items = [item for group in STATEMENT_ITEMS.values() for item in group]
+        current = current.reindex(columns=items)
+        prior = prior.reindex(columns=items)
+
+        def ratio(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+            return numerator / denominator.where(denominator != 0)
+
+        revenue = current["Total Revenue"]
+        equity = current["Stockholders Equity"]
+        ratios = pd.DataFrame({
+            # Leverage
+            "debt_to_equity": ratio(current["Total Debt"], equity),
+            "debt_to_assets": ratio(current["Total Debt"], current["Total Assets"]),
+            "liabilities_to_assets": ratio(current["Total Liabilities Net Minority Interest"], current["Total Assets"]),
+            "interest_coverage": ratio(current["Operating Income"], current["Interest Expense"].abs()),
+            # Liquidity
+            "current_ratio": ratio(current["Current Assets"], current["Current Liabilities"]),
+            "quick_ratio": ratio(current["Current Assets"] - current["Inventory"].fillna(0), current["Current Liabilities"]),
+            "cash_ratio": ratio(current["Cash And Cash Equivalents"], current["Current Liabilities"]),
+            # Profitability
+            "gross_margin": ratio(current["Gross Profit"], revenue),
+            "operating_margin": ratio(current["Operating Income"], revenue),
+            "net_margin": ratio(current["Net Income"], revenue),
+            "free_cash_flow_margin": ratio(current["Free Cash Flow"], revenue),
+            "return_on_equity": ratio(current["Net Income"], equity),
+            "return_on_assets": ratio(current["Net Income"], current["Total Assets"]),
+            "cash_conversion": ratio(current["Operating Cash Flow"], current["Net Income"]),
+            # Growth (year over year)
+            "revenue_growth": ratio(revenue - prior["Total Revenue"], prior["Total Revenue"].abs()),
+            "net_income_growth": ratio(current["Net Income"] - prior["Net Income"], prior["Net Income"].abs()),
+            "free_cash_flow_growth": ratio(current["Free Cash Flow"] - prior["Free Cash Flow"], prior["Free Cash Flow"].abs()),
+        }, index=index)
+        ratios.insert(0, "period", [s.get("period") for s in statements])
+        return ratios.replace([np.inf, -np.inf], np.nan).round(4)
+
+    def get_ratios(self, ticker: str) -> Dict[str, Any]:
+        """
+        Financial ratios for a single ticker
+
+        Args:
+            ticker: Stock symbol
+
+        Returns:
+            Dict of ratios (None where the statements lack the inputs)
+        """
+        try:
+            row = self.get_financial_ratios([ticker]).iloc[0]
+            ratios = {key: (None if pd.isna(value) else value if isinstance(value, str) else float(value))
+                      for key, value in row.items()}
+            ratios["ticker"] = ticker.upper()
+            return ratios
+        except Exception as e:
+            self.logger.error(f"❌ Error calculating financial ratios for {ticker}: {str(e)}")
+            return {"ticker": ticker, "error": str(e)}
+
+    def _to_number(self, value: Any) -> Any:
+        return None if pd.isna(value) else float(value)
+
+# global instance
+fundamentals_tools = FundamentalsTools()
\ No newline at end of file
@@ -5,9 +5,16 @@ Yahoo Finance integration for stock data retrieval
 
 import yfinance as yf
 import pandas as pd
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import logging
+from config import PRICE_CACHE_TTL_SECONDS, CONTINUE_ON_PARTIAL_DATA
+from tools.price_frame import CompactPriceFrame, PERIOD_DAYS
+from tools.price_store import price_store
+from utils.circuit_breaker import provider_call
+from utils.deadline import remaining_timeout
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,7 +26,155 @@ class YahooFinanceTools:
     
     def __init__(self):
         self.logger = logger
+        self._history_cache = {}
+        self._history_lock = threading.Lock()
+
+    def get_price_history(self, ticker: str, period: str = "1y") -> CompactPriceFrame:
+        """
+        Fetch daily price history, reusing a cached copy while it is fresh
+        
+        The cache holds one compact frame per ticker; a shorter period (e.g. '3mo'
+        after '1y') is served as a zero-copy slice of the longer history.
+        
+        Args:
+            ticker: Stock symbol
+            period: Time period ('1mo', '3mo', '1y', ...)
+            
+        Returns:
+            CompactPriceFrame with Close, High, Low and Volume
+        """
+        cached = self._cached_history(ticker, period)
+        if cached is not None:
+            return cached
+
+        # Worker processes read histories the parent published to the shared store
+        shared = price_store.get(ticker, period)
+        if shared is not None:
+            with self._history_lock:
+                self._history_cache[ticker.upper()] = (time.time(), period, shared)
+            return shared
+
+        try:
+            # An empty frame means no data for the symbol (unknown or delisted), not an outage,
+            # so only exceptions and timeouts count against the circuit
+            with provider_call("yfinance"):
+                raw_history = yf.Ticker(ticker).history(period=period, timeout=remaining_timeout(10))
+        except Exception as e:
+            stale = self._stale_history(ticker, period) if CONTINUE_ON_PARTIAL_DATA else None
+            if stale is None:
+                raise
+            self.logger.warning(f"⚠️ Using stale price history for {ticker}: {str(e)}")
+            return stale
+        history = CompactPriceFrame.from_history(raw_history)
+        if history.empty and CONTINUE_ON_PARTIAL_DATA:
+            stale = self._stale_history(ticker, period)
+            if stale is not None:
+                self.logger.warning(f"⚠️ No fresh price history for {ticker}, using stale history")
+                return stale
+        self._store_history(ticker, period, history)
+        return history
+
+    def _stale_history(self, ticker: str, period: str) -> Optional[CompactPriceFrame]:
+        """Last known history regardless of age, for when Yahoo Finance is unavailable"""
+        with self._history_lock:
+            cached = self._history_cache.get(ticker.upper())
+        if cached and (cached[1] == period or self._serves(cached[1], period)):
+            return cached[2] if cached[1] == period else cached[2].slice_period(period)
+        return price_store.get(ticker, period, max_age=None)
+
+    def publish_price_history(self, tickers: List[str], period: str = "1y") -> int:
+        """
+        Publish price histories to the memory-mapped shared store for worker processes
+        
+        Tickers already fresh in the store are skipped; the rest are served from the
+        in-memory cache or downloaded in one batch.
+        
+        Args:
+            tickers: Stock symbols
+            period: Time period ('1mo', '3mo', '1y', ...)
+            
+        Returns:
+            Number of tickers available in the store for the period
+        """
+        pending = [t for t in tickers if price_store.get(t, period) is None]
+        missing = [t for t in pending if self._cached_history(t, period) is None]
+        if missing:
+            self.get_close_matrix(missing, period)
+
+        frames = {}
+        for ticker in pending:
+            history = self._cached_history(ticker, period)
+            if history is not None:
+                frames[ticker] = history
+        if frames:
+            price_store.write(frames, period)
+        return len(tickers) - len(pending) + len(frames)
+
+    def _store_history(self, ticker: str, period: str, history: CompactPriceFrame):
+        if history.empty:
+            return
+        key = ticker.upper()
+        with self._history_lock:
+            current = self._history_cache.get(key)
+            # Keep the longest fresh history so later, shorter periods can slice it
+            if not current or time.time() - current[0] >= PRICE_CACHE_TTL_SECONDS or not self._serves(current[1], period):
+                self._history_cache[key] = (time.time(), period, history)
+
+    def _cached_history(self, ticker: str, period: str) -> Optional[CompactPriceFrame]:
+        with self._history_lock:
+            cached = self._history_cache.get(ticker.upper())
+        if not cached or time.time() - cached[0] >= PRICE_CACHE_TTL_SECONDS:
+            return None
+        _, cached_period, history = cached
+        if cached_period == period:
+            return history
+        return history.slice_period(period) if self._serves(cached_period, period) else None
+
+    def _serves(self, cached_period: str, period: str) -> bool:
+        return PERIOD_DAYS.get(cached_period, 0) >= PERIOD_DAYS.get(period, float("inf"))
     
+    def get_close_matrix(self, tickers: List[str], period: str = "1y") -> pd.DataFrame:
+        """
+        Fetch closing prices for a whole watchlist in one pass
+        
+        Tickers already in the history cache are served from it; the rest are
+        downloaded together in a single batched request.
+        
+        Args:
+            tickers: Stock symbols
+            period: Time period ('1mo', '3mo', '1y', ...)
+            
+        Returns:
+            DataFrame of closing prices, dates x tickers (dates normalized to tz-naive days)
+        """
+        closes = {}
+        missing = []
+        for ticker in tickers:
+            cached = self._cached_history(ticker, period)
+            if cached is not None:
+                closes[ticker] = cached['Close']
+            else:
+                missing.append(ticker)
+
+        if missing:
+            self.logger.info(f"Downloading price history for {len(missing)} tickers")
+            with provider_call("yfinance"):
+                data = yf.download(missing, period=period, group_by="ticker", auto_adjust=True, progress=False, threads=True)
+            for ticker in missing:
+                try:
+                    frame = data[ticker] if isinstance(data.columns, pd.MultiIndex) else data
+                    closes[ticker] = frame['Close']
+                except KeyError:
+                    self.logger.warning(f"⚠️ No price history returned for {ticker}")
+                    continue
+                # The batch already carries full OHLCV, so later per-ticker calls are served from the cache
+                self._store_history(ticker, period, CompactPriceFrame.from_history(frame.dropna(subset=['Close'])))
+
+        for ticker, series in closes.items():
+            index = series.index.tz_localize(None) if series.index.tz is not None else series.index
+            closes[ticker] = pd.Series(series.to_numpy(), index=index.normalize())
+        return pd.DataFrame(closes).reindex(columns=[t for t in tickers if t in closes]).sort_index()
+
     def get_stock_data(self, ticker: str, period: str = "1y") -> Dict[str, Any]:
         """
         Fetch comprehensive stock data for analysis
@@ -37,11 +192,18 @@ class YahooFinanceTools:
             # Create ticker object
             stock = yf.Ticker(ticker)
             
-            # Get stock info
-            info = stock.info
+            # Get stock info (optional when continuing on partial data)
+            try:
+                with provider_call("yfinance"):
+                    info = stock.info
+            except Exception as e:
+                if not CONTINUE_ON_PARTIAL_DATA:
+                    raise
+                self.logger.warning(f"⚠️ Company info unavailable for {ticker}, continuing with price data only: {str(e)}")
+                info = {}
             
             # Get historical data
-            history = stock.history(period=period)
+            history = self.get_price_history(ticker, period)
             
             # Calculate additional metrics
             current_price = history['Close'].iloc[-1] if not history.empty else None
@@ -96,26 +258,26 @@ class YahooFinanceTools:
         try:
             self.logger.info(f"Calculating technical indicators for {ticker}")
             
-            stock = yf.Ticker(ticker)
-            history = stock.history(period=period)
+            history = self.get_price_history(ticker, period)
             
             if history.empty:
                 return {"error": "No historical data available"}
             
             # Calculate moving averages
-            history['MA_20'] = history['Close'].rolling(window=20).mean()
-            history['MA_50'] = history['Close'].rolling(window=50).mean()
+            close = history['Close']
+            ma_20_series = close.rolling(window=20).mean()
+            ma_50_series = close.rolling(window=50).mean()
             
             # Calculate RSI (simplified)
-            delta = history['Close'].diff()
+            delta = close.diff()
             gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
             loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
             rs = gain / loss
             rsi = 100 - (100 / (1 + rs))
             
-            current_price = history['Close'].iloc[-1]
-            ma_20 = history['MA_20'].iloc[-1]
-            ma_50 = history['MA_50'].iloc[-1]
+            current_price = close.iloc[-1]
+            ma_20 = ma_20_series.iloc[-1]
+            ma_50 = ma_50_series.iloc[-1]
             current_rsi = rsi.iloc[-1]
             
             indicators = {
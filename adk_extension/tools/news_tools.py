@@ -7,7 +7,10 @@ import requests
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 import logging
-from config import NEWS_API_KEY
+from config import NEWS_API_KEY, CONTINUE_ON_PARTIAL_DATA
+from utils.circuit_breaker import provider_call
+from utils.deadline import remaining_timeout
+from utils.disk_cache import DiskCache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,6 +24,8 @@ class NewsAPITools:
         self.api_key = NEWS_API_KEY
         self.base_url = "https://newsapi.org/v2"
         self.logger = logger
+        # Last successful result per ticker, served when NewsAPI is unavailable
+        self.last_good = DiskCache("news", float("inf"))
         
         if not self.api_key:
             self.logger.warning("⚠️ NEWS_API_KEY not found. News tools will not work.")
@@ -61,7 +66,10 @@ class NewsAPITools:
             }
             
             # API request
-            response = requests.get(f"{self.base_url}/everything", params=params)
+            with provider_call("newsapi") as call:
+                response = requests.get(f"{self.base_url}/everything", params=params, timeout=remaining_timeout())
+                if response.status_code == 429 or response.status_code >= 500:
+                    call.failed(throttled=response.status_code == 429)
             
             if response.status_code == 200:
                 data = response.json()
@@ -97,21 +105,50 @@ class NewsAPITools:
                 }
                 
                 self.logger.info(f"✅ Retrieved {len(processed_articles)} articles for {company_name}")
+                self.last_good.set(ticker.upper(), result)
                 return result
                 
             else:
                 error_msg = f"API request failed with status {response.status_code}"
                 self.logger.error(f"❌ {error_msg}")
-                return {"error": error_msg}
+                return self._stale_news(ticker) or {"error": error_msg}
                 
         except Exception as e:
             self.logger.error(f"❌ Error fetching news for {company_name}: {str(e)}")
-            return {
+            return self._stale_news(ticker) or {
                 "company_name": company_name,
                 "ticker": ticker,
                 "error": str(e),
                 "retrieved_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
+
+    def cached_sentiments(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Last successful news result per ticker, without calling NewsAPI
+
+        Args:
+            tickers: Stock symbols
+
+        Returns:
+            Dict of ticker -> cached news result (with overall_sentiment), only for tickers that have one
+        """
+        sentiments = {}
+        for ticker in tickers:
+            cached = self.last_good.get(ticker.upper())
+            if cached:
+                sentiments[ticker] = cached
+        self.logger.info(f"Cached news sentiment found for {len(sentiments)}/{len(tickers)} tickers")
+        return sentiments
+
+    def _stale_news(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Last successful news result for the ticker, flagged as stale"""
+        if not CONTINUE_ON_PARTIAL_DATA:
+            return None
+        entry = self.last_good.get_entry(ticker.upper())
+        if entry is None:
+            return None
+        self.logger.warning(f"⚠️ Using news for {ticker} cached at {datetime.fromtimestamp(entry['stored_at']).strftime('%Y-%m-%d %H:%M:%S')}")
+        return {**entry["value"], "stale": True}
     
     def get_market_news(self, category: str = "business", country: str = "us") -> Dict[str, Any]:
         """
@@ -137,7 +174,10 @@ class NewsAPITools:
                 'apiKey': self.api_key
             }
             
-            response = requests.get(f"{self.base_url}/top-headlines", params=params)
+            with provider_call("newsapi") as call:
+                response = requests.get(f"{self.base_url}/top-headlines", params=params, timeout=remaining_timeout())
+                if response.status_code == 429 or response.status_code >= 500:
+                    call.failed(throttled=response.status_code == 429)
             
             if response.status_code == 200:
                 data = response.json()
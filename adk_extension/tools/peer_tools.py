@@ -0,0 +1,247 @@
+"""
+Peer Comparison Tools
+Sector peer groups, shared peer snapshots and relative valuation
+"""
+
+import yfinance as yf
+import numpy as np
+import pandas as pd
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import logging
+from config import PEER_UNIVERSE, METADATA_CACHE_TTL_SECONDS, PEER_SNAPSHOT_TTL_SECONDS
+from utils.disk_cache import DiskCache
+from utils.concurrency import get_limiter
+from utils.circuit_breaker import provider_call
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Peer metrics and the yfinance info fields they come from
+PEER_METRICS = {
+    "pe_ratio": "trailingPE",
+    "forward_pe": "forwardPE",
+    "price_to_book": "priceToBook",
+    "ev_to_ebitda": "enterpriseToEbitda",
+    "profit_margin": "profitMargins",
+    "revenue_growth": "revenueGrowth",
+    "return_on_equity": "returnOnEquity",
+    "beta": "beta",
+    "market_cap": "marketCap",
+}
+
+class PeerComparisonTools:
+    """
+    Peer comparison built on a sector index of cached ticker metadata.
+
+    Peer metrics are fetched once per sector and shared by every ticker in that
+    sector, both within a batch (in memory) and across runs (disk cache).
+    """
+
+    def __init__(self, universe: Optional[List[str]] = None, min_industry_peers: int = 5, max_workers: Optional[int] = None):
+        self.universe = [t.upper() for t in (universe or PEER_UNIVERSE)]
+        self.min_industry_peers = min_industry_peers
+        # Threads only wait on I/O; the yfinance limiter decides how many requests are in flight
+        self.max_workers = max_workers or get_limiter("yfinance").max_limit
+        self.logger = logger
+        self.metadata_cache = DiskCache("metadata", METADATA_CACHE_TTL_SECONDS)
+        self.snapshot_cache = DiskCache("peer_snapshots", PEER_SNAPSHOT_TTL_SECONDS)
+        self._sector_index = None
+        self._snapshots = {}
+        self._sector_locks = {}
+        self._recent_info = {}
+        self._lock = threading.Lock()
+
+    def get_metadata(self, ticker: str) -> Dict[str, Any]:
+        """
+        Sector, industry and name for a ticker (cached for a long TTL)
+
+        Args:
+            ticker: Stock symbol
+
+        Returns:
+            Dict containing company_name, sector, industry and exchange
+        """
+        ticker = ticker.upper()
+        cached = self.metadata_cache.get(ticker)
+        if cached is not None:
+            return cached
+        info = self._fetch_info(ticker)
+        # Keep the full info so a following peer snapshot does not fetch it again
+        with self._lock:
+            self._recent_info[ticker] = info
+        return self._store_metadata(ticker, info)
+
+    def get_sector_index(self) -> Dict[str, List[str]]:
+        """
+        Map each sector to the universe tickers in it
+
+        Returns:
+            Dict of sector -> tickers
+        """
+        with self._lock:
+            if self._sector_index is not None:
+                return self._sector_index
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            metadata = list(executor.map(self.get_metadata, self.universe))
+
+        index = {}
+        for ticker, meta in zip(self.universe, metadata):
+            sector = meta.get("sector")
+            if sector and sector != "N/A":
+                index.setdefault(sector, []).append(ticker)
+
+        with self._lock:
+            self._sector_index = index
+        self.logger.info(f"✅ Sector index built for {len(self.universe)} tickers across {len(index)} sectors")
+        return index
+
+    def get_peer_snapshot(self, sector: str) -> pd.DataFrame:
+        """
+        Peer metrics for every universe ticker in a sector, fetched once and shared
+
+        Args:
+            sector: Sector name (as reported by Yahoo Finance)
+
+        Returns:
+            DataFrame indexed by ticker with industry and PEER_METRICS columns
+        """
+        with self._lock:
+            if sector in self._snapshots:
+                return self._snapshots[sector]
+            sector_lock = self._sector_locks.setdefault(sector, threading.Lock())
+
+        # Only one caller per sector fetches; concurrent callers wait and reuse its snapshot
+        with sector_lock:
+            with self._lock:
+                if sector in self._snapshots:
+                    return self._snapshots[sector]
+
+            cached = self.snapshot_cache.get(sector)
+            if cached is not None:
+                snapshot = pd.DataFrame(cached).set_index("ticker")
+            else:
+                peers = self.get_sector_index().get(sector, [])
+                self.logger.info(f"Fetching peer snapshot for {sector} ({len(peers)} tickers)")
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    infos = list(executor.map(self._recent_or_fetch_info, peers))
+                rows = []
+                for ticker, info in zip(peers, infos):
+                    meta = self._store_metadata(ticker, info)
+                    rows.append(self._metric_row(ticker, meta, info))
+                snapshot = pd.DataFrame(rows, columns=["ticker", "industry", *PEER_METRICS]).set_index("ticker")
+                self.snapshot_cache.set(sector, snapshot.reset_index().to_dict(orient="records"))
+
+            with self._lock:
+                self._snapshots[sector] = snapshot
+            return snapshot
+
+    def compare(self, ticker: str, stock_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Compare a ticker with its sector (or industry) peers
+
+        Args:
+            ticker: Stock symbol
+            stock_info: Optional yfinance info for the ticker, to avoid refetching it
+
+        Returns:
+            Dict containing peer group, medians, percentile ranks and relative valuation
+        """
+        try:
+            ticker = ticker.upper()
+            self.logger.info(f"Calculating peer comparison for {ticker}")
+            meta = self._store_metadata(ticker, stock_info) if stock_info is not None else self.get_metadata(ticker)
+            sector, industry = meta.get("sector"), meta.get("industry")
+            if not sector or sector == "N/A":
+                return {"ticker": ticker, "error": "Sector not available for peer comparison"}
+
+            snapshot = self.get_peer_snapshot(sector)
+            industry_peers = snapshot[snapshot["industry"] == industry]
+            peers = industry_peers if len(industry_peers.drop(index=ticker, errors="ignore")) >= self.min_industry_peers else snapshot
+            peer_group = "industry" if peers is industry_peers else "sector"
+
+            # Universe members reuse their snapshot row; anyone else needs their own info
+            if ticker in snapshot.index and stock_info is None:
+                own_row = snapshot.loc[[ticker]]
+            else:
+                info = stock_info if stock_info is not None else self._recent_or_fetch_info(ticker)
+                own_row = pd.DataFrame([self._metric_row(ticker, meta, info)]).set_index("ticker")
+
+            # Rank the ticker against its peers in one vectorized pass over all metrics
+            frame = pd.concat([peers.drop(index=ticker, errors="ignore"), own_row])
+            metrics = frame[list(PEER_METRICS)].apply(pd.to_numeric, errors="coerce")
+            percentiles = metrics.rank(pct=True).loc[ticker]
+            medians = metrics.drop(index=ticker).median()
+            values = metrics.loc[ticker]
+            relative = values / medians.where(medians != 0)
+
+            comparison = {}
+            for metric in PEER_METRICS:
+                comparison[metric] = {
+                    "value": self._clean(values[metric]),
+                    "peer_median": self._clean(medians[metric]),
+                    "percentile_rank": self._clean(percentiles[metric]),
+                    "relative_to_median": self._clean(relative[metric])
+                }
+
+            result = {
+                "ticker": ticker,
+                "sector": sector,
+                "industry": industry,
+                "peer_group": peer_group,
+                "peer_count": int(len(metrics) - 1),
+                "peers": [t for t in metrics.index if t != ticker],
+                "metrics": comparison,
+                "calculated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+            self.logger.info(f"✅ Peer comparison calculated for {ticker} against {result['peer_count']} {peer_group} peers")
+            return result
+
+        except Exception as e:
+            self.logger.error(f"❌ Error calculating peer comparison for {ticker}: {str(e)}")
+            return {
+                "ticker": ticker,
+                "error": str(e),
+                "calculated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+
+    def _recent_or_fetch_info(self, ticker: str) -> Dict[str, Any]:
+        with self._lock:
+            info = self._recent_info.pop(ticker, None)
+        return info if info is not None else self._fetch_info(ticker)
+
+    def _fetch_info(self, ticker: str) -> Dict[str, Any]:
+        try:
+            with provider_call("yfinance"):
+                return yf.Ticker(ticker).info or {}
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not fetch info for {ticker}: {str(e)}")
+            return {}
+
+    def _store_metadata(self, ticker: str, info: Dict[str, Any]) -> Dict[str, Any]:
+        meta = {
+            "ticker": ticker,
+            "company_name": info.get("longName", "N/A"),
+            "sector": info.get("sector", "N/A"),
+            "industry": info.get("industry", "N/A"),
+            "exchange": info.get("exchange", "N/A")
+        }
+        if info:
+            self.metadata_cache.set(ticker, meta)
+        return meta
+
+    def _metric_row(self, ticker: str, meta: Dict[str, Any], info: Dict[str, Any]) -> Dict[str, Any]:
+        row = {"ticker": ticker, "industry": meta.get("industry")}
+        for metric, field in PEER_METRICS.items():
+            value = info.get(field)
+            row[metric] = value if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+        return row
+
+    def _clean(self, value: Any) -> Optional[float]:
+        return None if pd.isna(value) else round(float(value), 4)
+
+# global instance
+peer_comparison_tools = PeerComparisonTools()
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+Portfolio Analytics Tools
+Watchlist-level covariance, correlation clustering and risk concentration
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import logging
+
+from tools.market_data_tools import yahoo_finance_tools
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+
+class PortfolioAnalytics:
+    """
+    Whole-book risk view of a watchlist.
+
+    The estimator keeps running sums of the daily returns, so appending one day
+    updates the covariance and the Ledoit-Wolf shrinkage estimate in O(N^2)
+    without revisiting the history.
+    """
+
+    def __init__(self, tickers: List[str], weights: Optional[Dict[str, float]] = None,
+                 cluster_threshold: float = 0.5, max_position_weight: float = 0.20,
+                 max_risk_contribution: float = 0.25, max_cluster_weight: float = 0.40,
+                 high_correlation: float = 0.85):
+        """
+        Args:
+            tickers: Watchlist symbols
+            weights: Position weights per ticker (defaults to equal weight)
+            cluster_threshold: Minimum average correlation for tickers to share a cluster
+            max_position_weight, max_risk_contribution, max_cluster_weight: Concentration warning limits
+            high_correlation: Pairwise correlation above which a pair is flagged
+        """
+        self.tickers = list(tickers)
+        self.weights = weights
+        self.cluster_threshold = cluster_threshold
+        self.max_position_weight = max_position_weight
+        self.max_risk_contribution = max_risk_contribution
+        self.max_cluster_weight = max_cluster_weight
+        self.high_correlation = high_correlation
+        self.logger = logger
+        self._reset(len(self.tickers))
+
+    def load(self, period: str = "1y") -> "PortfolioAnalytics":
+        """Build the aligned return matrix for the watchlist from the price history"""
+        closes = yahoo_finance_tools.get_close_matrix(self.tickers, period)
+        dropped = [t for t in self.tickers if t not in closes.columns or closes[t].isna().all()]
+        if dropped:
+            self.logger.warning(f"⚠️ No price history for {dropped}; excluded from portfolio analytics")
+        closes = closes.drop(columns=[t for t in dropped if t in closes.columns])
+
+        # Align on common trading days; short gaps (e.g. halts) are forward-filled
+        returns = np.log(closes.ffill(limit=3)).diff().dropna(how="any")
+        self.tickers = list(returns.columns)
+        self.fit(returns.to_numpy(dtype=float))
+        self.dates = list(returns.index)
+        return self
+
+    def fit(self, returns: np.ndarray) -> "PortfolioAnalytics":
+        """Initialize the running sums from a (days x tickers) return matrix"""
+        self._reset(returns.shape[1])
+        squared_norms = np.einsum("ij,ij->i", returns, returns)
+        self.count = returns.shape[0]
+        self.sum_returns = returns.sum(axis=0)
+        self.sum_outer = returns.T @ returns
+        self.sum_norms = squared_norms.sum()
+        self.sum_norms_squared = (squared_norms ** 2).sum()
+        self.sum_norm_weighted = squared_norms @ returns
+        return self
+
+    def append_day(self, daily_returns: Dict[str, float], date: Any = None) -> "PortfolioAnalytics":
+        """
+        Incrementally add one day of returns (rank-1 update of every running sum)
+
+        Args:
+            daily_returns: Log return per ticker for the new day
+            date: Optional date label for the appended row
+        """
+        row = np.array([daily_returns[t] for t in self.tickers], dtype=float)
+        squared_norm = float(row @ row)
+        self.count += 1
+        self.sum_returns += row
+        self.sum_outer += np.outer(row, row)
+        self.sum_norms += squared_norm
+        self.sum_norms_squared += squared_norm ** 2
+        self.sum_norm_weighted += squared_norm * row
+        if date is not None:
+            self.dates.append(date)
+        return self
+
+    def covariance(self) -> np.ndarray:
+        """Daily sample covariance (1/T normalization, as used by Ledoit-Wolf)"""
+        mean = self.sum_returns / self.count
+        return self.sum_outer / self.count - np.outer(mean, mean)
+
+    def shrunk_covariance(self) -> Dict[str, Any]:
+        """
+        Ledoit-Wolf (2004) shrinkage towards a scaled identity, computed from the running sums
+
+        Returns:
+            Dict with the shrunk covariance matrix and the shrinkage intensity
+        """
+        n_days, n_assets = self.count, len(self.tickers)
+        mean = self.sum_returns / n_days
+        sample = self.covariance()
+        target_scale = np.trace(sample) / n_assets
+        dispersion = np.sum((sample - target_scale * np.eye(n_assets)) ** 2)
+
+        # sum_t ||x_t||^4 for demeaned x_t = r_t - mean, expanded in terms of the running sums
+        mean_norm = mean @ mean
+        fourth_moment = (self.sum_norms_squared
+                         + 4 * mean @ self.sum_outer @ mean
+                         + n_days * mean_norm ** 2
+                         - 4 * mean @ self.sum_norm_weighted
+                         + 2 * mean_norm * self.sum_norms
+                         - 4 * mean_norm * (mean @ self.sum_returns))
+        estimation_error = (fourth_moment - n_days * np.sum(sample ** 2)) / n_days ** 2
+        intensity = min(max(estimation_error, 0.0), dispersion) / dispersion if dispersion > 0 else 1.0
+
+        shrunk = intensity * target_scale * np.eye(n_assets) + (1 - intensity) * sample
+        return {"covariance": shrunk, "shrinkage_intensity": float(intensity)}
+
+    def correlation_clusters(self, correlation: np.ndarray) -> List[List[str]]:
+        """Average-linkage agglomerative clustering, merging while average correlation >= cluster_threshold"""
+        clusters = [[i] for i in range(len(self.tickers))]
+        similarity = correlation.copy()
+        np.fill_diagonal(similarity, -np.inf)
+        sizes = np.ones(len(clusters))
+        active = np.ones(len(clusters), dtype=bool)
+
+        while active.sum() > 1:
+            masked = np.where(np.outer(active, active), similarity, -np.inf)
+            i, j = np.unravel_index(np.argmax(masked), masked.shape)
+            if masked[i, j] < self.cluster_threshold:
+                break
+            # Average linkage: size-weighted mean of the merged clusters' similarities
+            merged = (similarity[i] * sizes[i] + similarity[j] * sizes[j]) / (sizes[i] + sizes[j])
+            similarity[i, :] = merged
+            similarity[:, i] = merged
+            similarity[i, i] = -np.inf
+            sizes[i] += sizes[j]
+            clusters[i].extend(clusters[j])
+            active[j] = False
+
+        return [[self.tickers[k] for k in clusters[c]] for c in np.flatnonzero(active)]
+
+    def analyze(self) -> Dict[str, Any]:
+        """
+        Compute the whole-book risk view in one pass
+
+        Returns:
+            Dict containing portfolio volatility, risk contributions, clusters and concentration warnings
+        """
+        try:
+            if self.count < 2 or not self.tickers:
+                return {"error": "Not enough aligned return history for portfolio analytics"}
+
+            weights = self._weight_vector()
+            shrinkage = self.shrunk_covariance()
+            covariance = shrinkage["covariance"]
+            volatilities = np.sqrt(np.diag(covariance))
+            correlation = covariance / np.outer(volatilities, volatilities)
+
+            portfolio_variance = float(weights @ covariance @ weights)
+            portfolio_volatility = np.sqrt(portfolio_variance)
+            marginal = covariance @ weights / portfolio_volatility
+            contributions = weights * marginal / portfolio_volatility
+            clusters = self.correlation_clusters(correlation)
+
+            result = {
+                "tickers": self.tickers,
+                "observations": int(self.count),
+                "shrinkage_intensity": round(shrinkage["shrinkage_intensity"], 4),
+                "portfolio_volatility": round(float(portfolio_volatility * np.sqrt(TRADING_DAYS)), 4),
+                "weights": {t: round(float(w), 4) for t, w in zip(self.tickers, weights)},
+                "annualized_volatility": {t: round(float(v * np.sqrt(TRADING_DAYS)), 4) for t, v in zip(self.tickers, volatilities)},
+                "marginal_risk_contribution": {t: round(float(m * np.sqrt(TRADING_DAYS)), 4) for t, m in zip(self.tickers, marginal)},
+                "risk_contribution_pct": {t: round(float(c), 4) for t, c in zip(self.tickers, contributions)},
+                "effective_number_of_bets": round(float(1 / np.sum(contributions ** 2)), 2),
+                "correlation_clusters": clusters,
+                "correlation_matrix": pd.DataFrame(correlation, index=self.tickers, columns=self.tickers).round(3),
+                "concentration_warnings": self._concentration_warnings(weights, contributions, correlation, clusters),
+                "calculated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+            self.logger.info(f"✅ Portfolio analytics calculated for {len(self.tickers)} tickers")
+            return result
+
+        except Exception as e:
+            self.logger.error(f"❌ Error calculating portfolio analytics: {str(e)}")
+            return {"error": str(e), "calculated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+
+    def _concentration_warnings(self, weights: np.ndarray, contributions: np.ndarray,
+                                correlation: np.ndarray, clusters: List[List[str]]) -> List[str]:
+        warnings = []
+        position = dict(zip(self.tickers, weights))
+        for ticker, weight, contribution in zip(self.tickers, weights, contributions):
+            if weight > self.max_position_weight:
+                warnings.append(f"{ticker} weight {weight:.1%} exceeds the {self.max_position_weight:.0%} position limit")
+            if contribution > self.max_risk_contribution:
+                warnings.append(f"{ticker} contributes {contribution:.1%} of portfolio risk")
+        for cluster in clusters:
+            cluster_weight = sum(position[t] for t in cluster)
+            if len(cluster) > 1 and cluster_weight > self.max_cluster_weight:
+                warnings.append(f"Correlated cluster {cluster} holds {cluster_weight:.1%} of the portfolio")
+        upper = np.triu(correlation, k=1)
+        for i, j in zip(*np.nonzero(upper > self.high_correlation)):
+            warnings.append(f"{self.tickers[i]} and {self.tickers[j]} are highly correlated ({correlation[i, j]:.2f})")
+        return warnings
+
+    def _weight_vector(self) -> np.ndarray:
+        if not self.weights:
+            return np.full(len(self.tickers), 1 / len(self.tickers))
+        weights = np.array([self.weights.get(t, 0.0) for t in self.tickers], dtype=float)
+        return weights / weights.sum()
+
+    def _reset(self, n_assets: int):
+        self.count = 0
+        self.dates = []
+        self.sum_returns = np.zeros(n_assets)
+        self.sum_outer = np.zeros((n_assets, n_assets))
+        self.sum_norms = 0.0
+        self.sum_norms_squared = 0.0
+        self.sum_norm_weighted = np.zeros(n_assets)
\ No newline at end of file
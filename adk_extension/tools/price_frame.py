@@ -0,0 +1,126 @@
+"""
+Compact Price Frame
+Array-backed daily price history with downcast columns and zero-copy period views
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+
+# Columns the tools actually read; Open, Dividends and Stock Splits are dropped
+PRICE_COLUMNS = ("Close", "High", "Low")
+VOLUME_COLUMN = "Volume"
+
+# Calendar-day lookback of the yfinance period strings that can be served as a slice
+PERIOD_DAYS = {"5d": 7, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827, "10y": 3653}
+
+class CompactPriceFrame:
+    """
+    Daily price history stored as plain numpy arrays.
+
+    Prices are float32 arrays (one per column), volume is uint32 when it fits and
+    dates are int32 days since the epoch, so a year of history takes about 5 KB
+    instead of the ~16 KB of a yfinance frame. The arrays may be memory-mapped (see
+    SharedPriceStore). Slicing a period returns views into the same arrays. Column
+    access returns a float64 pandas Series, so code written against history
+    DataFrames keeps working; array() gives the raw view.
+    """
+
+    __slots__ = ("days", "prices", "volume")
+
+    def __init__(self, days: np.ndarray, prices: Tuple[np.ndarray, ...], volume: np.ndarray):
+        self.days = days
+        self.prices = prices
+        self.volume = volume
+
+    @classmethod
+    def from_history(cls, history: pd.DataFrame) -> "CompactPriceFrame":
+        """
+        Build a compact frame from a yfinance history DataFrame
+
+        Args:
+            history: DataFrame from Ticker.history() or download()
+
+        Returns:
+            CompactPriceFrame keeping only Close, High, Low and Volume
+        """
+        index = history.index
+        if getattr(index, "tz", None) is not None:
+            # Exchange-local calendar date, so daily bars keep their trading day
+            index = index.tz_localize(None)
+        days = index.normalize().to_numpy(dtype="datetime64[D]").astype(np.int32)
+
+        prices = tuple(
+            history[column].to_numpy(dtype=np.float32) if column in history else np.full(len(history), np.nan, dtype=np.float32)
+            for column in PRICE_COLUMNS
+        )
+
+        volume = history[VOLUME_COLUMN].to_numpy() if VOLUME_COLUMN in history else np.zeros(len(history))
+        volume = np.nan_to_num(volume)
+        volume_dtype = np.uint32 if volume.size == 0 or volume.max() < np.iinfo(np.uint32).max else np.int64
+        return cls(days, prices, volume.astype(volume_dtype))
+
+    def __len__(self) -> int:
+        return self.days.size
+
+    @property
+    def empty(self) -> bool:
+        return self.days.size == 0
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.days.astype("datetime64[D]").astype("datetime64[ns]"))
+
+    @property
+    def columns(self):
+        return list(PRICE_COLUMNS) + [VOLUME_COLUMN]
+
+    @property
+    def nbytes(self) -> int:
+        return self.days.nbytes + sum(p.nbytes for p in self.prices) + self.volume.nbytes
+
+    def array(self, column: str) -> np.ndarray:
+        """Raw (read-only view) array for a column"""
+        if column == VOLUME_COLUMN:
+            values = self.volume
+        else:
+            values = self.prices[PRICE_COLUMNS.index(column)]
+        view = values.view()
+        view.flags.writeable = False
+        return view
+
+    def __getitem__(self, column: str) -> pd.Series:
+        # Widened on access so rounding and rolling windows behave as on the original frame
+        dtype = np.int64 if column == VOLUME_COLUMN else np.float64
+        return pd.Series(self.array(column).astype(dtype), index=self.index, name=column)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def slice_days(self, start_day: Optional[int] = None, end_day: Optional[int] = None) -> "CompactPriceFrame":
+        """
+        Zero-copy view of the rows with start_day <= day <= end_day (epoch days)
+        """
+        start = 0 if start_day is None else int(np.searchsorted(self.days, start_day, side="left"))
+        end = len(self) if end_day is None else int(np.searchsorted(self.days, end_day, side="right"))
+        return CompactPriceFrame(self.days[start:end], tuple(p[start:end] for p in self.prices), self.volume[start:end])
+
+    def slice_period(self, period: str) -> Optional["CompactPriceFrame"]:
+        """
+        Zero-copy view of the trailing yfinance period (e.g. '3mo' out of a '1y' frame)
+
+        Returns:
+            The view, or None when the period has no fixed lookback (e.g. 'ytd', 'max')
+        """
+        lookback = PERIOD_DAYS.get(period)
+        if lookback is None:
+            return None
+        if self.empty:
+            return self
+        return self.slice_days(start_day=int(self.days[-1]) - lookback + 1)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialize as a float64 DataFrame (copies)"""
+        data: Dict[str, np.ndarray] = {column: values.astype(float) for column, values in zip(PRICE_COLUMNS, self.prices)}
+        data[VOLUME_COLUMN] = self.volume.astype(np.int64)
+        return pd.DataFrame(data, index=self.index)
\ No newline at end of file
@@ -0,0 +1,291 @@
+"""
+Shared Price Store
+Memory-mapped daily price history shared read-only by every worker process
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+import numpy as np
+from typing import Dict, Any, List, Optional
+import logging
+from config import CACHE_DIR, PRICE_CACHE_TTL_SECONDS
+from tools.price_frame import CompactPriceFrame, PRICE_COLUMNS, PERIOD_DAYS
+
+logger = logging.getLogger(__name__)
+
+# One append-only file per field
+STORE_FIELDS = {
+    "days": np.int32,
+    "Close": np.float32,
+    "High": np.float32,
+    "Low": np.float32,
+    "Volume": np.int64,
+}
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = "store.lock"
+
+class PriceStoreSnapshot:
+    """
+    Consistent read-only view of the store as of one manifest version.
+
+    Every field file is mapped once; a ticker's frame is a set of views into
+    those mappings, so any number of processes share the same page cache.
+    """
+
+    def __init__(self, directory: str, manifest: Dict[str, Any]):
+        self.version = manifest["version"]
+        self.entries = manifest["tickers"]
+        self._arrays = {}
+        rows = manifest["rows"]
+        for field, dtype in STORE_FIELDS.items():
+            path = os.path.join(directory, f"{manifest['generation']}.{field}.bin")
+            # Only the rows published in this manifest are mapped; later appends are invisible
+            self._arrays[field] = np.memmap(path, dtype=dtype, mode="r", shape=(rows,)) if rows else np.empty(0, dtype=dtype)
+
+    @property
+    def tickers(self) -> List[str]:
+        return list(self.entries)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker.upper() in self.entries
+
+    def get(self, ticker: str, period: Optional[str] = None, max_age: Optional[float] = None) -> Optional[CompactPriceFrame]:
+        """
+        Zero-copy frame for a ticker
+
+        Args:
+            ticker: Stock symbol
+            period: Optional trailing period to slice out (must not exceed the stored period)
+            max_age: Optional maximum age in seconds of the stored history
+
+        Returns:
+            CompactPriceFrame backed by the memory-mapped files, or None if unavailable
+        """
+        entry = self.entries.get(ticker.upper())
+        if entry is None:
+            return None
+        if max_age is not None and time.time() - entry["stored_at"] > max_age:
+            return None
+        sliced = period is not None and period != entry["period"]
+        if sliced and PERIOD_DAYS.get(entry["period"], 0) < PERIOD_DAYS.get(period, float("inf")):
+            return None
+
+        rows = slice(entry["offset"], entry["offset"] + entry["length"])
+        frame = CompactPriceFrame(
+            self._arrays["days"][rows],
+            tuple(self._arrays[column][rows] for column in PRICE_COLUMNS),
+            self._arrays["Volume"][rows]
+        )
+        return frame.slice_period(period) if sliced else frame
+
+class SharedPriceStore:
+    """
+    Append-only price store: one binary file per field plus a JSON manifest
+    mapping each ticker to its (offset, length) segment.
+
+    Writers append new segments past the published rows and then atomically
+    replace the manifest, so readers holding an older snapshot keep a consistent
+    view. Rewriting a ticker appends a new segment (copy-on-write); compact()
+    drops the superseded segments into a new file generation. A superseded
+    generation's files are kept until the following compaction, so a reader that
+    loaded the previous manifest can still map them.
+    """
+
+    def __init__(self, directory: Optional[str] = None, lock_timeout: float = 30.0):
+        self.directory = directory or os.path.join(CACHE_DIR, "price_store")
+        self.lock_timeout = lock_timeout
+        self.logger = logger
+        self._snapshot = None
+        self._manifest_id = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def snapshot(self) -> PriceStoreSnapshot:
+        """
+        Current snapshot, remapped only when the manifest has changed
+
+        Returns:
+            PriceStoreSnapshot of the latest published manifest
+        """
+        try:
+            stat = os.stat(self._manifest_path())
+            manifest_id = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            manifest_id = None
+        if self._snapshot is None or manifest_id != self._manifest_id:
+            self._snapshot = PriceStoreSnapshot(self.directory, self._read_manifest())
+            self._manifest_id = manifest_id
+        return self._snapshot
+
+    def get(self, ticker: str, period: Optional[str] = None, max_age: Optional[float] = PRICE_CACHE_TTL_SECONDS) -> Optional[CompactPriceFrame]:
+        """Frame for a ticker from the latest snapshot (None if missing or stale)"""
+        return self.snapshot().get(ticker, period, max_age)
+
+    def write(self, frames: Dict[str, CompactPriceFrame], period: str) -> int:
+        """
+        Append price histories and publish them in one atomic manifest update
+
+        Args:
+            frames: Ticker -> CompactPriceFrame
+            period: yfinance period the histories cover
+
+        Returns:
+            Manifest version that now includes the frames
+        """
+        frames = {ticker.upper(): frame for ticker, frame in frames.items() if not frame.empty}
+        with self._lock():
+            manifest = self._read_manifest()
+            offset = manifest["rows"]
+            entries = dict(manifest["tickers"])
+            for ticker, frame in frames.items():
+                entries[ticker] = {"offset": offset, "length": len(frame), "period": period, "stored_at": time.time()}
+                offset += len(frame)
+
+            self._append(manifest["generation"], manifest["rows"], frames.values())
+            manifest.update({"version": manifest["version"] + 1, "rows": offset, "tickers": entries})
+            self._publish(manifest)
+
+        self.logger.info(f"✅ Published {len(frames)} price histories to the shared price store (version {manifest['version']})")
+        return manifest["version"]
+
+    def dead_ratio(self) -> float:
+        """Fraction of the stored rows that belong to superseded segments"""
+        manifest = self._read_manifest()
+        if not manifest["rows"]:
+            return 0.0
+        live = sum(entry["length"] for entry in manifest["tickers"].values())
+        return 1 - live / manifest["rows"]
+
+    def compact_if_needed(self, max_dead_ratio: float) -> Optional[int]:
+        """
+        Compact the store when superseded rows exceed max_dead_ratio of it
+
+        Returns:
+            Number of rows after compaction, or None if no compaction was needed
+        """
+        dead_ratio = self.dead_ratio()
+        if dead_ratio <= max_dead_ratio:
+            return None
+        self.logger.info(f"Shared price store is {dead_ratio:.0%} superseded rows, compacting")
+        return self.compact()
+
+    def compact(self) -> int:
+        """
+        Rewrite the live segments into a new file generation, dropping superseded rows
+
+        Returns:
+            Number of rows in the compacted store
+        """
+        with self._lock():
+            manifest = self._read_manifest()
+            snapshot = PriceStoreSnapshot(self.directory, manifest)
+            frames = {ticker: snapshot.get(ticker) for ticker in snapshot.entries}
+            generation = manifest["generation"] + 1
+
+            offset = 0
+            entries = {}
+            for ticker, frame in frames.items():
+                entries[ticker] = {**manifest["tickers"][ticker], "offset": offset}
+                offset += len(frame)
+            self._append(generation, 0, frames.values())
+
+            old_generation = manifest["generation"]
+            manifest.update({"version": manifest["version"] + 1, "generation": generation, "rows": offset, "tickers": entries})
+            self._publish(manifest)
+
+        # The generation just superseded may still be about to be mapped by a reader of the
+        # previous manifest, so only the ones before it are removed
+        self._remove_generations_before(old_generation)
+        self.logger.info(f"✅ Compacted shared price store to {offset} rows")
+        return offset
+
+    def _append(self, generation: int, published_rows: int, frames):
+        frames = list(frames)
+        for field, dtype in STORE_FIELDS.items():
+            path = self._field_path(generation, field)
+            with open(path, "ab") as f:
+                # Drop anything a crashed writer appended past the published rows
+                f.truncate(published_rows * np.dtype(dtype).itemsize)
+                for frame in frames:
+                    values = frame.days if field == "days" else frame.array(field)
+                    f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _remove_generations_before(self, generation: int):
+        for name in os.listdir(self.directory):
+            match = re.fullmatch(r"(\d+)\.\w+\.bin", name)
+            if match and int(match.group(1)) < generation:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def _publish(self, manifest: Dict[str, Any]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._manifest_path())
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"version": 0, "generation": 0, "rows": 0, "tickers": {}}
+
+    def _lock(self) -> "_StoreLock":
+        return _StoreLock(os.path.join(self.directory, LOCK_FILE), self.lock_timeout)
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    def _field_path(self, generation: int, field: str) -> str:
+        return os.path.join(self.directory, f"{generation}.{field}.bin")
+
+class _StoreLock:
+    """Cross-process writer lock based on exclusive creation of a lock file"""
+
+    def __init__(self, path: str, timeout: float, stale_after: float = 300.0):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return self
+            except FileExistsError:
+                try:
+                    # A lock left behind by a crashed writer is broken after stale_after seconds
+                    if time.time() - os.stat(self.path).st_mtime > self.stale_after:
+                        os.remove(self.path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for price store lock {self.path}")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        return False
+
+# global instance
+price_store = SharedPriceStore()
\ No newline at end of file
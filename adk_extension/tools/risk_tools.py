@@ -0,0 +1,148 @@
+"""
+Quantitative Risk Tools
+Local risk metrics computed from cached price history
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from statistics import NormalDist
+from typing import Dict, Any
+import logging
+
+from tools.market_data_tools import yahoo_finance_tools
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+
+class RiskTools:
+    """
+    Realized risk metrics (volatility, drawdown, VaR/CVaR, beta) for the risk assessment agent
+    """
+
+    def __init__(self, benchmark: str = "SPY", confidence: float = 0.95, beta_window: int = 63):
+        self.benchmark = benchmark
+        self.confidence = confidence
+        self.beta_window = beta_window
+        self.logger = logger
+
+    def get_risk_metrics(self, ticker: str, period: str = "1y") -> Dict[str, Any]:
+        """
+        Calculate risk metrics for a ticker against the benchmark
+
+        Args:
+            ticker: Stock symbol
+            period: Time period of price history to use
+
+        Returns:
+            Dict containing risk metrics as fractions, computed from daily log returns (volatility, return
+            and downside deviation annualized; VaR/CVaR are one-day losses)
+        """
+        try:
+            self.logger.info(f"Calculating risk metrics for {ticker}")
+
+            closes = yahoo_finance_tools.get_price_history(ticker, period)['Close']
+            benchmark_closes = yahoo_finance_tools.get_price_history(self.benchmark, period)['Close']
+            if len(closes) < 2:
+                return {"ticker": ticker, "error": "Not enough price history for risk metrics"}
+
+            aligned = pd.concat([closes, benchmark_closes], axis=1, join="inner").dropna().to_numpy(dtype=float)
+            returns = np.diff(np.log(closes.to_numpy(dtype=float)))
+            stock_returns = np.diff(np.log(aligned[:, 0]))
+            benchmark_returns = np.diff(np.log(aligned[:, 1]))
+
+            metrics = {"ticker": ticker, "benchmark": self.benchmark, "period": period, "observations": int(returns.size)}
+            metrics.update(self.calculate_metrics(closes.to_numpy(dtype=float), returns))
+            metrics.update(self.calculate_beta(stock_returns, benchmark_returns))
+            metrics["calculated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            self.logger.info(f"✅ Risk metrics calculated for {ticker}")
+            return metrics
+
+        except Exception as e:
+            self.logger.error(f"❌ Error calculating risk metrics for {ticker}: {str(e)}")
+            return {
+                "ticker": ticker,
+                "error": str(e),
+                "calculated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+
+    def calculate_metrics(self, closes: np.ndarray, returns: np.ndarray) -> Dict[str, Any]:
+        """Volatility, drawdown, VaR/CVaR and downside deviation from a close series and its log returns"""
+        alpha = 1 - self.confidence
+        mean, std = returns.mean(), returns.std(ddof=1)
+
+        # Maximum drawdown from the running peak
+        running_peak = np.maximum.accumulate(closes)
+        drawdowns = closes / running_peak - 1
+        trough = int(drawdowns.argmin())
+
+        # Historical VaR/CVaR from the empirical loss distribution
+        historical_var = -np.quantile(returns, alpha)
+        tail = returns[returns <= -historical_var]
+        historical_cvar = -tail.mean() if tail.size else historical_var
+
+        # Parametric (normal) VaR/CVaR
+        z = NormalDist().inv_cdf(alpha)
+        parametric_var = -(mean + z * std)
+        parametric_cvar = -(mean - std * NormalDist().pdf(z) / alpha)
+
+        downside = np.minimum(returns, 0)
+        confidence_label = f"{int(self.confidence * 100)}"
+
+        return {
+            "annualized_volatility": round(float(std * np.sqrt(TRADING_DAYS)), 4),
+            "annualized_return": round(float(mean * TRADING_DAYS), 4),
+            "max_drawdown": round(float(drawdowns[trough]), 4),
+            "current_drawdown": round(float(drawdowns[-1]), 4),
+            f"historical_var_{confidence_label}": round(float(historical_var), 4),
+            f"historical_cvar_{confidence_label}": round(float(historical_cvar), 4),
+            f"parametric_var_{confidence_label}": round(float(parametric_var), 4),
+            f"parametric_cvar_{confidence_label}": round(float(parametric_cvar), 4),
+            "downside_deviation": round(float(np.sqrt(np.mean(downside ** 2)) * np.sqrt(TRADING_DAYS)), 4)
+        }
+
+    def calculate_beta(self, stock_returns: np.ndarray, benchmark_returns: np.ndarray) -> Dict[str, Any]:
+        """Full-period beta plus rolling beta over beta_window days, computed with cumulative sums"""
+        if stock_returns.size < 2:
+            return {"beta": None, "rolling_beta_latest": None}
+
+        covariance = np.cov(stock_returns, benchmark_returns, ddof=1)
+        beta = covariance[0, 1] / covariance[1, 1] if covariance[1, 1] > 0 else None
+        correlation = covariance[0, 1] / np.sqrt(covariance[0, 0] * covariance[1, 1]) if covariance[1, 1] > 0 and covariance[0, 0] > 0 else None
+
+        result = {
+            "beta": round(float(beta), 3) if beta is not None else None,
+            "correlation_to_benchmark": round(float(correlation), 3) if correlation is not None else None,
+            "rolling_beta_latest": None
+        }
+
+        window = self.beta_window
+        if stock_returns.size >= window:
+            rolling = self._rolling_beta(stock_returns, benchmark_returns, window)
+            rolling = rolling[np.isfinite(rolling)]
+            if rolling.size:
+                result.update({
+                    "rolling_beta_window": window,
+                    "rolling_beta_latest": round(float(rolling[-1]), 3),
+                    "rolling_beta_min": round(float(rolling.min()), 3),
+                    "rolling_beta_max": round(float(rolling.max()), 3)
+                })
+        return result
+
+    def _rolling_beta(self, y: np.ndarray, x: np.ndarray, window: int) -> np.ndarray:
+        """Rolling OLS beta of y on x for every full window"""
+        def window_sums(values: np.ndarray) -> np.ndarray:
+            cumulative = np.concatenate(([0.0], np.cumsum(values)))
+            return cumulative[window:] - cumulative[:-window]
+
+        sum_x, sum_y = window_sums(x), window_sums(y)
+        sum_xy, sum_xx = window_sums(x * y), window_sums(x * x)
+        covariance = sum_xy - sum_x * sum_y / window
+        variance = sum_xx - sum_x ** 2 / window
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return covariance / variance
+
+# global instance
+risk_tools = RiskTools()
\ No newline at end of file
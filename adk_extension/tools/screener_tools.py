@@ -0,0 +1,139 @@
+"""
+Universe Screening Tools
+Vectorized investment scoring across a large ticker universe
+"""
+
+import yfinance as yf
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import logging
+
+from tools.custom_tools import calculate_investment_scores
+from utils.concurrency import get_limiter
+from utils.circuit_breaker import provider_call
+
+logger = logging.getLogger(__name__)
+
+class UniverseScreener:
+    """
+    Cheap local screening of a ticker universe using the proprietary scoring rules,
+    so that only the best candidates are sent through the LLM pipeline
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        # Threads only wait on I/O; the yfinance limiter decides how many requests are in flight
+        self.max_workers = max_workers or get_limiter("yfinance").max_limit
+        self.logger = logger
+
+    def fetch_fundamentals(self, tickers: List[str]) -> pd.DataFrame:
+        """
+        Bulk-fetch the fundamentals needed for scoring
+
+        Args:
+            tickers: Stock symbols to fetch
+
+        Returns:
+            DataFrame indexed by ticker with company_name, sector, pe_ratio, profit_margin and market_cap
+        """
+        self.logger.info(f"Fetching fundamentals for {len(tickers)} tickers")
+        batch = yf.Tickers(" ".join(tickers))
+
+        def fetch(ticker: str) -> Dict[str, Any]:
+            try:
+                with provider_call("yfinance"):
+                    info = batch.tickers[ticker].info
+            except Exception as e:
+                self.logger.warning(f"⚠️ Could not fetch fundamentals for {ticker}: {str(e)}")
+                info = {}
+            return {
+                "ticker": ticker,
+                "company_name": info.get("longName", ticker),
+                "sector": info.get("sector", "N/A"),
+                "pe_ratio": info.get("trailingPE"),
+                "profit_margin": info.get("profitMargins"),
+                "market_cap": info.get("marketCap")
+            }
+
+        # info requests are I/O bound, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            rows = list(executor.map(fetch, tickers))
+
+        fundamentals = pd.DataFrame(rows).set_index("ticker")
+        self.logger.info(f"✅ Retrieved fundamentals for {len(fundamentals)} tickers")
+        return fundamentals
+
+    def screen(self, fundamentals: pd.DataFrame, sentiments: Optional[Dict[str, Any]] = None,
+               params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """
+        Score every ticker in one vectorized pass and rank the universe
+
+        Args:
+            fundamentals: DataFrame indexed by ticker with pe_ratio and profit_margin columns
+            sentiments: Cached sentiment per ticker, either a label ('Positive') or a
+                get_company_news result; tickers without one are scored as Neutral
+            params: Optional overrides for the scoring rules
+
+        Returns:
+            DataFrame sorted by total_score with component scores, recommendation and rank
+        """
+        sentiments = sentiments or {}
+        labels = [self._sentiment_label(sentiments.get(ticker)) for ticker in fundamentals.index]
+
+        scores = calculate_investment_scores(
+            fundamentals["pe_ratio"].to_numpy(dtype=object),
+            fundamentals["profit_margin"].to_numpy(dtype=object),
+            labels,
+            params
+        )
+
+        ranked = fundamentals.copy()
+        ranked["sentiment_label"] = labels
+        ranked["valuation_score"] = scores["valuation"]
+        ranked["profitability_score"] = scores["profitability"]
+        ranked["sentiment_score"] = scores["sentiment"]
+        ranked["total_score"] = scores["total_score"]
+        ranked["recommendation"] = scores["recommendation"]
+
+        ranked = ranked.sort_values("total_score", ascending=False, kind="stable")
+        ranked["rank"] = range(1, len(ranked) + 1)
+        ranked.attrs["screened_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        self.logger.info(f"✅ Screened {len(ranked)} tickers")
+        return ranked
+
+    def top_k(self, ranked: pd.DataFrame, k: int, min_score: Optional[float] = None) -> List[str]:
+        """
+        Select the tickers worth sending through the full LLM pipeline
+
+        Args:
+            ranked: Output of screen()
+            k: Maximum number of tickers to return
+            min_score: Optional minimum total_score a ticker must reach
+
+        Returns:
+            List of the top-K tickers by score
+        """
+        if min_score is not None:
+            ranked = ranked[ranked["total_score"] >= min_score]
+        return list(ranked.index[:k])
+
+    def screen_universe(self, tickers: List[str], k: int, sentiments: Optional[Dict[str, Any]] = None,
+                        params: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Fetch, score and rank a universe, returning the top-K tickers"""
+        ranked = self.screen(self.fetch_fundamentals(tickers), sentiments, params)
+        selected = self.top_k(ranked, k)
+        self.logger.info(f"Screener selected {len(selected)}/{len(tickers)} tickers: {selected}")
+        return selected
+
+    def _sentiment_label(self, sentiment: Any) -> str:
+        """Normalize a cached sentiment entry to a label"""
+        if isinstance(sentiment, dict):
+            return sentiment.get('overall_sentiment', {}).get('sentiment', 'Neutral')
+        if isinstance(sentiment, str) and sentiment:
+            return sentiment
+        return 'Neutral'
+
+# global instance
+universe_screener = UniverseScreener()
\ No newline at end of file
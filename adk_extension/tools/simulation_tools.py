@@ -0,0 +1,180 @@
+"""
+Monte Carlo Simulation Tools
+Forward-looking price scenarios from cached price history
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from tools.market_data_tools import yahoo_finance_tools
+
+logger = logging.getLogger(__name__)
+
+class MonteCarloTools:
+    """
+    Chunked, vectorized GBM and block-bootstrap price simulations
+    """
+
+    def __init__(self, n_paths: int = 20000, horizons: Tuple[int, ...] = (5, 21, 63), block_size: int = 5,
+                 memory_budget_mb: int = 64, percentiles: Tuple[int, ...] = (5, 25, 50, 75, 95), seed: int = 42):
+        """
+        Args:
+            n_paths: Simulated paths per ticker and method
+            horizons: Trading-day horizons at which price bands are reported
+            block_size: Consecutive historical days drawn together by the bootstrap
+            memory_budget_mb: Upper bound for the return matrix of a single chunk
+            percentiles: Percentiles of the simulated price reported per horizon
+            seed: Base seed so repeated runs on the same data give the same bands
+        """
+        self.n_paths = n_paths
+        self.horizons = tuple(sorted(horizons))
+        self.block_size = block_size
+        self.memory_budget_mb = memory_budget_mb
+        self.percentiles = percentiles
+        self.seed = seed
+        self.logger = logger
+
+    def get_price_scenarios(self, ticker: str, period: str = "1y") -> Dict[str, Any]:
+        """
+        Simulate forward price scenarios for a ticker
+
+        Args:
+            ticker: Stock symbol
+            period: Time period of price history used to calibrate the simulation
+
+        Returns:
+            Dict containing percentile price bands and probability of loss per method and horizon
+        """
+        try:
+            self.logger.info(f"Simulating price scenarios for {ticker}")
+            closes = yahoo_finance_tools.get_price_history(ticker, period)['Close'].to_numpy(dtype=float)
+            result = self.simulate(closes, np.random.SeedSequence(self.seed))
+            result["ticker"] = ticker
+            self.logger.info(f"✅ Price scenarios simulated for {ticker}")
+            return result
+
+        except Exception as e:
+            self.logger.error(f"❌ Error simulating price scenarios for {ticker}: {str(e)}")
+            return {
+                "ticker": ticker,
+                "error": str(e),
+                "calculated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+
+    def get_price_scenarios_batch(self, tickers: List[str], period: str = "1y", max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Simulate scenarios for many tickers, fanning the CPU work out over a process pool
+
+        Args:
+            tickers: Stock symbols
+            period: Time period of price history used to calibrate the simulation
+            max_workers: Worker processes; 1 runs everything in the calling process
+
+        Returns:
+            Dict mapping ticker to its scenario result
+        """
+        # Price fetching is I/O bound and served from the shared cache, so it stays in this process
+        closes = {}
+        results = {}
+        for ticker in tickers:
+            try:
+                closes[ticker] = yahoo_finance_tools.get_price_history(ticker, period)['Close'].to_numpy(dtype=float)
+            except Exception as e:
+                results[ticker] = {"ticker": ticker, "error": str(e)}
+
+        names = list(closes)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(names))
+        if max_workers == 1:
+            simulated = [self.simulate(closes[name], seed) for name, seed in zip(names, seeds)]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                simulated = list(executor.map(self.simulate, [closes[name] for name in names], seeds))
+
+        for name, result in zip(names, simulated):
+            result["ticker"] = name
+            results[name] = result
+        self.logger.info(f"✅ Price scenarios simulated for {len(names)} tickers")
+        return results
+
+    def simulate(self, closes: np.ndarray, seed: np.random.SeedSequence) -> Dict[str, Any]:
+        """Run both simulation methods on a close price series"""
+        closes = closes[np.isfinite(closes)]
+        returns = np.diff(np.log(closes))
+        if returns.size < self.block_size * 2:
+            return {"error": "Not enough price history for simulation"}
+
+        gbm_seed, bootstrap_seed = seed.spawn(2)
+        last_price = float(closes[-1])
+        return {
+            "last_price": round(last_price, 2),
+            "n_paths": self.n_paths,
+            "gbm": self._summarize(last_price, self._simulate_terminal(returns, "gbm", np.random.default_rng(gbm_seed))),
+            "bootstrap": self._summarize(last_price, self._simulate_terminal(returns, "bootstrap", np.random.default_rng(bootstrap_seed))),
+            "calculated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def _simulate_terminal(self, returns: np.ndarray, method: str, rng: np.random.Generator) -> np.ndarray:
+        """
+        Simulate cumulative log returns at each horizon, in chunks that fit the memory budget.
+
+        Only the horizons are reported, so neither method materializes full daily paths:
+        GBM draws the independent normal increment between consecutive horizons, and the
+        bootstrap sums whole blocks from precomputed prefix sums of the history.
+
+        Returns:
+            Array of shape (n_paths, len(horizons))
+        """
+        horizons = np.array(self.horizons)
+        n_blocks = -(-int(horizons[-1]) // self.block_size)
+        # int64 block starts plus float64 block sums per path, plus the result columns
+        bytes_per_path = n_blocks * 16 + len(horizons) * 8
+        chunk_paths = max(1, min(self.n_paths, self.memory_budget_mb * 1024 * 1024 // bytes_per_path))
+
+        mean, std = float(returns.mean()), float(returns.std(ddof=1))
+        increments = np.diff(horizons, prepend=0)
+
+        # Circular prefix sums so any block (or partial block) sum is a single subtraction
+        extended = np.concatenate((returns, returns[:self.block_size]))
+        prefix = np.concatenate(([0.0], np.cumsum(extended)))
+        block_sums = prefix[self.block_size:self.block_size + returns.size] - prefix[:returns.size]
+        full_blocks, remainders = np.divmod(horizons, self.block_size)
+
+        cumulative = np.empty((self.n_paths, len(horizons)), dtype=np.float64)
+        for start in range(0, self.n_paths, chunk_paths):
+            size = min(chunk_paths, self.n_paths - start)
+            if method == "gbm":
+                # Log returns of a GBM are normal with the historical daily mean and volatility
+                steps = rng.standard_normal((size, len(horizons)))
+                steps *= std * np.sqrt(increments)
+                steps += mean * increments
+                np.cumsum(steps, axis=1, out=cumulative[start:start + size])
+            else:
+                # Circular block bootstrap keeps short-range autocorrelation and fat tails
+                block_starts = rng.integers(0, returns.size, size=(size, n_blocks))
+                whole = np.zeros((size, n_blocks + 1))
+                np.cumsum(block_sums[block_starts], axis=1, out=whole[:, 1:])
+                for column, (full, remainder) in enumerate(zip(full_blocks, remainders)):
+                    cumulative[start:start + size, column] = whole[:, full]
+                    if remainder:
+                        partial_start = block_starts[:, full]
+                        cumulative[start:start + size, column] += prefix[partial_start + remainder] - prefix[partial_start]
+        return cumulative
+
+    def _summarize(self, last_price: float, cumulative: np.ndarray) -> Dict[str, Any]:
+        """Percentile price bands and probability of loss per horizon"""
+        prices = last_price * np.exp(cumulative)
+        bands = np.percentile(prices, self.percentiles, axis=0)
+        summary = {}
+        for column, horizon in enumerate(self.horizons):
+            summary[f"{horizon}d"] = {
+                **{f"p{p}": round(float(bands[row, column]), 2) for row, p in enumerate(self.percentiles)},
+                "expected_price": round(float(prices[:, column].mean()), 2),
+                "probability_of_loss": round(float((cumulative[:, column] < 0).mean()), 4)
+            }
+        return summary
+
+# global instance
+monte_carlo_tools = MonteCarloTools()
\ No newline at end of file
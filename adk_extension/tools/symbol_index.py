@@ -0,0 +1,232 @@
+"""
+Symbol Index Tools
+Local ticker metadata index with exact, prefix and fuzzy lookup
+"""
+
+import bisect
+import difflib
+import re
+import threading
+import requests
+import yfinance as yf
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import logging
+from config import SYMBOL_INDEX_TTL_SECONDS
+from utils.disk_cache import DiskCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Nasdaq Trader symbol directories cover every NASDAQ, NYSE, NYSE American and NYSE Arca listing
+SYMBOL_DIRECTORIES = {
+    "nasdaq": "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt",
+    "other": "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt",
+}
+EXCHANGE_CODES = {"A": "NYSE American", "N": "NYSE", "P": "NYSE Arca", "Z": "Cboe BZX", "V": "IEX"}
+NAME_SUFFIX = re.compile(r"\s+-\s+.*$|\s+(Common Stock|Ordinary Shares|Class [A-Z] .*)$", re.IGNORECASE)
+
+class SymbolIndex:
+    """
+    In-memory symbol table refreshed in bulk from the exchange symbol directories.
+
+    Exact ticker lookup is a dict access; prefix search bisects a sorted list of
+    normalized names; fuzzy search only scores names that share a word with the query.
+    """
+
+    def __init__(self, max_postings: int = 500):
+        self.max_postings = max_postings
+        self.logger = logger
+        self.cache = DiskCache("symbols", SYMBOL_INDEX_TTL_SECONDS)
+        self.metadata_cache = DiskCache("metadata", float("inf"))
+        self._symbols = None
+        self._names = []
+        self._tokens = {}
+        self._remote_checks = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """
+        Exact ticker lookup
+
+        Args:
+            ticker: Stock symbol
+
+        Returns:
+            Dict with company_name, exchange, sector and industry, or None if unknown
+        """
+        ticker = ticker.strip().upper()
+        entry = self._find(ticker)
+        if entry is None:
+            return None
+        # Sector/industry come from the metadata cache filled by the peer tools, when available
+        if entry.get("sector") is None:
+            meta = self.metadata_cache.get(ticker)
+            if meta:
+                entry = {**entry, "sector": meta.get("sector"), "industry": meta.get("industry")}
+        return entry
+
+    def get_company_name(self, ticker: str) -> Optional[str]:
+        """Company name for a ticker, or None if the ticker is not in the index"""
+        entry = self._find(ticker)
+        return entry["company_name"] if entry else None
+
+    def is_known(self, ticker: str) -> bool:
+        """
+        Whether the ticker can be analyzed: listed in the index or, for symbols the exchange
+        directories do not cover (foreign listings such as '.NS' or '.TO', indices such as
+        '^GSPC'), trading on Yahoo Finance. Always True when the index could not be loaded
+        or Yahoo Finance cannot be reached, so an outage never rejects a valid symbol.
+        """
+        if not self._index() or self._find(ticker) is not None:
+            return True
+        return self._trades_on_yahoo(ticker.strip().upper())
+
+    def _find(self, ticker: str) -> Optional[Dict[str, Any]]:
+        symbols = self._index()
+        ticker = ticker.strip().upper()
+        # Yahoo writes share classes with '-' (BRK-B), the exchange directories with '.' (BRK.B)
+        for candidate in (ticker, ticker.replace("-", "."), ticker.replace(".", "-")):
+            if candidate in symbols:
+                return symbols[candidate]
+        return None
+
+    def _trades_on_yahoo(self, ticker: str) -> bool:
+        if ticker not in self._remote_checks:
+            try:
+                self._remote_checks[ticker] = not yf.Ticker(ticker).history(period="5d").empty
+            except Exception as e:
+                self.logger.warning(f"⚠️ Could not check {ticker} on Yahoo Finance, accepting it: {str(e)}")
+                return True
+            if self._remote_checks[ticker]:
+                self.logger.warning(f"⚠️ {ticker} is not in the symbol index but trades on Yahoo Finance, continuing")
+        return self._remote_checks[ticker]
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find tickers by company name: prefix matches first, then fuzzy matches
+
+        Args:
+            query: Company name or part of it (e.g. 'micro', 'Alphabet')
+            limit: Maximum number of results
+
+        Returns:
+            List of index entries, best match first
+        """
+        symbols = self._index()
+        normalized = self._normalize(query)
+        if not normalized:
+            return []
+
+        results = []
+        exact = symbols.get(query.strip().upper())
+        if exact:
+            results.append(exact["ticker"])
+
+        # Prefix matches on the sorted name list
+        position = bisect.bisect_left(self._names, (normalized, ""))
+        while position < len(self._names) and len(results) < limit:
+            name, ticker = self._names[position]
+            if not name.startswith(normalized):
+                break
+            if ticker not in results:
+                results.append(ticker)
+            position += 1
+
+        # Fuzzy matches among names sharing a (possibly misspelled) word with the query;
+        # generic words such as 'inc' or 'corp' are skipped so they do not flood the candidates
+        if len(results) < limit:
+            candidates = set()
+            for token in normalized.split():
+                words = [token] if token in self._tokens else difflib.get_close_matches(token, self._tokens, n=3, cutoff=0.8)
+                for word in words:
+                    if len(self._tokens[word]) <= self.max_postings:
+                        candidates.update(self._tokens[word])
+            scored = sorted(
+                ((self._similarity(normalized, self._normalize(symbols[t]["company_name"])), t)
+                 for t in candidates if t not in results),
+                reverse=True
+            )
+            results.extend(t for score, t in scored[:limit - len(results)] if score >= 0.6)
+
+        return [symbols[t] for t in results[:limit]]
+
+    def refresh(self) -> int:
+        """
+        Rebuild the index from the exchange symbol directories
+
+        Returns:
+            Number of symbols in the refreshed index
+        """
+        self.logger.info("Refreshing symbol index from exchange symbol directories")
+        symbols = {}
+        for source, url in SYMBOL_DIRECTORIES.items():
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+            lines = response.text.strip().splitlines()
+            header = lines[0].split("|")
+            for line in lines[1:]:
+                fields = dict(zip(header, line.split("|")))
+                if line.startswith("File Creation Time") or fields.get("Test Issue") == "Y":
+                    continue
+                ticker = (fields.get("Symbol") or fields.get("ACT Symbol") or "").strip().upper()
+                if not ticker:
+                    continue
+                exchange = "NASDAQ" if source == "nasdaq" else EXCHANGE_CODES.get(fields.get("Exchange"), fields.get("Exchange"))
+                symbols[ticker] = {
+                    "ticker": ticker,
+                    "company_name": NAME_SUFFIX.sub("", fields.get("Security Name", "")).strip(),
+                    "exchange": exchange,
+                    "etf": fields.get("ETF") == "Y",
+                    "sector": None,
+                    "industry": None
+                }
+
+        self.cache.set("index", symbols)
+        self._load(symbols)
+        self.logger.info(f"✅ Symbol index refreshed with {len(symbols)} symbols")
+        return len(symbols)
+
+    def _index(self) -> Dict[str, Dict[str, Any]]:
+        if self._symbols is not None:
+            return self._symbols
+        with self._lock:
+            if self._symbols is not None:
+                return self._symbols
+            symbols = self.cache.get("index")
+            if symbols is None:
+                try:
+                    self.refresh()
+                    return self._symbols
+                except Exception as e:
+                    # Fall back to a stale copy rather than hitting the network on every lookup
+                    self.logger.warning(f"⚠️ Could not refresh symbol index: {str(e)}")
+                    entry = self.cache.get_entry("index")
+                    symbols = entry["value"] if entry else {}
+            self._load(symbols)
+            return self._symbols
+
+    def _load(self, symbols: Dict[str, Dict[str, Any]]):
+        names = []
+        tokens = {}
+        for ticker, entry in symbols.items():
+            name = self._normalize(entry["company_name"])
+            names.append((name, ticker))
+            for token in set(name.split()):
+                tokens.setdefault(token, []).append(ticker)
+        names.sort()
+        self._names = names
+        self._tokens = tokens
+        self._symbols = symbols
+        self.loaded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def _similarity(self, query: str, name: str) -> float:
+        # Partial names ('internatonal business') are compared with the start of the full name too
+        return max(difflib.SequenceMatcher(None, query, name).ratio(),
+                   difflib.SequenceMatcher(None, query, name[:len(query)]).ratio())
+
+    def _normalize(self, name: str) -> str:
+        return " ".join(re.sub(r"[^a-z0-9 ]", " ", name.lower()).split())
+
+# global instance
+symbol_index = SymbolIndex()
\ No newline at end of file
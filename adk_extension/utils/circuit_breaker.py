@@ -0,0 +1,175 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT_SECONDS, PROVIDER_CONCURRENCY
+from utils.concurrency import get_limiter, is_throttle_error
+from utils.deadline import DeadlineExceeded, current_deadline, remaining_timeout
+
+class CircuitOpenError(Exception):
+    """Raised immediately, without calling the provider, while its circuit is open."""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} circuit is open (retry in {retry_in:.0f}s)")
+        self.provider = provider
+        self.retry_in = retry_in
+
+# Exception names that mean the provider itself is unhealthy, as opposed to a bad request
+PROVIDER_FAILURE_NAMES = ("Timeout", "Connection", "ServiceUnavailable", "InternalServerError",
+                          "DeadlineExceeded", "BadGateway", "Unavailable")
+
+def is_provider_failure(error: BaseException) -> bool:
+    """Whether an exception should count against the provider's circuit."""
+    if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+        return False
+    if is_throttle_error(error) or isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and status >= 500:
+        return True
+    return any(name in type(error).__name__ for name in PROVIDER_FAILURE_NAMES)
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one provider.
+
+    closed: calls pass through; failure_threshold consecutive failures open it.
+    open: calls fail immediately with CircuitOpenError for reset_timeout seconds.
+    half_open: one probe call is let through; success closes the circuit, failure
+    reopens it for another reset_timeout.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = "closed"
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._totals = {"rejected": 0, "opened": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def before_call(self) -> bool:
+        """
+        Admit or reject a call
+
+        Returns:
+            True if the admitted call is the half-open probe
+
+        Raises:
+            CircuitOpenError: while the circuit is open (or a probe is already running)
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            if state == "closed":
+                return False
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._totals["rejected"] += 1
+            raise CircuitOpenError(self.name, max(0.0, self._opened_at + self.reset_timeout - now))
+
+    def record_success(self, probe: bool = False):
+        with self._lock:
+            self._consecutive_failures = 0
+            if probe:
+                self._probe_in_flight = False
+            if self._state != "closed":
+                self._state = "closed"
+
+    def record_failure(self, probe: bool = False):
+        with self._lock:
+            self._consecutive_failures += 1
+            if probe:
+                self._probe_in_flight = False
+            if probe or self._consecutive_failures >= self.failure_threshold:
+                if self._state == "closed" or probe:
+                    self._totals["opened"] += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Gives up a probe whose outcome says nothing about the provider (e.g. our own deadline expired)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "provider": self.name,
+                "state": self._current_state(time.monotonic()),
+                "consecutive_failures": self._consecutive_failures,
+                **self._totals
+            }
+
+    def _current_state(self, now: float) -> str:
+        if self._state == "open" and now - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return self._state
+
+class ProviderCall:
+    """
+    Guard for one call to an external provider: circuit breaker check first (so an
+    open circuit fails in microseconds), then an adaptive concurrency slot. The wait
+    for a slot is capped by the calling thread's deadline, and a call is not started
+    once that deadline has passed.
+
+    Exceptions are classified automatically; call failed() for failures reported
+    without an exception (e.g. an HTTP 5xx response or an empty payload).
+    """
+
+    def __init__(self, provider: str, timeout: Optional[float] = None, kind: str = ""):
+        self.breaker = breakers[provider]
+        self.limiter = get_limiter(provider)
+        self.timeout = timeout
+        self.kind = kind
+        self._failed = False
+
+    def failed(self, throttled: bool = False):
+        self._failed = True
+        if throttled:
+            self.slot.throttled()
+
+    def __enter__(self) -> "ProviderCall":
+        self.slot = self.limiter.slot(remaining_timeout(self.timeout, f"{self.breaker.name} call"), self.kind)
+        self._probe = self.breaker.before_call()
+        try:
+            self.slot.__enter__()
+        except BaseException:
+            if self._probe:
+                self.breaker.record_failure(probe=True)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.slot.__exit__(exc_type, exc, tb)
+        deadline = current_deadline()
+        if exc is not None and deadline is not None and deadline.expired():
+            # Cut short by our own budget rather than by the provider
+            if self._probe:
+                self.breaker.release_probe()
+        elif self._failed or (exc is not None and is_provider_failure(exc)):
+            self.breaker.record_failure(self._probe)
+        else:
+            self.breaker.record_success(self._probe)
+        return False
+
+# One breaker per external provider, shared by every tool and agent in the process
+breakers = {
+    name: CircuitBreaker(name, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT_SECONDS)
+    for name in PROVIDER_CONCURRENCY
+}
+
+def provider_call(provider: str, timeout: Optional[float] = None, kind: str = "") -> ProviderCall:
+    return ProviderCall(provider, timeout, kind)
+
+def circuit_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Circuit state per provider."""
+    return {name: breaker.snapshot() for name, breaker in breakers.items()}
\ No newline at end of file
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config import PROVIDER_CONCURRENCY
+
+def is_throttle_error(error: BaseException) -> bool:
+    """Whether an exception means the provider is rate limiting us (HTTP 429 or equivalent)."""
+    status = getattr(getattr(error, "response", None), "status_code", None) or getattr(error, "code", None)
+    if status == 429:
+        return True
+    name = type(error).__name__
+    if "RateLimit" in name or "ResourceExhausted" in name or "TooManyRequests" in name:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one provider.
+
+    The limit grows by about one slot per round of successful requests while the
+    limit is actually in use and latency stays within latency_tolerance times the
+    baseline, shrinks gently when latency degrades, and is cut multiplicatively on
+    throttling or a high error rate (at most once per round trip, so a burst of
+    429s from requests already in flight counts as one signal).
+
+    Baselines are kept per request kind (e.g. the LLM stage), since a provider's
+    requests can differ in size by an order of magnitude: a long report draft must
+    not read as congestion against the baseline of a short risk summary.
+    """
+
+    def __init__(self, name: str, initial_limit: int = 4, min_limit: int = 1, max_limit: int = 32,
+                 backoff_factor: float = 0.5, latency_tolerance: float = 2.0, error_threshold: float = 0.2,
+                 window: int = 100):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.error_threshold = error_threshold
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._baselines = {}
+        self._last_decrease = 0.0
+        self._samples = deque(maxlen=window)
+        self._totals = {"requests": 0, "errors": 0, "throttled": 0}
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def slot(self, timeout: Optional[float] = None, kind: str = "") -> "_Slot":
+        """
+        Context manager holding one in-flight slot for the duration of a request
+
+        Exceptions raised inside are classified as throttling or errors; call
+        slot.throttled() for throttling that is reported without an exception.
+        kind selects the latency baseline the request is judged against.
+        """
+        return _Slot(self, timeout, kind)
+
+    def acquire(self, timeout: Optional[float] = None) -> int:
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < int(self._limit), timeout):
+                raise TimeoutError(f"Timed out waiting for a {self.name} concurrency slot")
+            self._in_flight += 1
+            return self._in_flight
+
+    def release(self, latency: float, outcome: str, saturated: bool, kind: str = ""):
+        """Record a finished request ('ok', 'error' or 'throttled') and adjust the limit."""
+        now = time.monotonic()
+        with self._condition:
+            self._in_flight -= 1
+            self._samples.append((now, latency, outcome))
+            self._totals["requests"] += 1
+
+            if outcome == "throttled":
+                self._totals["throttled"] += 1
+                self._decrease(self.backoff_factor, now, kind)
+            elif outcome == "error":
+                self._totals["errors"] += 1
+                errors = sum(1 for _, _, o in self._samples if o != "ok")
+                if len(self._samples) >= 10 and errors / len(self._samples) > self.error_threshold:
+                    self._decrease(self.backoff_factor, now, kind)
+            else:
+                # The baseline tracks the fastest recent latency of this kind but is allowed to drift up slowly
+                baseline = self._baselines.get(kind)
+                baseline = self._baselines[kind] = latency if baseline is None else min(latency, baseline * 1.01)
+                if latency > baseline * self.latency_tolerance:
+                    self._decrease(0.9, now, kind)
+                elif saturated:
+                    self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limit, in-flight count and measured rates over the recent window."""
+        with self._condition:
+            samples = list(self._samples)
+            baselines = dict(self._baselines)
+            snapshot = {
+                "provider": self.name,
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                **self._totals
+            }
+        latencies = np.array([latency for _, latency, _ in samples])
+        span = samples[-1][0] - samples[0][0] if len(samples) > 1 else 0.0
+        snapshot.update({
+            "window_requests": len(samples),
+            "throughput_per_second": round((len(samples) - 1) / span, 2) if span > 0 else None,
+            "error_rate": round(sum(1 for _, _, o in samples if o != "ok") / len(samples), 3) if samples else None,
+            "latency_p50": round(float(np.percentile(latencies, 50)), 3) if latencies.size else None,
+            "latency_p95": round(float(np.percentile(latencies, 95)), 3) if latencies.size else None,
+            "baseline_latency": {kind or "default": round(baseline, 3) for kind, baseline in baselines.items()}
+        })
+        return snapshot
+
+    def _decrease(self, factor: float, now: float, kind: str = ""):
+        # One decrease per round trip: requests already in flight report the same congestion
+        if now - self._last_decrease < self._baselines.get(kind, 0.0):
+            return
+        self._limit = max(self.min_limit, self._limit * factor)
+        self._last_decrease = now
+
+class _Slot:
+    def __init__(self, limiter: AdaptiveLimiter, timeout: Optional[float], kind: str = ""):
+        self.limiter = limiter
+        self.timeout = timeout
+        self.kind = kind
+        self._throttled = False
+
+    def throttled(self):
+        self._throttled = True
+
+    def __enter__(self) -> "_Slot":
+        in_flight = self.limiter.acquire(self.timeout)
+        self._saturated = in_flight >= self.limiter.limit
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        latency = time.monotonic() - self._started
+        if self._throttled or (exc is not None and is_throttle_error(exc)):
+            outcome = "throttled"
+        elif exc is not None:
+            outcome = "error"
+        else:
+            outcome = "ok"
+        self.limiter.release(latency, outcome, self._saturated, self.kind)
+        return False
+
+# One limiter per external provider, shared by every tool and agent in the process
+limiters = {
+    name: AdaptiveLimiter(name, initial_limit=initial, max_limit=maximum)
+    for name, (initial, maximum) in PROVIDER_CONCURRENCY.items()
+}
+
+def get_limiter(provider: str) -> AdaptiveLimiter:
+    return limiters[provider]
+
+def concurrency_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Limits and measured rates for every provider."""
+    return {name: limiter.snapshot() for name, limiter in limiters.items()}
\ No newline at end of file
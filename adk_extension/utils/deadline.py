@@ -0,0 +1,71 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a run's time budget is spent before a stage or provider call starts."""
+
+    def __init__(self, stage: str = ""):
+        super().__init__(f"Deadline exceeded{f' before {stage}' if stage else ''}")
+        self.stage = stage
+
+class Deadline:
+    """
+    Absolute time budget for one analysis run.
+
+    The deadline is activated on each stage's thread, so every provider call made
+    by the stage (through utils.circuit_breaker.provider_call) sees the remaining
+    budget without it being threaded through each tool's signature.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str = "") -> float:
+        """
+        Returns the remaining budget in seconds
+
+        Raises:
+            DeadlineExceeded: if nothing is left
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(stage)
+        return remaining
+
+    @contextmanager
+    def active(self) -> Iterator["Deadline"]:
+        """Makes this the calling thread's deadline for the duration of the block."""
+        previous = getattr(_local, "deadline", None)
+        _local.deadline = self
+        try:
+            yield self
+        finally:
+            _local.deadline = previous
+
+_local = threading.local()
+
+def current_deadline() -> Optional[Deadline]:
+    """The deadline active on the calling thread, if any."""
+    return getattr(_local, "deadline", None)
+
+def remaining_timeout(default: Optional[float] = None, stage: str = "") -> Optional[float]:
+    """
+    Timeout for a blocking call: the default, capped by the calling thread's deadline
+
+    Raises:
+        DeadlineExceeded: if the active deadline has already passed
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    remaining = deadline.check(stage)
+    return remaining if default is None else min(default, remaining)
\ No newline at end of file
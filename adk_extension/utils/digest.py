@@ -0,0 +1,113 @@
+import json
+import logging
+import re
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RISK_RATINGS = ("Low", "Moderate", "Elevated", "High")
+
+# Digest limits keep downstream prompts small even when the model is verbose
+MAX_DIGEST_ITEMS = 5
+MAX_DIGEST_STRING = 240
+
+# Field types: 'string', 'string_list', 'metric_map' (name -> number or string),
+# 'rating' (one of RISK_RATINGS) and 'rating_map' (category -> rating)
+DIGEST_SCHEMAS = {
+    "quantitative": {
+        "key_metrics": "metric_map",
+        "valuation_view": "string",
+        "technical_signal": "string",
+        "strengths": "string_list",
+        "weaknesses": "string_list"
+    },
+    "market": {
+        "overall_sentiment": "string",
+        "key_drivers": "string_list",
+        "catalysts": "string_list"
+    },
+    "risk": {
+        "overall_risk_rating": "rating",
+        "risk_ratings": "rating_map",
+        "top_risk_factors": "string_list"
+    }
+}
+
+FIELD_EXAMPLES = {
+    "string": "<one sentence>",
+    "string_list": [f"<up to {MAX_DIGEST_ITEMS} short items>"],
+    "metric_map": {"<metric name>": "<number or short value, exactly as in the data>"},
+    "rating": "|".join(RISK_RATINGS),
+    "rating_map": {"<risk category>": "|".join(RISK_RATINGS)}
+}
+
+def digest_example(kind: str) -> Dict[str, Any]:
+    """Placeholder digest showing the model the structure to fill in."""
+    return {field: FIELD_EXAMPLES[field_type] for field, field_type in DIGEST_SCHEMAS[kind].items()}
+
+def digest_instructions(kind: str) -> str:
+    """Prompt suffix asking for the stage's digest after its prose."""
+    return (
+        "After the summary, append a compact digest of it as a ```json code block that matches exactly "
+        f"this structure (no other keys): {json.dumps(digest_example(kind))}"
+    )
+
+def validate_digest(kind: str, data: Any) -> Dict[str, Any]:
+    """
+    Checks a digest against its schema and trims it to the digest limits
+
+    Raises:
+        ValueError: if a field is missing or has the wrong type
+    """
+    if not isinstance(data, dict):
+        raise ValueError("digest is not a JSON object")
+    digest = {}
+    for field, field_type in DIGEST_SCHEMAS[kind].items():
+        if field not in data:
+            raise ValueError(f"missing field '{field}'")
+        value = data[field]
+        if field_type == "string":
+            if not isinstance(value, str):
+                raise ValueError(f"'{field}' must be a string")
+            digest[field] = value.strip()[:MAX_DIGEST_STRING]
+        elif field_type == "string_list":
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise ValueError(f"'{field}' must be a list of strings")
+            digest[field] = [item.strip()[:MAX_DIGEST_STRING] for item in value[:MAX_DIGEST_ITEMS]]
+        elif field_type == "metric_map":
+            if not isinstance(value, dict) or not all(isinstance(v, (int, float, str)) for v in value.values()):
+                raise ValueError(f"'{field}' must map metric names to numbers or strings")
+            digest[field] = dict(value)
+        elif field_type == "rating":
+            digest[field] = _rating(field, value)
+        elif field_type == "rating_map":
+            if not isinstance(value, dict):
+                raise ValueError(f"'{field}' must map categories to ratings")
+            digest[field] = {str(category): _rating(field, rating) for category, rating in value.items()}
+    return digest
+
+def split_digest(text: str, kind: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Separates a stage response into its prose and validated digest
+
+    Returns:
+        (prose without the digest block, digest or None if missing or invalid)
+    """
+    match = None
+    for match in re.finditer(r"```(?:json)?\s*(\{.*?\})\s*```", text or "", re.DOTALL):
+        pass
+    if match is None:
+        logger.warning(f"⚠️ No {kind} digest in stage output; downstream stages will use the prose")
+        return text, None
+    prose = (text[:match.start()] + text[match.end():]).strip()
+    try:
+        return prose, validate_digest(kind, json.loads(match.group(1)))
+    except ValueError as e:
+        logger.warning(f"⚠️ Invalid {kind} digest ({str(e)}); downstream stages will use the prose")
+        return prose, None
+
+def _rating(field: str, value: Any) -> str:
+    for rating in RISK_RATINGS:
+        if isinstance(value, str) and value.strip().lower() == rating.lower():
+            return rating
+    raise ValueError(f"'{field}' must be one of {', '.join(RISK_RATINGS)}")
\ No newline at end of file
@@ -0,0 +1,61 @@
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Any, Optional
+
+from config import CACHE_DIR
+
+class DiskCache:
+    """
+    Small JSON file cache with a time-to-live, one file per key.
+
+    Writes go to a temporary file that is atomically renamed into place, so
+    concurrent readers never see a partially written entry.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: float, cache_dir: str = CACHE_DIR):
+        self.ttl_seconds = ttl_seconds
+        self.directory = os.path.join(cache_dir, namespace)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or older than the TTL (or max_age)."""
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        ttl = self.ttl_seconds if max_age is None else max_age
+        if time.time() - entry["stored_at"] > ttl:
+            return None
+        return entry["value"]
+
+    def get_entry(self, key: str) -> Optional[dict]:
+        """Return the raw entry ({'stored_at', 'value'}) regardless of age."""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        entry = {"stored_at": time.time(), "value": value}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, key: str) -> str:
+        safe_key = re.sub(r'[^A-Za-z0-9_.-]', '_', key)
+        return os.path.join(self.directory, f"{safe_key}.json")
\ No newline at end of file
@@ -0,0 +1,171 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Any, Dict, Optional
+
+from config import JOB_QUEUE_PATH, JOB_VISIBILITY_TIMEOUT_SECONDS, JOB_MAX_ATTEMPTS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_token TEXT,
+    leased_by TEXT,
+    lease_expires REAL,
+    available_at REAL NOT NULL,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+"""
+
+class SQLiteJobQueue:
+    """
+    Work queue in a single SQLite file, shared by worker processes and hosts.
+
+    A worker leases a job for visibility_timeout seconds and must complete it,
+    fail it or extend the lease before then. An expired lease makes the job
+    visible again, so a crashed worker's job is picked up by another one. Job ids
+    are chosen by the producer (e.g. 'run-date:ticker'), which makes enqueueing
+    idempotent; every state change checks the lease token, so a worker whose lease
+    expired cannot overwrite the result of the worker that took over.
+
+    SQLite locking needs a local disk or a network filesystem with working
+    advisory locks; point JOB_QUEUE_PATH at such a location for multi-host use.
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, visibility_timeout: float = JOB_VISIBILITY_TIMEOUT_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS, retry_delay: float = 30.0):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def enqueue(self, job_id: str, payload: Dict[str, Any]) -> bool:
+        """Add a job; returns False if a job with this id already exists (in any state)."""
+        return self.enqueue_many({job_id: payload}) == 1
+
+    def enqueue_many(self, jobs: Dict[str, Dict[str, Any]]) -> int:
+        """Add several jobs in one transaction; returns how many were new."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (job_id, payload, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(job_id, json.dumps(payload), self.max_attempts, now, now, now) for job_id, payload in jobs.items()]
+            )
+            conn.execute("COMMIT")
+            return conn.total_changes - before
+
+    def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Claim the next visible job
+
+        Args:
+            worker_id: Identifier of the calling worker (host:pid)
+
+        Returns:
+            Dict with job_id, payload, attempts and lease_token, or None if no job is ready
+        """
+        now = time.time()
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers cannot claim the same row
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose last lease expired after the final attempt are dead
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', lease_token = NULL, updated_at = ?, "
+                    "last_error = COALESCE(last_error, 'lease expired') "
+                    "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                    (now, now)
+                )
+                row = conn.execute(
+                    "SELECT job_id, payload, attempts FROM jobs "
+                    "WHERE (status = 'queued' AND available_at <= ?) OR (status = 'leased' AND lease_expires < ?) "
+                    "ORDER BY available_at LIMIT 1",
+                    (now, now)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                job_id, payload, attempts = row
+                token = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_token = ?, leased_by = ?, "
+                    "lease_expires = ?, updated_at = ? WHERE job_id = ?",
+                    (token, worker_id, now + self.visibility_timeout, now, job_id)
+                )
+                conn.execute("COMMIT")
+                return {"job_id": job_id, "payload": json.loads(payload), "attempts": attempts + 1, "lease_token": token}
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, job_id: str, lease_token: str) -> bool:
+        """Extend a lease by another visibility_timeout; False if the lease was lost."""
+        now = time.time()
+        return self._update_leased(
+            job_id, lease_token,
+            "lease_expires = ?, updated_at = ?", (now + self.visibility_timeout, now)
+        )
+
+    def complete(self, job_id: str, lease_token: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark a leased job done; False if the lease had already expired and moved on."""
+        return self._update_leased(
+            job_id, lease_token,
+            "status = 'done', lease_token = NULL, result = ?, updated_at = ?", (json.dumps(result, default=str), time.time())
+        )
+
+    def fail(self, job_id: str, lease_token: str, error: str) -> bool:
+        """Release a leased job after an error: retried later, or failed once attempts run out."""
+        now = time.time()
+        return self._update_leased(
+            job_id, lease_token,
+            "status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END, "
+            "lease_token = NULL, available_at = ? + ? * attempts, last_error = ?, updated_at = ?",
+            (now, self.retry_delay, error, now)
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _update_leased(self, job_id: str, lease_token: str, assignments: str, params: tuple) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ? AND status = 'leased' AND lease_token = ?",
+                (*params, job_id, lease_token)
+            )
+            return cursor.rowcount == 1
+
+    def _connect(self) -> "closing[sqlite3.Connection]":
+        # Autocommit; multi-statement operations open their own transaction
+        return closing(sqlite3.connect(self.path, timeout=30, isolation_level=None))
\ No newline at end of file
@@ -0,0 +1,142 @@
+import abc
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+
+import requests
+
+from config import LLM_BACKEND, LLM_STANDIN_URL, GOOGLE_API_KEY
+
+class LLMResponse:
+    """Text and token usage of one completion, whatever backend produced it."""
+
+    def __init__(self, text: str, model: str, prompt_tokens: Optional[int] = None, output_tokens: Optional[int] = None):
+        self.text = text
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+
+    @property
+    def total_tokens(self) -> Optional[int]:
+        if self.prompt_tokens is None or self.output_tokens is None:
+            return None
+        return self.prompt_tokens + self.output_tokens
+
+class LLMBackend(abc.ABC):
+    """
+    Interface every LLM backend implements.
+
+    generate() is required; the async, streaming and batch variants default to
+    wrapping it and are overridden where the provider has native support.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def generate(self, model: str, prompt: str, timeout: Optional[float] = None) -> LLMResponse:
+        """Completes one prompt."""
+
+    async def agenerate(self, model: str, prompt: str, timeout: Optional[float] = None) -> LLMResponse:
+        return await asyncio.to_thread(self.generate, model, prompt, timeout)
+
+    def stream(self, model: str, prompt: str, timeout: Optional[float] = None) -> Iterator[str]:
+        """Yields the completion in text chunks as they arrive."""
+        yield self.generate(model, prompt, timeout).text
+
+    def batch(self, model: str, prompts: List[str], timeout: Optional[float] = None, max_workers: int = 4) -> List[LLMResponse]:
+        """Completes several prompts concurrently, returning responses in prompt order."""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda prompt: self.generate(model, prompt, timeout), prompts))
+
+class GeminiBackend(LLMBackend):
+    """Google AI (google.generativeai) backend."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str):
+        # Imported here so the stand-in backend runs without the Google SDK configured
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._models = {}
+
+    def generate(self, model: str, prompt: str, timeout: Optional[float] = None) -> LLMResponse:
+        response = self._model(model).generate_content(prompt, request_options=self._options(timeout))
+        return self._response(model, response)
+
+    async def agenerate(self, model: str, prompt: str, timeout: Optional[float] = None) -> LLMResponse:
+        response = await self._model(model).generate_content_async(prompt, request_options=self._options(timeout))
+        return self._response(model, response)
+
+    def stream(self, model: str, prompt: str, timeout: Optional[float] = None) -> Iterator[str]:
+        for chunk in self._model(model).generate_content(prompt, stream=True, request_options=self._options(timeout)):
+            if chunk.text:
+                yield chunk.text
+
+    def _model(self, model: str):
+        # Accept LiteLLM-style names ('gemini/gemini-2.5-flash') shared with the CrewAI configuration
+        model = model.split("/", 1)[-1]
+        if model not in self._models:
+            self._models[model] = self._genai.GenerativeModel(model_name=model)
+        return self._models[model]
+
+    def _options(self, timeout: Optional[float]) -> Optional[dict]:
+        return {"timeout": timeout} if timeout else None
+
+    def _response(self, model: str, response) -> LLMResponse:
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResponse(
+            response.text, model,
+            getattr(usage, "prompt_token_count", None),
+            getattr(usage, "candidates_token_count", None)
+        )
+
+class StandInBackend(LLMBackend):
+    """
+    Client for the local stand-in server (standin_server.py), which speaks the
+    OpenAI-compatible chat completions protocol.
+    """
+
+    name = "standin"
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self._session = requests.Session()
+
+    def generate(self, model: str, prompt: str, timeout: Optional[float] = None) -> LLMResponse:
+        response = self._session.post(f"{self.base_url}/v1/chat/completions", json=self._body(model, prompt), timeout=timeout)
+        response.raise_for_status()
+        body = response.json()
+        usage = body.get("usage", {})
+        return LLMResponse(
+            body["choices"][0]["message"]["content"], model,
+            usage.get("prompt_tokens"), usage.get("completion_tokens")
+        )
+
+    def stream(self, model: str, prompt: str, timeout: Optional[float] = None) -> Iterator[str]:
+        with self._session.post(f"{self.base_url}/v1/chat/completions", json=self._body(model, prompt, stream=True),
+                                timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith(b"data: "):
+                    continue
+                data = line[len(b"data: "):]
+                if data == b"[DONE]":
+                    return
+                content = json.loads(data)["choices"][0]["delta"].get("content")
+                if content:
+                    yield content
+
+    def _body(self, model: str, prompt: str, stream: bool = False) -> dict:
+        return {"model": model, "messages": [{"role": "user", "content": prompt}], "stream": stream}
+
+def create_backend(name: str = LLM_BACKEND) -> LLMBackend:
+    if name == "gemini":
+        return GeminiBackend(GOOGLE_API_KEY)
+    if name == "standin":
+        return StandInBackend(LLM_STANDIN_URL)
+    raise ValueError(f"Unknown LLM backend '{name}' (expected 'gemini' or 'standin')")
+
+# global instance
+llm_backend = create_backend()
\ No newline at end of file
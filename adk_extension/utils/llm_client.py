@@ -0,0 +1,192 @@
+import logging
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config import (LLM_TIMEOUT_SECONDS, LLM_MAX_ATTEMPTS, LLM_RETRY_BACKOFF_SECONDS,
+                    LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES, LLM_OUTPUT_TOKEN_ESTIMATE, PROVIDER_CONCURRENCY)
+from utils.circuit_breaker import is_provider_failure, provider_call
+from utils.deadline import DeadlineExceeded, current_deadline, remaining_timeout
+from utils.llm_backends import LLMBackend, LLMResponse, llm_backend
+from utils.llm_scheduler import LLMRateScheduler, estimate_tokens, llm_scheduler
+from utils.model_router import ModelRouter, model_router
+
+logger = logging.getLogger(__name__)
+
+class LatencyTracker:
+    """
+    Rolling per-stage latency samples of individual LLM calls, plus retry and hedge
+    counters, used to pick hedge delays and to tune them.
+    """
+
+    def __init__(self, window: int = 200):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._counters = defaultdict(lambda: {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0})
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, latency: float):
+        with self._lock:
+            self._samples[stage].append(latency)
+            self._counters[stage]["calls"] += 1
+
+    def count(self, stage: str, counter: str):
+        with self._lock:
+            self._counters[stage][counter] += 1
+
+    def percentile(self, stage: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Latency percentile for the stage, or None until min_samples calls have been seen."""
+        with self._lock:
+            samples = list(self._samples.get(stage, ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        return float(np.percentile(samples, q))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """p50/p95/p99 latency and retry/hedge counts per stage."""
+        with self._lock:
+            stages = {stage: (list(samples), dict(self._counters[stage])) for stage, samples in self._samples.items()}
+        snapshot = {}
+        for stage, (samples, counters) in stages.items():
+            latencies = np.array(samples)
+            snapshot[stage] = {
+                **counters,
+                "latency_p50": round(float(np.percentile(latencies, 50)), 3),
+                "latency_p95": round(float(np.percentile(latencies, 95)), 3),
+                "latency_p99": round(float(np.percentile(latencies, 99)), 3)
+            }
+        return snapshot
+
+class LLMClient:
+    """
+    LLM calls with a per-request timeout, retries with jittered exponential backoff
+    for transient failures, and optional hedging.
+
+    Only provider failures (timeouts, connection errors, 5xx, throttling) are retried;
+    bad requests, safety blocks, an open circuit or an expired run deadline fail at once.
+    Once a stage has hedge_min_samples calls on record, a duplicate request is sent if the
+    first has not answered within the stage's hedge_percentile latency, and whichever
+    answers first wins. Every attempt and hedge is admitted by the rate scheduler and
+    goes through provider_call, so quota, the adaptive concurrency limit and the
+    circuit breaker still apply. With a model router, every call's outcome is recorded
+    against its model and retries are re-routed, so a failing model's stage can move
+    to a faster tier mid-stage.
+    """
+
+    def __init__(self, backend: LLMBackend, timeout: float = 60.0, max_attempts: int = 3, backoff_seconds: float = 1.0,
+                 hedge_percentile: float = 95.0, hedge_min_samples: int = 20, max_workers: int = 16,
+                 scheduler: Optional[LLMRateScheduler] = None, output_tokens: int = 1500,
+                 router: Optional[ModelRouter] = None):
+        self.backend = backend
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.router = router
+        self.output_tokens = output_tokens
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = LatencyTracker()
+        self.logger = logger
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+
+    def generate(self, model: str, prompt: str, stage: str, lane: str = "interactive") -> LLMResponse:
+        """
+        Generate content for one pipeline stage
+
+        Args:
+            model: Model name, passed to the backend
+            prompt: Prompt text
+            stage: Stage name the latency metrics and hedge delay are kept under
+            lane: Scheduler lane, 'interactive' or 'batch'
+
+        Returns:
+            LLMResponse with the completion text and token usage
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return self._hedged(model, prompt, stage, lane)
+            except Exception as e:
+                if attempt == self.max_attempts or not is_provider_failure(e):
+                    raise
+                delay = random.uniform(0.5, 1.0) * self.backoff_seconds * 2 ** (attempt - 1)
+                deadline = current_deadline()
+                if deadline is not None and deadline.remaining() <= delay:
+                    raise DeadlineExceeded(f"{stage} retry") from e
+                self.latencies.count(stage, "retries")
+                self.logger.warning(f"⚠️ {stage}: LLM call failed ({str(e)}), retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+                if self.router is not None:
+                    model = self.router.model_for(stage, remaining_timeout(stage=stage))
+
+    def _hedged(self, model: str, prompt: str, stage: str, lane: str) -> LLMResponse:
+        hedge_delay = None
+        if self.hedge_percentile:
+            hedge_delay = self.latencies.percentile(stage, self.hedge_percentile, self.hedge_min_samples)
+        if hedge_delay is None:
+            return self._call(model, prompt, stage, lane)
+
+        # Hedge threads run outside the caller's thread, so they are handed its deadline explicitly
+        deadline = current_deadline()
+        primary = self._executor.submit(self._call, model, prompt, stage, lane, deadline)
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        self.latencies.count(stage, "hedges")
+        hedge = self._executor.submit(self._call, model, prompt, stage, lane, deadline)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self.latencies.count(stage, "hedge_wins")
+                    # The loser keeps its slot until it returns; its timeout bounds how long that is
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _call(self, model: str, prompt: str, stage: str, lane: str, deadline=None) -> LLMResponse:
+        if deadline is not None:
+            with deadline.active():
+                return self._call(model, prompt, stage, lane)
+        charged = None
+        if self.scheduler is not None:
+            estimate = estimate_tokens(prompt, self.output_tokens)
+            charged = self.scheduler.acquire(estimate, lane, stage, remaining_timeout(stage=stage))
+        started = time.monotonic()
+        try:
+            # The stand-in backend shares Gemini's limiter and circuit, so load tests exercise them too
+            with provider_call("gemini", kind=stage):
+                response = self.backend.generate(model, prompt, remaining_timeout(self.timeout, stage))
+        except Exception as e:
+            if self.router is not None and is_provider_failure(e):
+                self.router.record(model, stage, failed=True)
+            raise
+        latency = time.monotonic() - started
+        self.latencies.record(stage, latency)
+        if self.router is not None:
+            self.router.record(model, stage, latency)
+        if charged is not None:
+            self.scheduler.settle(charged, response.total_tokens)
+        return response
+
+# global instance
+llm_client = LLMClient(
+    llm_backend,
+    timeout=LLM_TIMEOUT_SECONDS,
+    max_attempts=LLM_MAX_ATTEMPTS,
+    backoff_seconds=LLM_RETRY_BACKOFF_SECONDS,
+    hedge_percentile=LLM_HEDGE_PERCENTILE,
+    hedge_min_samples=LLM_HEDGE_MIN_SAMPLES,
+    max_workers=2 * PROVIDER_CONCURRENCY["gemini"][1],
+    scheduler=llm_scheduler,
+    output_tokens=LLM_OUTPUT_TOKEN_ESTIMATE,
+    router=model_router
+)
\ No newline at end of file
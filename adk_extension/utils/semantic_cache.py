@@ -0,0 +1,134 @@
+import logging
+import math
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config import (SEMANTIC_CACHE_SIMILARITY, SEMANTIC_CACHE_MAX_AGE_SECONDS, SEMANTIC_CACHE_ENTRIES,
+                    SEMANTIC_CACHE_KEY_TOLERANCE)
+from utils.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z]+|-?\d+(?:\.\d+)?")
+
+def _normalize_token(token: str) -> str:
+    # Numbers are compared at two significant figures, so a price that moved a few cents is the same feature
+    if token[0].isalpha():
+        return token
+    return format(float(f"{float(token):.2g}"), "g")
+
+def vectorize(text: str, dimensions: int = 4096) -> np.ndarray:
+    """
+    Offline fingerprint of a text: word unigrams and bigrams hashed into a fixed-size,
+    L2-normalized vector with sublinear term weights, so cosine similarity is a dot product.
+    """
+    tokens = [_normalize_token(t) for t in TOKEN_PATTERN.findall(text.lower())]
+    features = Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+    vector = np.zeros(dimensions)
+    for feature, count in features.items():
+        vector[zlib.crc32(feature.encode("utf-8")) % dimensions] += 1 + math.log(count)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class SemanticCache:
+    """
+    Reuses an LLM response when a stage's input is nearly identical to one already answered.
+
+    Entries are kept per scope (stage and ticker) on disk, newest first, up to max_entries.
+    A lookup returns the stored response whose input is most similar to the new one, if the
+    cosine similarity of their fingerprints reaches similarity_threshold and the entry is
+    younger than max_age_seconds. Only the input data is fingerprinted, not the prompt
+    template, so the shared instructions do not inflate similarity.
+
+    Numbers are a small share of the fingerprint, so a caller can also pass the key
+    figures the response depends on: an entry is only a candidate if each numeric figure
+    is within key_tolerance (relative) of the cached one and every other figure is equal.
+    """
+
+    def __init__(self, namespace: str, similarity_threshold: float = 0.95, max_age_seconds: float = 21600,
+                 max_entries: int = 8, key_tolerance: float = 0.02):
+        self.similarity_threshold = similarity_threshold
+        self.key_tolerance = key_tolerance
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max(1, max_entries)
+        self.cache = DiskCache(namespace, float("inf"))
+        self.logger = logger
+        self._stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def lookup(self, scope: str, text: str, key_figures: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Stored response for the most similar fresh input in the scope
+
+        Args:
+            scope: Cache scope, e.g. 'market_research:AAPL'
+            text: Input data the response would be generated from
+            key_figures: Figures the response depends on, compared with the entry's before similarity
+
+        Returns:
+            The stored response, or None if no fresh entry is similar enough
+        """
+        best, best_similarity = None, -1.0
+        entries = self._fresh_entries(scope)
+        if key_figures:
+            candidates = [entry for entry in entries if self._figures_agree(entry.get("figures") or {}, key_figures)]
+            if entries and not candidates:
+                self.logger.info(f"Semantic cache miss for {scope}: key figures have changed")
+            entries = candidates
+        if entries:
+            query = vectorize(text)
+            for entry in entries:
+                similarity = float(query @ vectorize(entry["input"]))
+                if similarity > best_similarity:
+                    best, best_similarity = entry, similarity
+
+        hit = best is not None and best_similarity >= self.similarity_threshold
+        with self._lock:
+            self._stats["hits" if hit else "misses"] += 1
+        if not hit:
+            if best is not None:
+                self.logger.info(f"Semantic cache miss for {scope}: best similarity {best_similarity:.3f}")
+            return None
+        age_minutes = (time.time() - best["stored_at"]) / 60
+        self.logger.info(f"✅ Semantic cache hit for {scope}: similarity {best_similarity:.3f}, "
+                         f"response {age_minutes:.0f} min old")
+        return best["response"]
+
+    def store(self, scope: str, text: str, response: str, key_figures: Optional[Dict[str, Any]] = None):
+        entry = {"input": text, "response": response, "figures": key_figures or {}, "stored_at": time.time()}
+        entries = [entry] + self._fresh_entries(scope)
+        self.cache.set(scope, entries[:self.max_entries])
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _figures_agree(self, cached: Dict[str, Any], current: Dict[str, Any]) -> bool:
+        for name, value in current.items():
+            old = cached.get(name)
+            numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (value, old))
+            if numeric:
+                if abs(value - old) > self.key_tolerance * max(abs(old), abs(value)):
+                    return False
+            elif value != old:
+                return False
+        return True
+
+    def _fresh_entries(self, scope: str) -> List[Dict[str, Any]]:
+        entries = self.cache.get(scope) or []
+        return [entry for entry in entries if time.time() - entry["stored_at"] < self.max_age_seconds]
+
+# global instance
+semantic_cache = SemanticCache(
+    "semantic_responses",
+    similarity_threshold=SEMANTIC_CACHE_SIMILARITY,
+    max_age_seconds=SEMANTIC_CACHE_MAX_AGE_SECONDS,
+    max_entries=SEMANTIC_CACHE_ENTRIES,
+    key_tolerance=SEMANTIC_CACHE_KEY_TOLERANCE
+)
\ No newline at end of file
@@ -0,0 +1,99 @@
+import argparse
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+
+from utils.logging_setup import setup_logging
+from utils.job_queue import SQLiteJobQueue
+from config import PEER_UNIVERSE, BATCH_ANALYSIS_DEADLINE_SECONDS
+from main import analyze_ticker
+
+def enqueue(queue: SQLiteJobQueue, tickers, run_id: str, logger):
+    """
+    Adds one job per ticker. Job ids are '<run_id>:<ticker>', so re-running the
+    same command for a run does not duplicate work.
+    """
+    jobs = {f"{run_id}:{ticker}": {"ticker": ticker, "run_id": run_id} for ticker in tickers}
+    added = queue.enqueue_many(jobs)
+    logger.info(f"Enqueued {added} new jobs for run {run_id} ({len(jobs) - added} already present)")
+
+def work(queue: SQLiteJobQueue, worker_id: str, logger, idle_exit_seconds: float, poll_seconds: float = 5.0):
+    """
+    Leases jobs and runs the ADK stage pipeline for each until the queue stays empty.
+    """
+    idle_since = time.monotonic()
+
+    while True:
+        job = queue.lease(worker_id)
+        if job is None:
+            if time.monotonic() - idle_since > idle_exit_seconds:
+                logger.info(f"No jobs for {idle_exit_seconds:.0f}s, worker {worker_id} exiting. Queue: {queue.stats()}")
+                return
+            time.sleep(poll_seconds)
+            continue
+
+        ticker = job["payload"]["ticker"]
+        logger.info(f"--- Worker {worker_id} leased {job['job_id']} (attempt {job['attempts']}) ---")
+
+        # Keep the lease alive while the pipeline runs; a crashed worker simply stops heartbeating
+        stop = threading.Event()
+        def heartbeat():
+            while not stop.wait(queue.visibility_timeout / 3):
+                if not queue.heartbeat(job["job_id"], job["lease_token"]):
+                    logger.warning(f"⚠️ Lost lease on {job['job_id']}")
+                    return
+        threading.Thread(target=heartbeat, daemon=True).start()
+
+        try:
+            # Queued jobs are background work: they yield Gemini quota to interactive runs and get the batch deadline
+            report_path = analyze_ticker(ticker, logger, deadline_seconds=BATCH_ANALYSIS_DEADLINE_SECONDS, lane="batch")
+        except Exception as e:
+            report_path = None
+            error = str(e)
+        else:
+            error = "Pipeline stage failed"
+        finally:
+            stop.set()
+
+        if report_path:
+            if queue.complete(job["job_id"], job["lease_token"], {"report_path": report_path, "worker": worker_id}):
+                logger.info(f"✅ Completed {job['job_id']}")
+            else:
+                # Another worker took over after our lease expired; its result (same report path) stands
+                logger.warning(f"⚠️ Lease on {job['job_id']} expired before completion")
+        else:
+            queue.fail(job["job_id"], job["lease_token"], error)
+            logger.error(f"❌ Job {job['job_id']} failed: {error}")
+        idle_since = time.monotonic()
+
+def main():
+    """
+    Distributed worker mode: any number of processes or hosts pull ticker jobs from
+    the shared SQLite queue and write reports to the shared report store.
+
+    python worker.py enqueue AAPL,MSFT [--run-id 2024-01-31]
+    python worker.py work [--idle-exit 60]
+    python worker.py status
+    """
+    parser = argparse.ArgumentParser(description="ADK investment analysis worker")
+    parser.add_argument("command", choices=["enqueue", "work", "status"])
+    parser.add_argument("tickers", nargs="?", help="Comma-separated tickers to enqueue (defaults to the peer universe)")
+    parser.add_argument("--run-id", default=datetime.now().strftime("%Y-%m-%d"), help="Run identifier used in job ids")
+    parser.add_argument("--idle-exit", type=float, default=60.0, help="Seconds without jobs before a worker exits")
+    args = parser.parse_args()
+
+    logger = setup_logging()
+    queue = SQLiteJobQueue()
+
+    if args.command == "enqueue":
+        tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()] if args.tickers else PEER_UNIVERSE
+        enqueue(queue, tickers, args.run_id, logger)
+    elif args.command == "work":
+        work(queue, f"{socket.gethostname()}:{os.getpid()}", logger, args.idle_exit)
+    else:
+        logger.info(f"Queue status: {queue.stats()}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
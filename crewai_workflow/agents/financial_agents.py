@@ -6,23 +6,90 @@ CrewAI agent definitions with specialized roles
 from crewai import Agent, LLM
 from crewai.tools import tool
 import os
+import time
 from langchain_google_genai import ChatGoogleGenerativeAI
-from config.settings import GOOGLE_API_KEY, LLM_MODEL, LLM_TEMPERATURE
+from config.settings import (GOOGLE_API_KEY, LLM_MODEL, LLM_TEMPERATURE, LLM_OUTPUT_TOKEN_ESTIMATE, LLM_BACKEND,
+                             LLM_STANDIN_URL, LLM_CALL_BUDGET_SECONDS)
 from tools.market_data_tools import yahoo_finance_tools
 from tools.news_tools import news_api_tools
+from tools.fundamentals_tools import fundamentals_tools
+from tools.peer_tools import peer_comparison_tools
+from utils.llm_scheduler import estimate_tokens, llm_scheduler
+from utils.model_router import model_router
+from utils.provider_errors import is_provider_failure
 
 # Configure LLM for agents
-os.environ["GOOGLE_API_KEY"] = GOOGLE_API_KEY
+if GOOGLE_API_KEY:
+    os.environ["GOOGLE_API_KEY"] = GOOGLE_API_KEY
 
-from crewai import LLM
-from config.settings import LLM_MODEL, LLM_PROVIDER, LLM_TEMPERATURE
+class ScheduledLLM(LLM):
+    """
+    CrewAI LLM whose calls are admitted by the process-wide rate scheduler, so every
+    agent shares one requests-per-minute and tokens-per-minute budget.
+
+    An LLM created for an agent routes each call through the model router: the call goes
+    to the agent's tier model unless that model is at risk, in which case the faster
+    tier's LLM answers it. Every call's latency and outcome are recorded per model.
+
+    Calls are queued under the agent's name as the scheduler stage, so agents closer to
+    the finished report are admitted first. The quota charged up front with the expected
+    output size is settled against the size of the actual response.
+    """
+
+    lane = "interactive"
+    stage = None
+    tier_model = LLM_MODEL
+
+    def call(self, messages, *args, **kwargs):
+        llm = self
+        if self.stage is not None:
+            model = model_router.model_for(self.stage, LLM_CALL_BUDGET_SECONDS)
+            if model != self.tier_model:
+                llm = tier_llm(model)
+        return llm.scheduled_call(self.stage, messages, *args, **kwargs)
+
+    def scheduled_call(self, stage, messages, *args, **kwargs):
+        text = messages if isinstance(messages, str) else " ".join(str(m.get("content", "")) for m in messages)
+        charged = llm_scheduler.acquire(estimate_tokens(text, LLM_OUTPUT_TOKEN_ESTIMATE), self.lane, stage or "")
+        started = time.monotonic()
+        try:
+            response = super().call(messages, *args, **kwargs)
+        except Exception as e:
+            # Bad requests and tool errors say nothing about the model's health
+            if is_provider_failure(e):
+                model_router.record(self.tier_model, stage, failed=True)
+            raise
+        model_router.record(self.tier_model, stage, time.monotonic() - started)
+        # CrewAI returns text without provider usage, so settle on the prompt plus the actual output size
+        llm_scheduler.settle(charged, estimate_tokens(text + str(response or "")))
+        return response
+
+def create_gemini_llm(model: str = LLM_MODEL, stage: str = None):
+    if LLM_BACKEND == "standin":
+        # The stand-in server speaks the OpenAI chat completions protocol
+        llm = ScheduledLLM(
+            model=f"openai/{model.split('/')[-1]}",
+            base_url=f"{LLM_STANDIN_URL.rstrip('/')}/v1",
+            api_key="standin",
+            temperature=LLM_TEMPERATURE
+        )
+    else:
+        llm = ScheduledLLM(
+            model=model,
+            api_key=GOOGLE_API_KEY,
+            temperature=LLM_TEMPERATURE
+        )
+    llm.tier_model = model
+    llm.stage = stage
+    return llm
 
-def create_gemini_llm():
-    return LLM(
-        model="gemini/gemini-2.5-flash", 
-        api_key=GOOGLE_API_KEY,
-        temperature=LLM_TEMPERATURE
-    )
+# One shared LLM per tier model, used when an agent's calls are routed to a faster tier
+_tier_llms = {}
+
+def tier_llm(model: str) -> ScheduledLLM:
+    if model not in _tier_llms:
+        _tier_llms[model] = create_gemini_llm(model)
+    return _tier_llms[model]
 
 
 class FinancialAgents:
@@ -31,7 +98,13 @@ class FinancialAgents:
     """
     
     def __init__(self):
-        self.llm = create_gemini_llm()
+        self.llms = {}
+
+    def _llm(self, agent: str) -> ScheduledLLM:
+        """LLM for an agent, on the model of the tier it is routed to (STAGE_MODEL_TIERS)."""
+        if agent not in self.llms:
+            self.llms[agent] = create_gemini_llm(model_router.model_for(agent), agent)
+        return self.llms[agent]
     
     def portfolio_manager(self) -> Agent:
         """
@@ -53,7 +126,7 @@ class FinancialAgents:
             - Set quality standards for the final investment recommendation""",
             verbose=True,
             allow_delegation=True,
-            llm=self.llm,
+            llm=self._llm("portfolio_manager"),
             max_iter=3,
             memory=True
         )
@@ -80,9 +153,9 @@ class FinancialAgents:
             of investment decisions.""",
             verbose=True,
             allow_delegation=False,
-            llm=self.llm,
+            llm=self._llm("quantitative_analyst"),
             max_iter=2,
-            tools=[get_stock_data_tool, get_technical_indicators_tool]  
+            tools=[get_stock_data_tool, get_technical_indicators_tool, get_financial_ratios_tool, get_peer_comparison_tool]
         )
     
     def market_intelligence_researcher(self) -> Agent:
@@ -107,7 +180,7 @@ class FinancialAgents:
             investment insights.""",
             verbose=True,
             allow_delegation=False,
-            llm=self.llm,
+            llm=self._llm("market_intelligence_researcher"),
             max_iter=2,
             tools=[get_company_news_tool, get_market_news_tool]  # ← Fixed reference
         )
@@ -134,8 +207,9 @@ class FinancialAgents:
             balanced, realistic risk assessments that help investors make informed decisions.""",
             verbose=True,
             allow_delegation=False,
-            llm=self.llm,
-            max_iter=2
+            llm=self._llm("risk_assessment_specialist"),
+            max_iter=2,
+            tools=[get_financial_ratios_tool]
         )
     
     def investment_report_writer(self) -> Agent:
@@ -162,7 +236,7 @@ class FinancialAgents:
             opportunities and risks.""",
             verbose=True,
             allow_delegation=False,
-            llm=self.llm,
+            llm=self._llm("investment_report_writer"),
             max_iter=2
         )
     
@@ -188,7 +262,7 @@ class FinancialAgents:
             investment communications meet the highest standards of accuracy and compliance.""",
             verbose=True,
             allow_delegation=False,
-            llm=self.llm,
+            llm=self._llm("compliance_validator"),
             max_iter=2
         )
 
@@ -205,6 +279,18 @@ def get_technical_indicators_tool(ticker: str, period: str = "3mo") -> str:
     data = yahoo_finance_tools.get_technical_indicators(ticker, period)
     return str(data)
 
+@tool
+def get_financial_ratios_tool(ticker: str) -> str:
+    """Retrieve leverage, liquidity, profitability and growth ratios from the latest financial statements"""
+    data = fundamentals_tools.get_ratios(ticker)
+    return str(data)
+
+@tool
+def get_peer_comparison_tool(ticker: str) -> str:
+    """Compare valuation and profitability metrics with sector peers (medians and percentile ranks)"""
+    data = peer_comparison_tools.compare(ticker)
+    return str(data)
+
 @tool
 def get_company_news_tool(company_name: str, ticker: str, days_back: int = 7) -> str:
     """Retrieve recent news about a company"""
@@ -8,12 +8,70 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
 LLM_MODEL = os.getenv("LLM_MODEL", "gemini/gemini-2.5-flash")
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "google")
+# 'gemini' (Google AI API) or 'standin' (local stand-in server, see adk_extension/standin_server.py)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+LLM_STANDIN_URL = os.getenv("LLM_STANDIN_URL", "http://127.0.0.1:8765")
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.1"))
 
 DEFAULT_COMPANY = os.getenv("DEFAULT_COMPANY", "TSLA")
 ANALYSIS_PERIOD = os.getenv("ANALYSIS_PERIOD", "1y")
 NEWS_LOOKBACK_DAYS = int(os.getenv("NEWS_LOOKBACK_DAYS", "7"))
 
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+FUNDAMENTALS_CACHE_TTL_SECONDS = int(os.getenv("FUNDAMENTALS_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Candidate peers for sector comparison (comma-separated tickers)
+PEER_UNIVERSE = [t.strip().upper() for t in os.getenv("PEER_UNIVERSE", ",".join([
+    "AAPL", "MSFT", "NVDA", "GOOGL", "META", "AMZN", "TSLA", "ORCL", "CRM", "ADBE", "AMD", "INTC", "CSCO", "IBM", "QCOM", "AVGO",
+    "JPM", "BAC", "WFC", "GS", "MS", "C", "V", "MA", "AXP", "BLK",
+    "JNJ", "PFE", "MRK", "ABBV", "LLY", "UNH", "TMO", "ABT", "BMY", "AMGN",
+    "XOM", "CVX", "COP", "SLB", "EOG",
+    "WMT", "COST", "HD", "MCD", "NKE", "SBUX", "LOW", "TGT",
+    "PG", "KO", "PEP", "PM", "MO", "CL",
+    "BA", "CAT", "GE", "HON", "UPS", "LMT", "DE",
+    "DIS", "NFLX", "CMCSA", "T", "VZ",
+    "NEE", "DUK", "SO", "AMT", "PLD", "LIN", "APD"
+])).split(",") if t.strip()]
+
+# Ticker metadata (name, sector, industry) rarely changes; peer metrics move daily
+METADATA_CACHE_TTL_SECONDS = int(os.getenv("METADATA_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+PEER_SNAPSHOT_TTL_SECONDS = int(os.getenv("PEER_SNAPSHOT_TTL_SECONDS", str(24 * 3600)))
+
+# Listed symbols are refreshed in bulk from the exchange symbol directories
+SYMBOL_INDEX_TTL_SECONDS = int(os.getenv("SYMBOL_INDEX_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Process-wide Gemini quota shared by every agent in the crew
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+LLM_OUTPUT_TOKEN_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKEN_ESTIMATE", "1500"))
+
+# Model tiers, fastest first, and the tier each agent uses ("agent=tier,..."; unlisted agents use the last tier)
+LLM_FAST_MODEL = os.getenv("LLM_FAST_MODEL", LLM_MODEL)
+LLM_QUALITY_MODEL = os.getenv("LLM_QUALITY_MODEL", "gemini/gemini-2.5-pro")
+LLM_MODEL_TIERS = {"fast": LLM_FAST_MODEL, "quality": LLM_QUALITY_MODEL}
+STAGE_MODEL_TIERS = dict(
+    pair.strip().split("=", 1) for pair in os.getenv("STAGE_MODEL_TIERS", ",".join([
+        "portfolio_manager=quality", "quantitative_analyst=fast", "market_intelligence_researcher=fast",
+        "risk_assessment_specialist=quality", "investment_report_writer=quality", "compliance_validator=quality"
+    ])).split(",") if "=" in pair
+)
+
+# An agent falls back to a faster tier when its model's p95 latency exceeds this share of the per-call
+# latency budget or its recent error rate is too high; an avoided model is retried after LLM_ROUTING_PROBE_SECONDS
+LLM_CALL_BUDGET_SECONDS = float(os.getenv("LLM_CALL_BUDGET_SECONDS", "120"))
+LLM_ROUTING_BUDGET_SHARE = float(os.getenv("LLM_ROUTING_BUDGET_SHARE", "0.5"))
+LLM_ROUTING_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTING_MAX_ERROR_RATE", "0.25"))
+LLM_ROUTING_MIN_SAMPLES = int(os.getenv("LLM_ROUTING_MIN_SAMPLES", "5"))
+LLM_ROUTING_PROBE_SECONDS = float(os.getenv("LLM_ROUTING_PROBE_SECONDS", "60"))
+
+# Final reports are cached per ticker: served as is within the freshness window while the price and news
+# have not moved past the thresholds, otherwise served stale (up to the max age) while they are regenerated
+REPORT_CACHE = os.getenv("REPORT_CACHE", "true").lower() == "true"
+REPORT_CACHE_FRESH_SECONDS = float(os.getenv("REPORT_CACHE_FRESH_SECONDS", "3600"))
+REPORT_CACHE_MAX_STALE_SECONDS = float(os.getenv("REPORT_CACHE_MAX_STALE_SECONDS", str(24 * 3600)))
+REPORT_CACHE_PRICE_MOVE = float(os.getenv("REPORT_CACHE_PRICE_MOVE", "0.02"))
+REPORT_CACHE_NEWS_CHANGE = float(os.getenv("REPORT_CACHE_NEWS_CHANGE", "0.3"))
+
 MCP_ENABLED = True
 A2A_PROTOCOL_ENABLED = True
 
@@ -24,7 +82,7 @@ def validate_config():
     """Validate that all required configurations are set"""
     if not NEWS_API_KEY:
         raise ValueError("NEWS_API_KEY not found in environment variables")
-    if not GOOGLE_API_KEY:
+    if LLM_BACKEND == "gemini" and not GOOGLE_API_KEY:
         raise ValueError("GOOGLE_API_KEY not found in environment variables")
     
     print("✅ Configuration validated successfully!")
@@ -4,7 +4,11 @@ Run complete investment analysis workflow
 """
 
 from workflows.investment_crew import investment_crew
-from config.settings import validate_config
+from config.settings import validate_config, REPORT_CACHE
+from tools.symbol_index import symbol_index
+from tools.market_data_tools import yahoo_finance_tools
+from tools.news_tools import news_api_tools
+from utils.report_cache import data_fingerprint, report_cache
 import sys
 import logging
 import re
@@ -30,6 +34,59 @@ def get_clean_report(result: dict) -> str:
     else:
         return str(result)
 
+def current_fingerprint(ticker: str) -> dict:
+    """Fingerprint of the ticker's price and news as they are now, for comparison with a cached report."""
+    stock_data = yahoo_finance_tools.get_stock_data(ticker, "5d")
+    # Same company name as execute_analysis searches news for, or the headlines would never match
+    company_name = symbol_index.get_company_name(ticker) or stock_data.get("company_name", ticker)
+    return data_fingerprint(
+        stock_data.get("current_price"),
+        news_api_tools.get_company_news(company_name, ticker)
+    )
+
+def generate_report(ticker: str, current_date: str) -> bool:
+    """
+    Runs the crew for a ticker, then prints, saves and caches its final report.
+
+    Returns:
+        False if the crew returned an error message instead of a report
+    """
+    # Fingerprint the data the crew is about to see, so a cached copy can tell when it has moved
+    fingerprint = None
+    if REPORT_CACHE:
+        try:
+            fingerprint = current_fingerprint(ticker)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not fingerprint data for {ticker}, the report will not be cached: {str(e)}")
+
+    # Execute the analysis with verbose output
+    raw_result = investment_crew.execute_analysis(ticker=ticker, current_date=current_date) 
+    
+    final_report = get_clean_report(raw_result)
+    
+    # Display results
+    print("\n" + "=" * 60)
+    print("📄 INVESTMENT ANALYSIS REPORT")
+    print("=" * 60)
+    print(final_report)
+    
+    os.makedirs("outputs", exist_ok=True)
+    
+    output_file = f"outputs/investment_report_{ticker.lower()}.md"
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(final_report)
+        print(f"\n💾 Report saved to: {output_file}")
+    except Exception as e:
+        print(f"\n⚠️ Could not save report: {str(e)}")
+        logger.error(f"File save error: {str(e)}")
+
+    # execute_analysis returns an error message instead of raising
+    succeeded = not (isinstance(raw_result, str) and raw_result.startswith("❌"))
+    if fingerprint is not None and succeeded:
+        report_cache.store(ticker, final_report, fingerprint)
+    return succeeded
+
 def main():
     """Main function to run investment analysis"""
     print("🚀 Investment Analysis System - CrewAI Implementation")
@@ -55,9 +112,34 @@ def main():
             if not ticker:
                 ticker = "TSLA"
 
+        # Catch typos locally before any crew or API work starts
+        if not symbol_index.is_known(ticker):
+            suggestions = [f"{entry['ticker']} ({entry['company_name']})" for entry in symbol_index.search(ticker)]
+            print(f"\n❌ Unknown ticker: {ticker}")
+            if suggestions:
+                print(f"   Did you mean: {', '.join(suggestions)}?")
+            return
+
         # Get the current date and format it
         current_date = datetime.now().strftime("%B %d, %Y")
         
+        # Reports still fresh in the report cache are served without running the crew
+        stale_report = None
+        if REPORT_CACHE:
+            cached = report_cache.lookup(ticker, lambda: current_fingerprint(ticker))
+            if cached is not None:
+                report, status = cached
+                if status == "fresh":
+                    print("\n" + "=" * 60)
+                    print("📄 CACHED INVESTMENT ANALYSIS REPORT")
+                    print("=" * 60)
+                    print(report)
+                    return
+                # A one-shot CLI has no process left to refresh in the background, so a stale report
+                # is regenerated now and only shown if the crew fails
+                print(f"\n♻️ Cached report for {ticker} is out of date, regenerating it")
+                stale_report = report
+
         print(f"\n🎯 Starting analysis for: {ticker} (Report Date: {current_date})") 
         print("⏳ Watch the parallel execution below...")
         print("-" * 60)
@@ -66,27 +148,12 @@ def main():
         print("⏳ Watch the parallel execution below...")
         print("-" * 60)
         
-        # Execute the analysis with verbose output
-        raw_result = investment_crew.execute_analysis(ticker=ticker, current_date=current_date) 
-        
-        final_report = get_clean_report(raw_result)
-        
-        # Display results
-        print("\n" + "=" * 60)
-        print("📄 INVESTMENT ANALYSIS REPORT")
-        print("=" * 60)
-        print(final_report)
-        
-        os.makedirs("outputs", exist_ok=True)
-        
-        output_file = f"outputs/investment_report_{ticker.lower()}.md"
-        try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(final_report)
-            print(f"\n💾 Report saved to: {output_file}")
-        except Exception as e:
-            print(f"\n⚠️ Could not save report: {str(e)}")
-            logger.error(f"File save error: {str(e)}")
+        if not generate_report(ticker, current_date) and stale_report is not None:
+            print("\n" + "=" * 60)
+            print("📄 CACHED INVESTMENT ANALYSIS REPORT (STALE)")
+            print("=" * 60)
+            print(stale_report)
+            return
         
         print("\n🎉 Analysis completed successfully!")
         
@@ -0,0 +1,3 @@
+"""
+Shared utilities for the Finance Agents system
+"""
\ No newline at end of file
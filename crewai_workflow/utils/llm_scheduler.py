@@ -0,0 +1,140 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE
+
+# Interactive single-ticker runs preempt background batch work
+LANES = ("interactive", "batch")
+
+# Within a lane, stages closer to a finished report go first, so running tickers
+# complete before new ones start consuming quota. CrewAI agents are listed by agent name.
+STAGE_PRIORITY = {
+    "compliance_validation": 0,
+    "compliance_validator": 0,
+    "report_writing": 1,
+    "report_section": 1,
+    "investment_report_writer": 1,
+    "risk_assessment": 2,
+    "risk_assessment_specialist": 2,
+    "quantitative_analysis": 3,
+    "market_research": 3,
+    "quantitative_analysis_batch": 3,
+    "market_research_batch": 3,
+    "quantitative_analyst": 3,
+    "market_intelligence_researcher": 3,
+    "portfolio_manager": 3
+}
+
+def estimate_tokens(text: str, output_tokens: int = 0) -> int:
+    """Rough token count for quota accounting (about four characters per token), plus expected output."""
+    return len(text) // 4 + 1 + output_tokens
+
+class LLMRateScheduler:
+    """
+    Process-wide admission control for LLM requests.
+
+    Two token buckets refill continuously: one for requests per minute and one for
+    tokens per minute, charged with an estimate up front and corrected with the
+    provider's reported usage via settle(). Waiting requests are admitted strictly by
+    (lane, stage priority, arrival), so a waiting interactive compliance call is
+    served before any batch call, whatever the arrival order.
+
+    Budgets are per process; when several worker processes share one API key,
+    divide the quota between them in the configuration.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._totals = {lane: {"granted": 0, "tokens": 0, "wait_seconds": 0.0} for lane in LANES}
+        self._condition = threading.Condition()
+
+    def acquire(self, tokens: int, lane: str = "interactive", stage: str = "", timeout: Optional[float] = None) -> int:
+        """
+        Block until the request fits both budgets and no higher-priority request is waiting
+
+        Args:
+            tokens: Estimated tokens for the request (prompt plus expected output)
+            lane: 'interactive' or 'batch'
+            stage: Pipeline stage, for priority within the lane
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Tokens charged, to be passed to settle() once actual usage is known
+        """
+        # A request larger than the whole budget is charged the full bucket rather than waiting forever
+        tokens = int(min(max(tokens, 1), self.tokens_per_minute))
+        lane = lane if lane in LANES else LANES[-1]
+        entry = (LANES.index(lane), STAGE_PRIORITY.get(stage, len(STAGE_PRIORITY)), next(self._sequence))
+        started = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    self._refill()
+                    wait = None
+                    if self._waiting[0] == entry:
+                        wait = self._shortfall(tokens)
+                        if wait <= 0:
+                            break
+                    if timeout is not None:
+                        left = started + timeout - time.monotonic()
+                        if left <= 0:
+                            raise TimeoutError(f"Timed out waiting for LLM quota ({lane}/{stage or 'unknown'})")
+                        wait = left if wait is None else min(wait, left)
+                    self._condition.wait(wait)
+                self._requests -= 1
+                self._tokens -= tokens
+                totals = self._totals[lane]
+                totals["granted"] += 1
+                totals["tokens"] += tokens
+                totals["wait_seconds"] += time.monotonic() - started
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+        return tokens
+
+    def settle(self, charged: int, actual: Optional[int]):
+        """Corrects the token bucket once the provider reports the request's actual usage."""
+        if not actual:
+            return
+        with self._condition:
+            self._refill()
+            self._tokens = min(self.tokens_per_minute, self._tokens + charged - actual)
+            self._condition.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._condition:
+            self._refill()
+            return {
+                "requests_available": round(self._requests, 1),
+                "tokens_available": int(self._tokens),
+                "waiting": len(self._waiting),
+                "lanes": {lane: {**totals, "wait_seconds": round(totals["wait_seconds"], 2)}
+                          for lane, totals in self._totals.items()}
+            }
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def _shortfall(self, tokens: int) -> float:
+        """Seconds until both buckets can cover the request."""
+        request_wait = (1 - self._requests) * 60 / self.requests_per_minute
+        token_wait = (tokens - self._tokens) * 60 / self.tokens_per_minute
+        return max(request_wait, token_wait, 0.0)
+
+# global instance
+llm_scheduler = LLMRateScheduler(LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)
\ No newline at end of file
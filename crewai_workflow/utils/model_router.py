@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config.settings import (LLM_MODEL_TIERS, STAGE_MODEL_TIERS, LLM_ROUTING_BUDGET_SHARE,
+                    LLM_ROUTING_MAX_ERROR_RATE, LLM_ROUTING_MIN_SAMPLES, LLM_ROUTING_PROBE_SECONDS)
+
+logger = logging.getLogger(__name__)
+
+class ModelRouter:
+    """
+    Per-stage model selection over tiers ordered fastest first.
+
+    Each stage is configured with a tier; its model is used unless the observed health
+    of that model puts the stage at risk, in which case the next faster tier is tried:
+    - its p95 latency on this stage exceeds budget_share of the latency budget left for
+      the stage, or
+    - more than max_error_rate of its recent calls failed.
+    Latency is kept per model and stage, since stages differ widely in prompt and output
+    size; errors are kept per model, since an unhealthy model fails every stage.
+    Health is only judged once min_samples calls are on record, and the
+    fastest tier is always served, so routing never blocks a stage. A model that has
+    not been called for probe_seconds is tried again, so it recovers once it is healthy.
+    """
+
+    def __init__(self, tiers: Dict[str, str], stage_tiers: Dict[str, str], budget_share: float = 0.5,
+                 max_error_rate: float = 0.25, min_samples: int = 5, probe_seconds: float = 60.0, window: int = 50):
+        self.tiers = list(tiers.items())
+        self.stage_tiers = stage_tiers
+        self.budget_share = budget_share
+        self.max_error_rate = max_error_rate
+        self.min_samples = max(1, min_samples)
+        self.probe_seconds = probe_seconds
+        self.logger = logger
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self._outcomes = defaultdict(lambda: deque(maxlen=window))
+        self._fallbacks = defaultdict(int)
+        self._last_call = {}
+        self._lock = threading.Lock()
+
+    def model_for(self, stage: str, budget: Optional[float] = None) -> str:
+        """
+        Model to use for a stage
+
+        Args:
+            stage: Pipeline stage name (key of the stage tier mapping)
+            budget: Seconds the stage can still spend, or None when unbounded
+
+        Returns:
+            Model name from the stage's tier, or from a faster tier if that one is at risk
+        """
+        names = [name for name, _ in self.tiers]
+        tier = self.stage_tiers.get(stage, names[-1])
+        preferred = names.index(tier) if tier in names else len(names) - 1
+        reason = None
+        for index in range(preferred, -1, -1):
+            model = self.tiers[index][1]
+            risk = self._risk(model, stage, budget) if index > 0 else None
+            if risk is None:
+                if index != preferred:
+                    with self._lock:
+                        self._fallbacks[self.tiers[preferred][1]] += 1
+                    self.logger.warning(f"⚠️ {stage}: routed to {model} ({self.tiers[index][0]} tier), "
+                                        f"{self.tiers[preferred][1]} at risk: {reason}")
+                return model
+            reason = reason or risk
+
+    def record(self, model: str, stage: str, latency: Optional[float] = None, failed: bool = False):
+        """Record one call's outcome; latency is only recorded for successful calls."""
+        with self._lock:
+            self._outcomes[model].append(failed)
+            self._last_call[model] = time.monotonic()
+            if not failed and latency is not None:
+                self._latencies[(model, stage)].append(latency)
+
+    def _risk(self, model: str, stage: str, budget: Optional[float]) -> Optional[str]:
+        with self._lock:
+            outcomes = list(self._outcomes.get(model, ()))
+            latencies = list(self._latencies.get((model, stage), ()))
+            last_call = self._last_call.get(model)
+        if last_call is not None and time.monotonic() - last_call >= self.probe_seconds:
+            return None
+        if len(outcomes) >= self.min_samples:
+            error_rate = sum(outcomes) / len(outcomes)
+            if error_rate > self.max_error_rate:
+                return f"error rate {error_rate:.0%}"
+        if budget is not None and len(latencies) >= self.min_samples:
+            p95 = float(np.percentile(latencies, 95))
+            if p95 > budget * self.budget_share:
+                return f"p95 latency {p95:.1f}s over {budget * self.budget_share:.1f}s budget"
+        return None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, error rate, p50/p95 latency (over all stages) and fallbacks away from each model."""
+        with self._lock:
+            models = {model: (list(outcomes),
+                              [latency for (name, _), window in self._latencies.items() if name == model for latency in window],
+                              self._fallbacks.get(model, 0))
+                      for model, outcomes in self._outcomes.items()}
+        snapshot = {}
+        for model, (outcomes, latencies, fallbacks) in models.items():
+            snapshot[model] = {
+                "calls": len(outcomes),
+                "error_rate": round(sum(outcomes) / len(outcomes), 3) if outcomes else 0.0,
+                "latency_p50": round(float(np.percentile(latencies, 50)), 3) if latencies else None,
+                "latency_p95": round(float(np.percentile(latencies, 95)), 3) if latencies else None,
+                "fallbacks": fallbacks
+            }
+        return snapshot
+
+# global instance
+model_router = ModelRouter(
+    LLM_MODEL_TIERS,
+    STAGE_MODEL_TIERS,
+    budget_share=LLM_ROUTING_BUDGET_SHARE,
+    max_error_rate=LLM_ROUTING_MAX_ERROR_RATE,
+    min_samples=LLM_ROUTING_MIN_SAMPLES,
+    probe_seconds=LLM_ROUTING_PROBE_SECONDS
+)
\ No newline at end of file
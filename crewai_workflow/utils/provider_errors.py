@@ -0,0 +1,24 @@
+# Exception names that mean the provider itself is unhealthy, as opposed to a bad request.
+# Same classification as the ADK circuit breaker, for the LiteLLM exceptions CrewAI raises.
+PROVIDER_FAILURE_NAMES = ("Timeout", "Connection", "ServiceUnavailable", "InternalServerError",
+                          "DeadlineExceeded", "BadGateway", "Unavailable")
+
+def is_throttle_error(error: BaseException) -> bool:
+    """Whether an exception means the provider is rate limiting us (HTTP 429 or equivalent)."""
+    status = getattr(getattr(error, "response", None), "status_code", None) or getattr(error, "code", None)
+    if status == 429:
+        return True
+    name = type(error).__name__
+    if "RateLimit" in name or "ResourceExhausted" in name or "TooManyRequests" in name:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+def is_provider_failure(error: BaseException) -> bool:
+    """Whether an exception means the model is unhealthy and should count against it in routing."""
+    if is_throttle_error(error) or isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and status >= 500:
+        return True
+    return any(name in type(error).__name__ for name in PROVIDER_FAILURE_NAMES)
\ No newline at end of file
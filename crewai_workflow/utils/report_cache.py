@@ -0,0 +1,139 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.settings import (REPORT_CACHE_FRESH_SECONDS, REPORT_CACHE_MAX_STALE_SECONDS,
+                    REPORT_CACHE_PRICE_MOVE, REPORT_CACHE_NEWS_CHANGE)
+from utils.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+def data_fingerprint(current_price: Any, news_data: Any) -> Dict[str, Any]:
+    """
+    Compact fingerprint of the data a report was built from: the last price and a
+    short hash of each news headline.
+    """
+    articles = news_data.get("articles", []) if isinstance(news_data, dict) else []
+    headlines = {hashlib.sha1(str(a.get("title", "")).strip().lower().encode("utf-8")).hexdigest()[:12]
+                 for a in articles if a.get("title")}
+    return {
+        "price": float(current_price) if isinstance(current_price, (int, float)) else None,
+        "headlines": sorted(headlines)
+    }
+
+class ReportCache:
+    """
+    Final reports per ticker with a freshness policy and data-change detection.
+
+    A report younger than fresh_seconds is served as is if the current data fingerprint
+    shows the price has moved less than price_move (relative) and at most news_change of
+    the current headlines are new. A report that fails that check, or is older than
+    fresh_seconds but younger than max_stale_seconds, is served stale while a regeneration
+    runs in the background (at most one per ticker). Older reports are not served.
+    """
+
+    def __init__(self, fresh_seconds: float = 3600, max_stale_seconds: float = 86400,
+                 price_move: float = 0.02, news_change: float = 0.3, namespace: str = "reports"):
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.price_move = price_move
+        self.news_change = news_change
+        self.cache = DiskCache(namespace, float("inf"))
+        self.logger = logger
+        self._refreshing = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, ticker: str, current_fingerprint: Callable[[], Dict[str, Any]]) -> Optional[Tuple[str, str]]:
+        """
+        Cached report for a ticker
+
+        Args:
+            ticker: Stock symbol
+            current_fingerprint: Returns the fingerprint of the data as it is now; only
+                called for reports inside the freshness window
+
+        Returns:
+            (report, 'fresh' or 'stale'), or None if there is no report young enough to serve
+        """
+        entry = self.cache.get_entry(ticker.upper())
+        if entry is None:
+            return None
+        age = time.time() - entry["stored_at"]
+        if age >= self.max_stale_seconds:
+            self.logger.info(f"Cached report for {ticker} is {age / 3600:.1f}h old, regenerating")
+            return None
+        report, fingerprint = entry["value"]["report"], entry["value"]["fingerprint"]
+        if age >= self.fresh_seconds:
+            self.logger.info(f"Cached report for {ticker} is past its freshness window ({age / 60:.0f} min), serving it stale")
+            return report, "stale"
+
+        try:
+            change = self._data_change(fingerprint, current_fingerprint())
+        except Exception as e:
+            change = f"current data unavailable ({str(e)})"
+        if change:
+            self.logger.info(f"Cached report for {ticker} is {age / 60:.0f} min old but {change}, serving it stale")
+            return report, "stale"
+        self.logger.info(f"✅ Serving cached report for {ticker} ({age / 60:.0f} min old, data unchanged)")
+        return report, "fresh"
+
+    def store(self, ticker: str, report: str, fingerprint: Dict[str, Any]):
+        self.cache.set(ticker.upper(), {"report": report, "fingerprint": fingerprint})
+
+    def revalidate(self, ticker: str, regenerate: Callable[[], Any]) -> bool:
+        """
+        Start regenerating a ticker's report in the background unless a regeneration is
+        already running. regenerate is expected to store the new report.
+
+        Returns:
+            True if a regeneration was started
+        """
+        key = ticker.upper()
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            thread = threading.Thread(target=self._run, args=(key, regenerate), name=f"report-refresh-{key}")
+            self._refreshing[key] = thread
+        thread.start()
+        self.logger.info(f"Refreshing the report for {ticker} in the background")
+        return True
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until the background regenerations started so far have finished."""
+        with self._lock:
+            threads = list(self._refreshing.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def _run(self, key: str, regenerate: Callable[[], Any]):
+        try:
+            regenerate()
+        except Exception as e:
+            self.logger.error(f"❌ Background refresh of the {key} report failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def _data_change(self, cached: Dict[str, Any], current: Dict[str, Any]) -> Optional[str]:
+        """Why the data has moved past the thresholds since the report was built, or None."""
+        old_price, new_price = cached.get("price"), current.get("price")
+        if old_price and new_price is not None:
+            move = abs(new_price / old_price - 1)
+            if move > self.price_move:
+                return f"the price has moved {move:.1%}"
+        current_headlines = set(current.get("headlines", []))
+        if current_headlines:
+            new = len(current_headlines - set(cached.get("headlines", [])))
+            if new / len(current_headlines) > self.news_change:
+                return f"{new} of {len(current_headlines)} headlines are new"
+        return None
+
+# global instance
+report_cache = ReportCache(
+    fresh_seconds=REPORT_CACHE_FRESH_SECONDS,
+    max_stale_seconds=REPORT_CACHE_MAX_STALE_SECONDS,
+    price_move=REPORT_CACHE_PRICE_MOVE,
+    news_change=REPORT_CACHE_NEWS_CHANGE
+)
\ No newline at end of file
@@ -7,6 +7,7 @@ from crewai import Crew, Process
 from agents.financial_agents import financial_agents
 from workflows.investment_tasks import investment_tasks
 from config.settings import DEFAULT_COMPANY
+from tools.symbol_index import symbol_index
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -111,6 +112,9 @@ class InvestmentAnalysisCrew:
         if not ticker:
             ticker = DEFAULT_COMPANY
             
+        if not company_name:
+            company_name = symbol_index.get_company_name(ticker)
+
         if not company_name:
             try:
                 from tools.market_data_tools import yahoo_finance_tools
@@ -159,7 +163,7 @@ class InvestmentAnalysisCrew:
             ],
             "total_tasks": 6,
             "workflow_type": "Sequential with parallel data gathering",
-            "tools_available": 4,
+            "tools_available": 6,
             "process_flow": "Plan → [Data + News] → Risk → Report → Compliance"
         }
 
@@ -60,6 +60,7 @@ class InvestmentAnalysisTasks:
             4. Evaluate financial performance and market position
             
             Use your available tools to gather accurate, up-to-date financial data and provide data-driven insights.
+            Use the peer comparison tool for relative valuation against sector peers.
             
             Company: {company_name}
             Ticker: {ticker}
@@ -122,6 +123,7 @@ class InvestmentAnalysisTasks:
             4. Provide balanced risk assessment with mitigation considerations
             
             Consider both the financial metrics and market sentiment data provided by the team.
+            Use your financial ratios tool for leverage, liquidity and profitability figures from the financial statements.
             
             Company: {company_name}
             Ticker: {ticker}